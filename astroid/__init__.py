@@ -37,12 +37,12 @@ from operator import attrgetter
 import enum
 
 
-_Context = enum.Enum('Context', 'Load Store Del')
+# Kept in the package, for pickling the nodes referring to its members.
+Context = enum.Enum('Context', 'Load Store Del')
 # pylint: disable=no-member; github.com/pycqa/pylint/issues/690
-Load = _Context.Load
-Store = _Context.Store
-Del = _Context.Del
-del _Context
+Load = Context.Load
+Store = Context.Store
+Del = Context.Del
 
 
 # WARNING: internal imports order matters !
@@ -65,7 +65,7 @@ from astroid import raw_building
 from astroid.bases import BaseInstance, Instance, BoundMethod, UnboundMethod
 from astroid.node_classes import are_exclusive, unpack_infer
 from astroid.scoped_nodes import builtin_lookup
-from astroid.builder import parse, extract_node
+from astroid.builder import parse, parse_ast, extract_node
 from astroid.util import Uninferable, YES
 
 # make a manager instance (borg) accessible from astroid package
@@ -118,6 +118,7 @@ def inference_tip(infer_function):
 def register_module_extender(manager, module_name, get_extension_mod):
     def transform(node):
         extension_module = get_extension_mod()
+        manager.add_dependency(node, extension_module.name)
         for name, objs in extension_module.locals.items():
             node.locals[name] = objs
             for obj in objs:
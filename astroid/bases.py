@@ -67,8 +67,6 @@ class Proxy(object):
     def __getattr__(self, name):
         if name == '_proxied':
             return getattr(self.__class__, '_proxied')
-        if name in self.__dict__:
-            return self.__dict__[name]
         return getattr(self._proxied, name)
 
     def infer(self, context=None):
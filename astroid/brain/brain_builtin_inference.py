@@ -87,14 +87,29 @@ else:
                      'unicode': partial(_extend_str, rvalue="u''")})
 
 
-def register_builtin_transform(transform, builtin_name):
-    """Register a new transform function for the given *builtin_name*.
+# the inference functions registered for the builtins, by name
+_BUILTIN_TRANSFORMS = {}
 
-    The transform function must accept two parameters, a node and
-    an optional context.
+
+def _builtin_transform(builtin_name):
+    """Get the inference function registered for *builtin_name*."""
+    return _BUILTIN_TRANSFORMS[builtin_name]
+
+
+class _BuiltinTransform(object):
+    """Inference function of the calls to a builtin, setting the parent
+    and the position of the node inferred by the given *transform*.
+
+    It is set on the nodes of the built modules and pickled with them by
+    the name of the builtin, as the transforms may not be picklable.
     """
-    def _transform_wrapper(node, context=None):
-        result = transform(node, context=context)
+
+    def __init__(self, transform, builtin_name):
+        self.transform = transform
+        self.builtin_name = builtin_name
+
+    def __call__(self, node, context=None):
+        result = self.transform(node, context=context)
         if result:
             if not result.parent:
                 # Let the transformation function determine
@@ -106,6 +121,18 @@ def register_builtin_transform(transform, builtin_name):
             result.col_offset = node.col_offset
         return iter([result])
 
+    def __reduce__(self):
+        return _builtin_transform, (self.builtin_name,)
+
+
+def register_builtin_transform(transform, builtin_name):
+    """Register a new transform function for the given *builtin_name*.
+
+    The transform function must accept two parameters, a node and
+    an optional context.
+    """
+    _transform_wrapper = _BUILTIN_TRANSFORMS[builtin_name] = _BuiltinTransform(
+        transform, builtin_name)
     MANAGER.register_transform(nodes.Call,
                                inference_tip(_transform_wrapper),
                                lambda n: (isinstance(n.func, nodes.Name) and
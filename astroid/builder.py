@@ -8,23 +8,31 @@
 
 """The AstroidBuilder makes astroid from living object and / or from _ast
 
-The builder is not thread safe and can't be used to parse different sources
-at the same time.
+A builder instance is not thread safe and can't be used to parse different
+sources at the same time, but several builders can be used concurrently.
 """
 
 import _ast
+import collections
+import functools
+import io
 import re
 import os
 import sys
 import textwrap
 
 from astroid import bases
+from astroid import decorators
 from astroid import exceptions
 from astroid import manager
 from astroid import modutils
+from astroid import node_classes
+from astroid import nodeindex
+from astroid import positions
 from astroid import raw_building
 from astroid import rebuilder
 from astroid import nodes
+from astroid import stats
 from astroid import util
 
 # The name of the transient function that is used to
@@ -54,6 +62,10 @@ if sys.version_info >= (3, 0):
         data = stream.read()
         return stream, encoding, data
 
+    def _data_encoding(data):
+        """get the encoding of source code bytes"""
+        return detect_encoding(io.BytesIO(data).readline)[0]
+
 else:
     _ENCODING_RGX = re.compile(r"\s*#+.*coding[:=]\s*([-\w.]+)")
 
@@ -75,6 +87,17 @@ else:
         encoding = _guess_encoding(data)
         return stream, encoding, data
 
+    _data_encoding = _guess_encoding
+
+
+def read_source_file(filename):
+    """get the bytes of a source file, read once, and their encoding"""
+    # Not memory mapped, even when large: the bytes are kept by the module
+    # and parsed as a whole, so the mapping would be copied anyway.
+    with open(filename, 'rb') as stream:
+        data = stream.read()
+    return data, _data_encoding(data)
+
 
 MANAGER = manager.AstroidManager()
 
@@ -90,6 +113,99 @@ def _can_assign_attr(node, attrname):
     return True
 
 
+def _first_line(node):
+    """get the first line of an _ast or astroid statement, including its
+    decorators
+    """
+    decorator_nodes = getattr(node, 'decorator_list', None)
+    if decorator_nodes is None and getattr(node, 'decorators', None) is not None:
+        decorator_nodes = node.decorators.nodes
+    return min([node.lineno] + [decorator.lineno for decorator in decorator_nodes or ()])
+
+
+def _statement_sources(statements, source):
+    """get the source code of each top level statement
+
+    The source code of a statement runs up to the first line of the next
+    one. None is given for a statement sharing its first line with the next.
+    """
+    lines = source.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    starts = [_first_line(statement) for statement in statements]
+    ends = starts[1:] + [len(lines) + 1]
+    return ['\n'.join(lines[start - 1:end - 1]).rstrip() if start < end else None
+            for start, end in zip(starts, ends)]
+
+
+_CACHED_PROPERTIES = {}
+
+
+def _cached_properties(cls):
+    """get the names of the cached properties of a node class"""
+    try:
+        return _CACHED_PROPERTIES[cls]
+    except KeyError:
+        names = _CACHED_PROPERTIES[cls] = tuple(set(
+            name for klass in cls.__mro__ for name, value in vars(klass).items()
+            if isinstance(value, decorators.cachedproperty)))
+        return names
+
+
+def _drop_stale_attributes(attributes, module):
+    """remove the attributes assigned by statements which are not in *module*"""
+    for name, values in list(attributes.items()):
+        kept = [value for value in values
+                if not isinstance(value, nodes.AssignAttr) or value.root() is module]
+        if not kept:
+            del attributes[name]
+        elif len(kept) != len(values):
+            attributes[name] = kept
+
+
+def _reattach(node, delta, module):
+    """fix a statement moved from the previous build of *module*
+
+    Its line numbers are shifted by *delta*, the values cached from the
+    previous module are dropped, as are the attributes of its classes and
+    functions assigned by statements which were not reused.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (list, tuple)):
+            stack.extend(node)
+            continue
+        if not hasattr(node, '_astroid_fields'):
+            # None or the operators of a Compare
+            continue
+        if delta and node.lineno is not None:
+            node.lineno += delta
+        node_dict = node_classes._instance_dict(node)
+        if node_dict:
+            for name in _cached_properties(node.__class__):
+                node_dict.pop(name, None)
+            node_dict.pop('__cache', None)
+        if isinstance(node, nodes.ClassDef):
+            _drop_stale_attributes(node.locals, module)
+            _drop_stale_attributes(node.instance_attrs, module)
+        elif isinstance(node, nodes.FunctionDef):
+            _drop_stale_attributes(node.instance_attrs, module)
+        for field in node._astroid_fields:
+            if field == 'body' and getattr(node, '_deferred_body', None):
+                if delta:
+                    node._deferred_body = functools.partial(
+                        _build_moved_body, node._deferred_body, delta)
+                continue
+            stack.append(getattr(node, field))
+
+
+def _build_moved_body(build, delta, parent):
+    """build the deferred body of a function moved by *delta* lines"""
+    body = build(parent)
+    for child in body:
+        _reattach(child, delta, parent.root())
+    return body
+
+
 class AstroidBuilder(raw_building.InspectBuilder):
     """Class for building an astroid tree from source code or from a live module.
 
@@ -101,8 +217,7 @@ class AstroidBuilder(raw_building.InspectBuilder):
     """
     # pylint: disable=redefined-outer-name
     def __init__(self, manager=None, apply_transforms=True):
-        super(AstroidBuilder, self).__init__()
-        self._manager = manager or MANAGER
+        super(AstroidBuilder, self).__init__(manager)
         self._apply_transforms = apply_transforms
 
     def module_build(self, module, modname=None):
@@ -116,11 +231,13 @@ class AstroidBuilder(raw_building.InspectBuilder):
         if node is None:
             # this is a built-in module
             # get a partial representation by introspection
-            node = self.inspect_build(module, modname=modname, path=path)
+            with self._manager.stats.timer(modname, stats.INSPECT):
+                node = self.inspect_build(module, modname=modname, path=path)
             if self._apply_transforms:
                 # We have to handle transformation by ourselves since the
                 # rebuilder isn't called for builtin nodes
-                node = self._manager.visit_transforms(node)
+                with self._manager.stats.timer(node.name, stats.TRANSFORMS):
+                    node = self._manager.visit_transforms(node)
         return node
 
     def file_build(self, path, modname=None):
@@ -129,8 +246,9 @@ class AstroidBuilder(raw_building.InspectBuilder):
         *path* is expected to be a python source file
         """
         try:
-            stream, encoding, data = open_source_file(path)
-        except IOError as exc:
+            stat = os.stat(path)
+            data, encoding = read_source_file(path)
+        except (IOError, OSError) as exc:
             util.reraise(exceptions.AstroidBuildingError(
                 'Unable to load file {path}:\n{error}',
                 modname=modname, path=path, error=exc))
@@ -143,16 +261,18 @@ class AstroidBuilder(raw_building.InspectBuilder):
             util.reraise(exceptions.AstroidBuildingError(
                 'Wrong or no encoding specified for {filename}.',
                 filename=path))
-        with stream:
-            # get module name if necessary
-            if modname is None:
-                try:
-                    modname = '.'.join(modutils.modpath_from_file(path))
-                except ImportError:
-                    modname = os.path.splitext(os.path.basename(path))[0]
-            # build astroid representation
-            module = self._data_build(data, modname, path)
-            return self._post_build(module, encoding)
+        # get module name if necessary
+        if modname is None:
+            try:
+                modname = '.'.join(modutils.modpath_from_file(path))
+            except ImportError:
+                modname = os.path.splitext(os.path.basename(path))[0]
+        # build astroid representation, parsing the bytes as they were read
+        # so that the interpreter handles their encoding and line endings
+        module = self._data_build(data, modname, path)
+        module.file_bytes = data
+        module._source_stat = (stat.st_mtime, stat.st_size)
+        return self._post_build(module, encoding)
 
     def string_build(self, data, modname='', path=None):
         """Build astroid from source code string."""
@@ -160,33 +280,164 @@ class AstroidBuilder(raw_building.InspectBuilder):
         module.file_bytes = data.encode('utf-8')
         return self._post_build(module, 'utf-8')
 
-    def _post_build(self, module, encoding):
-        """Handles encoding and delayed nodes after a module has been built"""
+    def ast_build(self, node, data=None, modname='', path=None):
+        """Build astroid from a module already parsed by the ast module.
+
+        *node* is the _ast.Module of the source, which is left unmodified,
+        and *data* the source code it was parsed from, as bytes or as a
+        string, if it is available.
+        """
+        if not isinstance(node, _ast.Module):
+            raise exceptions.AstroidBuildingError(
+                'Expected an _ast.Module, got {node!r}.',
+                node=node, modname=modname, path=path)
+        module = self._ast_build(node, modname, path)
+        encoding = None
+        if isinstance(data, bytes):
+            module.file_bytes = data
+            try:
+                encoding = _data_encoding(data)
+            except (SyntaxError, LookupError):
+                pass
+        elif data is not None:
+            module.file_bytes = data.encode('utf-8')
+            encoding = 'utf-8'
+        return self._post_build(module, encoding)
+
+    def string_rebuild(self, previous, data):
+        """Build astroid from the new source code string of a module, reusing
+        the statements of its *previous* build which are unchanged.
+
+        The top level statements whose source code is the same as that of
+        a statement of *previous*, even if they were moved to other lines,
+        are not built again but moved to the new module, their line numbers
+        being fixed. The locals of the module and the transforms are only
+        computed for the other statements. The new module replaces
+        *previous*, which must not be used afterwards, in the cache of
+        the manager.
+        """
+        modname = previous.name
+        path = previous.file if previous.file != '<?>' else None
+        if self._manager.astroid_cache.get(modname) is previous:
+            self._manager.invalidate(modname)
+        # Its statements are moved to the new module.
+        previous._drop_indexes()
+        node = self._parse_data(data, modname, path)
+        body, doc = rebuilder._get_doc(node)
+        future_imports = set(alias.name for statement in body
+                             if isinstance(statement, _ast.ImportFrom)
+                             and statement.module == '__future__'
+                             for alias in statement.names)
+        try:
+            source = previous.file_bytes.decode(previous.file_encoding or 'utf-8')
+        except (AttributeError, LookupError, UnicodeError):
+            source = None
+        if source is None or future_imports != previous.future_imports:
+            # The statements of the previous module can't be compared or
+            # may have been parsed differently.
+            module = self._ast_build(node, modname, path)
+            module.file_bytes = data.encode('utf-8')
+            return self._post_build(module, 'utf-8')
+
+        reusable = collections.defaultdict(collections.deque)
+        for statement, statement_source in zip(
+                previous.body, _statement_sources(previous.body, source)):
+            if statement_source is not None:
+                reusable[statement_source].append(statement)
+        module = nodes.Module(name=modname, doc=doc, file=previous.file,
+                              path=previous.path, package=previous.package,
+                              pure_python=previous.pure_python, parent=None)
+        builder = self._tree_rebuilder()
+        statements, changed, moved = [], [], []
+        with self._manager.stats.timer(modname, stats.REBUILD):
+            for statement, statement_source in zip(body, _statement_sources(body, data)):
+                if reusable.get(statement_source):
+                    old = reusable[statement_source].popleft()
+                    old.parent = module
+                    moved.append((old, _first_line(statement) - _first_line(old)))
+                    statements.append(old)
+                else:
+                    new = builder.visit(statement, module)
+                    statements.append(new)
+                    changed.append(new)
+            module.postinit(statements)
+            for statement, delta in moved:
+                _reattach(statement, delta, module)
+            for name, values in previous.locals.items():
+                kept = [value for value in values if value.root() is module]
+                if kept:
+                    merged = module.locals.setdefault(name, [])
+                    merged.extend(kept)
+                    merged.sort(key=lambda node: node.fromlineno)
+        module.future_imports = set(previous.future_imports)
+        # The reused statements may hold nodes of the modules it depends on.
+        module._dependencies = previous._dependencies
+        module._import_from_nodes = builder._import_from_nodes
+        module._transformed_nodes = (builder._transformed_nodes
+                                      if builder._transforms is not None else None)
+        module._delayed_assattr = builder._delayed_assattr + [
+            node for node in getattr(previous, '_delayed_assattr', ())
+            if node.root() is module]
+        module.file_bytes = data.encode('utf-8')
+        return self._post_build(module, 'utf-8', changed)
+
+    def _post_build(self, module, encoding, changed=None):
+        """Handles encoding and delayed nodes after a module has been built
+
+        If *changed* is given, the transforms are only applied to these
+        statements of the module.
+        """
         module.file_encoding = encoding
-        self._manager.cache_module(module)
-        # post tree building steps after we stored the module in the cache:
-        for from_node in module._import_from_nodes:
-            if from_node.modname == '__future__':
-                for symbol, _ in from_node.names:
-                    module.future_imports.add(symbol)
-            self.add_from_names_to_locals(from_node)
-        # handle delayed assattr nodes
-        for delayed in module._delayed_assattr:
-            self.delayed_assattr(delayed)
-
-        # Visit the transforms
-        if self._apply_transforms:
-            module = self._manager.visit_transforms(module)
+        if self._manager.isolated:
+            module.manager = self._manager
+        # Other threads don't get the module from the cache until
+        # it is completely built.
+        timer = self._manager.stats.timer
+        with self._manager._build_locks.hold(module.name):
+            self._manager.cache_module(module)
+            with timer(module.name, stats.POST_BUILD):
+                # post tree building steps after we stored the module in the cache:
+                for from_node in module._import_from_nodes:
+                    if from_node.modname == '__future__':
+                        for symbol, _ in from_node.names:
+                            module.future_imports.add(symbol)
+                    self.add_from_names_to_locals(from_node)
+                # handle delayed assattr nodes
+                for delayed in module._delayed_assattr:
+                    self.delayed_assattr(delayed)
+
+            # Visit the transforms
+            if self._apply_transforms:
+                with timer(module.name, stats.TRANSFORMS):
+                    transformed, module._transformed_nodes = module._transformed_nodes, None
+                    if transformed is None:
+                        module = self._manager.visit_transforms(module, changed)
+                    else:
+                        module = self._manager._transform.transform_nodes(
+                            module, transformed)
+            if self._manager.store_positions:
+                module._positions = positions.PositionStore(module)
+            if self._manager.index_nodes:
+                module._node_index = nodeindex.NodeIndex(module)
         return module
 
     def _data_build(self, data, modname, path):
         """Build tree node from data and add some informations"""
+        return self._ast_build(self._parse_data(data, modname, path), modname, path)
+
+    def _parse_data(self, data, modname, path):
+        """Parse data to an _ast.Module"""
         try:
-            node = _parse(data + '\n')
+            with self._manager.stats.timer(modname, stats.PARSE):
+                return _parse(data + (b'\n' if isinstance(data, bytes) else '\n'))
         except (TypeError, ValueError, SyntaxError) as exc:
             util.reraise(exceptions.AstroidSyntaxError(
                 'Parsing Python code failed:\n{error}',
                 source=data, modname=modname, path=path, error=exc))
+
+    def _ast_build(self, node, modname, path):
+        """Build tree node from an _ast.Module and add some informations"""
+        timer = self._manager.stats.timer
         if path is not None:
             node_file = os.path.abspath(path)
         else:
@@ -196,12 +447,23 @@ class AstroidBuilder(raw_building.InspectBuilder):
             package = True
         else:
             package = path and path.find('__init__.py') > -1 or False
-        builder = rebuilder.TreeRebuilder(self._manager)
-        module = builder.visit_module(node, modname, node_file, package)
+        builder = self._tree_rebuilder()
+        with timer(modname, stats.REBUILD):
+            module = builder.visit_module(node, modname, node_file, package)
         module._import_from_nodes = builder._import_from_nodes
+        module._transformed_nodes = (builder._transformed_nodes
+                                      if builder._transforms is not None else None)
         module._delayed_assattr = builder._delayed_assattr
         return module
 
+    def _tree_rebuilder(self):
+        """Get a rebuilder, recording the nodes to transform if the
+        transforms of the manager are fused with the building
+        """
+        if self._apply_transforms and self._manager.fuse_transforms:
+            return rebuilder.TreeRebuilder(self._manager, self._manager._transform)
+        return rebuilder.TreeRebuilder(self._manager)
+
     def add_from_names_to_locals(self, node):
         """Store imported names to the locals
 
@@ -217,6 +479,7 @@ class AstroidBuilder(raw_building.InspectBuilder):
                     imported = node.do_import_module()
                 except exceptions.AstroidBuildingError:
                     continue
+                self._manager.add_dependency(node.root(), imported.name)
                 for name in imported.public_names():
                     node.parent.set_local(name, node)
                     sort_locals(node.parent.scope().locals[name])
@@ -284,6 +547,22 @@ def parse(code, module_name='', path=None, apply_transforms=True):
     return builder.string_build(code, modname=module_name, path=path)
 
 
+def parse_ast(node, code=None, module_name='', path=None, apply_transforms=True):
+    """Obtain an astroid AST from a module already parsed by the ast module
+
+    :param node: The _ast.Module of the code, which is not modified.
+    :param code: The code the module was parsed from, as bytes or string.
+    :param str module_name: The name for the module, if any
+    :param str path: The path for the module
+    :param bool apply_transforms:
+        Apply the transforms for the give code. Use it if you
+        don't want the default transforms to be applied.
+    """
+    builder = AstroidBuilder(manager=MANAGER,
+                             apply_transforms=apply_transforms)
+    return builder.ast_build(node, code, modname=module_name, path=path)
+
+
 def _extract_expressions(node):
     """Find expressions in a call to _TRANSIENT_FUNCTION and extract them.
 
@@ -315,6 +594,7 @@ def _extract_expressions(node):
                         child[idx] = real_expr
             elif child is node:
                 setattr(node.parent, name, real_expr)
+        real_expr.root()._drop_indexes()
         yield real_expr
     else:
         for child in node.get_children():
@@ -0,0 +1,341 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""Persistent cache of built module trees
+
+The cache stores the post-transform module trees built from source files
+into a directory, so that they can be reused by later processes instead
+of being rebuilt from scratch. Entries are keyed by the absolute path of the
+module, the interpreter version and the set of registered transforms, and
+they are validated against the size, the modification time and the content
+hash of the source file before being used. The nodes of other modules a
+tree refers to are stored as references to these modules, so the source
+files of these modules are validated the same way.
+
+The directory can be shared by several processes: entries are written
+atomically and corrupted or unreadable entries are discarded, in which case
+the module is simply rebuilt.
+
+Entries are unpickled, which can run arbitrary code: whoever can write in
+the directory can run code in the processes using it. The directory is
+created readable and writable by its owner only, and it isn't used if
+it, or an entry, is owned by another user or writable by other users.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import pickle
+import stat
+import sys
+import tempfile
+
+from astroid import __pkginfo__
+from astroid import exceptions
+from astroid import node_classes
+
+
+_LOG = logging.getLogger(__name__)
+# changed along with the layout of the pickled nodes
+_MAGIC = b'astroid-module-cache 3\n'
+_DIGEST_SIZE = hashlib.sha1().digest_size * 2
+_replace = getattr(os, 'replace', os.rename)
+
+
+class _UncacheableError(Exception):
+    """Raised when a module tree refers to objects which can't be persisted."""
+
+
+def _source_digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _qualified_name(obj):
+    if obj is None:
+        return ''
+    module = getattr(obj, '__module__', None) or ''
+    name = getattr(obj, '__qualname__', None) or getattr(obj, '__name__', None)
+    return '%s.%s' % (module, name or type(obj).__name__)
+
+
+def transforms_fingerprint(transform_visitor):
+    """Get a stable fingerprint of the transforms registered in a visitor."""
+    entries = []
+    for node_class, transforms in transform_visitor.transforms.items():
+        for transform, predicate in transforms:
+            entries.append('%s:%s:%s' % (_qualified_name(node_class),
+                                         _qualified_name(transform),
+                                         _qualified_name(predicate)))
+    return _source_digest('\n'.join(sorted(entries)).encode('utf-8'))
+
+
+def _source_state(filepath):
+    """Get the modification time, the size and the digest of *filepath*."""
+    file_stat = os.stat(filepath)
+    with open(filepath, 'rb') as source:
+        digest = _source_digest(source.read())
+    return file_stat.st_mtime, file_stat.st_size, digest
+
+
+def _module_state(module):
+    """Get the modification time, the size and the digest of the source
+    *module* was built from, or None if it wasn't built from a file.
+    """
+    if module.file_bytes is not None and module._source_stat is not None:
+        # The source as it was read when building the module.
+        mtime, size = module._source_stat
+        return mtime, size, _source_digest(module.file_bytes)
+    if not module.file:
+        # Built from a living module, such as the builtins module.
+        return None
+    return _source_state(module.file)
+
+
+def _is_current(filepath, state):
+    """Tell whether *filepath* still has the given modification time, size
+    and digest, the digest being checked only when the others changed.
+    """
+    mtime, size, digest = state
+    try:
+        file_stat = os.stat(filepath)
+        if (file_stat.st_mtime, file_stat.st_size) == (mtime, size):
+            return True
+        return _source_state(filepath)[2] == digest
+    except (IOError, OSError):
+        return False
+
+
+def _is_private(file_stat):
+    """Tell whether a file is owned by the current user and writable by
+    nobody else.
+    """
+    if not hasattr(os, 'getuid'):
+        # No owners to compare on this platform.
+        return True
+    return (file_stat.st_uid == os.getuid()
+            and not file_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def _node_path(node):
+    """Get the list of (field, index) steps leading from the root to *node*."""
+    steps = []
+    while node.parent is not None:
+        parent = node.parent
+        try:
+            field, child = parent.locate_child(node)
+        except exceptions.AstroidError:
+            raise _UncacheableError('%r is not reachable from its parent.'
+                                    % node)
+        if child is node:
+            steps.append((field, None))
+        else:
+            index = next(index for index, elt in enumerate(child) if elt is node)
+            steps.append((field, index))
+        node = parent
+    steps.reverse()
+    return steps
+
+
+def _follow_path(module, steps):
+    node = module
+    for field, index in steps:
+        node = getattr(node, field)
+        if index is not None:
+            node = node[index]
+    return node
+
+
+class _ModulePickler(pickle.Pickler):
+    """Pickler storing references to other modules instead of copies."""
+
+    def __init__(self, stream, module, own_nodes, manager):
+        pickle.Pickler.__init__(self, stream, pickle.HIGHEST_PROTOCOL)
+        self._module = module
+        self._own_nodes = own_nodes
+        self._manager = manager
+        # the names of the modules referred to
+        self.dependencies = set()
+
+    def persistent_id(self, obj):
+        # pylint: disable=method-hidden; pickle API
+        if obj is self._manager:
+            return ('manager',)
+        if id(obj) in self._own_nodes or not isinstance(obj, node_classes.NodeNG):
+            return None
+        root = obj.root()
+        if root is self._module:
+            return None
+        if not getattr(root, 'name', None):
+            # Only named modules can be retrieved again when loading.
+            raise _UncacheableError('%r does not belong to a named module.'
+                                    % obj)
+        self.dependencies.add(root.name)
+        if obj is root:
+            return ('module', root.name)
+        return ('node', root.name, tuple(_node_path(obj)))
+
+
+class _ModuleUnpickler(pickle.Unpickler):
+    """Unpickler resolving module references through a manager."""
+
+    def __init__(self, stream, manager, dependencies):
+        pickle.Unpickler.__init__(self, stream)
+        self._manager = manager
+        self._dependencies = dependencies
+
+    def persistent_load(self, pid):
+        # pylint: disable=method-hidden; pickle API
+        if pid[0] == 'manager':
+            return self._manager
+        kind, modname = pid[0], pid[1]
+        module = self._manager.ast_from_module_name(modname)
+        path = self._dependencies[modname][0]
+        if module.file != path:
+            # Now found elsewhere, the nodes referred to may differ.
+            raise _UncacheableError('%s is now built from %s instead of %s.'
+                                    % (modname, module.file, path))
+        if kind == 'module':
+            return module
+        return _follow_path(module, pid[2])
+
+
+class DiskCache(object):
+    """Store and retrieve module trees from the given *directory*.
+
+    The *manager* is used for resolving the references a cached tree
+    has to other modules, such as the builtins module.
+    """
+
+    def __init__(self, directory, manager):
+        self.directory = directory
+        self._manager = manager
+
+    def _entry_path(self, filepath):
+        key = '\n'.join((os.path.abspath(filepath), sys.version,
+                         __pkginfo__.version,
+                         transforms_fingerprint(self._manager._transform)))
+        return os.path.join(self.directory,
+                            _source_digest(key.encode('utf-8')) + '.ast')
+
+    def _discard(self, entry_path):
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+
+    def load(self, filepath, modname):
+        """Get the cached tree for *filepath* or None if it isn't usable."""
+        entry_path = self._entry_path(filepath)
+        try:
+            with open(entry_path, 'rb') as stream:
+                if not (_is_private(os.stat(self.directory))
+                        and _is_private(os.fstat(stream.fileno()))):
+                    _LOG.warning('Not using %s, it can be written by other '
+                                 'users.', entry_path)
+                    return None
+                data = stream.read()
+        except (IOError, OSError):
+            return None
+        header_size = len(_MAGIC) + _DIGEST_SIZE
+        payload = data[header_size:]
+        if (not data.startswith(_MAGIC)
+                or data[len(_MAGIC):header_size].decode('ascii', 'replace')
+                != _source_digest(payload)):
+            # Truncated or otherwise corrupted entry.
+            self._discard(entry_path)
+            return None
+
+        stream = io.BytesIO(payload)
+        try:
+            key = pickle.Unpickler(stream).load()
+        except Exception: # pylint: disable=broad-except
+            self._discard(entry_path)
+            return None
+        if key['path'] != os.path.abspath(filepath) or key['modname'] != modname:
+            return None
+        if not _is_current(filepath, key['state']):
+            return None
+        for path, state in key['dependencies'].values():
+            if state is not None and not _is_current(path, state):
+                return None
+        unpickler = _ModuleUnpickler(stream, self._manager, key['dependencies'])
+        try:
+            return unpickler.load()
+        except Exception: # pylint: disable=broad-except
+            self._discard(entry_path)
+            return None
+
+    def store(self, module):
+        """Store the given *module* tree, built from its file.
+
+        Modules referring to objects which can't be persisted are
+        skipped, and logged.
+        """
+        filepath = module.file
+        try:
+            state = _module_state(module)
+        except (IOError, OSError) as exc:
+            _LOG.info('Not caching %s, its source is unreadable: %s',
+                      module.name, exc)
+            return False
+        if state is None:
+            return False
+
+        own_nodes = set(id(node) for node in module.nodes_of_class(object))
+        stream = io.BytesIO()
+        pickler = _ModulePickler(stream, module, own_nodes, self._manager)
+        try:
+            pickler.dump(module)
+            dependencies = {}
+            for name in pickler.dependencies | module._dependencies:
+                dependency = self._manager.astroid_cache.get(name)
+                if dependency is None:
+                    raise _UncacheableError('%s is not built.' % name)
+                dependencies[name] = (dependency.file,
+                                      _module_state(dependency))
+        except _UncacheableError as exc:
+            _LOG.info('Not caching %s: %s', module.name, exc)
+            return False
+        except (IOError, OSError) as exc:
+            _LOG.info('Not caching %s, a source it depends on is '
+                      'unreadable: %s', module.name, exc)
+            return False
+        except Exception as exc: # pylint: disable=broad-except
+            # Unpicklable objects or too deeply nested trees.
+            _LOG.warning('Not caching %s, it can not be pickled: %s',
+                         module.name, exc)
+            return False
+        # The key is read first, to know whether the tree can be used.
+        key = {'path': os.path.abspath(filepath), 'modname': module.name,
+               'state': state, 'dependencies': dependencies}
+        payload = (pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+                   + stream.getvalue())
+
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory, 0o700)
+        except OSError as exc:
+            if not os.path.isdir(self.directory):
+                _LOG.warning('Not caching %s: %s', module.name, exc)
+                return False
+        if not _is_private(os.stat(self.directory)):
+            _LOG.warning('Not caching %s, %s can be written by other users.',
+                         module.name, self.directory)
+            return False
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        except OSError as exc:
+            _LOG.warning('Not caching %s: %s', module.name, exc)
+            return False
+        try:
+            with os.fdopen(fd, 'wb') as entry:
+                entry.write(_MAGIC)
+                entry.write(_source_digest(payload).encode('ascii'))
+                entry.write(payload)
+            _replace(tmp_path, self._entry_path(filepath))
+        except (IOError, OSError) as exc:
+            _LOG.warning('Not caching %s: %s', module.name, exc)
+            self._discard(tmp_path)
+            return False
+        return True
@@ -0,0 +1,86 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""Index of the nodes of a module by the lines and columns they span
+
+An :class:`IntervalIndex` is built by a module the first time one of its
+``node_at``, ``statement_at`` or ``scope_at`` methods is called. A node
+spans the code from its line and column, ``lineno`` and ``col_offset``,
+to the end of its last line, ``tolineno``, the end column of the nodes
+not being known. The spans of the nodes are nested like the nodes, so
+the innermost node at a position is the same for all the positions up
+to the next start of a node or end of a last line. The index keeps these
+boundaries, sorted, with the innermost node following each of them, and
+finds the node at a position with a binary search.
+
+The nodes are those of the :class:`~astroid.positions.NodeNumbering` of
+the module, the bodies of its functions not built yet being built first.
+The nodes which have no line or column, such as the arguments of the
+functions, are not in the index: the innermost node holding them is
+found instead. The index describes the module as it was when first
+queried: it is dropped by the changes astroid makes to the tree, see
+:meth:`~astroid.scoped_nodes.Module._drop_indexes`.
+"""
+
+from array import array
+import bisect
+
+
+# Kinds of the events of the sweep: the nodes whose last line is before
+# a position are left before the ones starting at it are entered.
+_END = 0
+_START = 1
+# Index of the boundaries followed by no node.
+_NONE = -1
+
+
+class IntervalIndex(object):
+    """The nodes of *module* by the lines and columns they span."""
+
+    def __init__(self, module):
+        self.numbering = module._get_numbering(build_bodies=True)
+        events = []
+        for number, node in enumerate(self.numbering.nodes):
+            if node.lineno is not None and node.col_offset is not None:
+                tolineno = max(node.tolineno or node.lineno, node.lineno)
+                events.append((node.lineno, node.col_offset, _START, number))
+                # Left at the start of the line following its last one,
+                # before anything starting on that line.
+                events.append((tolineno + 1, -1, _END, number))
+        # The deeper of the nodes starting at the same position are
+        # numbered after their parents, and entered after them.
+        events.sort()
+
+        self._lines = array('l')
+        self._cols = array('l')
+        self._innermost = array('l')
+        entered = []
+        left = set()
+        for line, col, kind, number in events:
+            if kind == _END:
+                left.add(number)
+            else:
+                entered.append(number)
+            # Nodes whose spans aren't nested, as multi-line strings
+            # starting at their last line, are left when on top.
+            while entered and entered[-1] in left:
+                entered.pop()
+            innermost = entered[-1] if entered else _NONE
+            if (self._lines and self._lines[-1] == line
+                    and self._cols[-1] == col):
+                self._innermost[-1] = innermost
+            else:
+                self._lines.append(line)
+                self._cols.append(col)
+                self._innermost.append(innermost)
+
+    def node_at(self, line, col=0):
+        """Get the innermost node at *line* and column *col*, or None."""
+        low = bisect.bisect_left(self._lines, line)
+        high = bisect.bisect_right(self._lines, line, low)
+        # The last boundary at or before the position.
+        position = bisect.bisect_right(self._cols, col, low, high) - 1
+        if position < 0:
+            return None
+        innermost = self._innermost[position]
+        return None if innermost == _NONE else self.numbering.nodes[innermost]
@@ -11,15 +11,27 @@ possible by providing a class responsible to get astroid representation
 from various source and using a cache of built modules)
 """
 
+import collections
+import contextlib
+import copy
+import gc
 import imp
 import os
 import sys
+import threading
+import time
 import zipimport
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
 
 import six
+from six.moves import _thread
 
 from astroid import exceptions
 from astroid import modutils
+from astroid import stats as astroid_stats
 from astroid import transforms
 from astroid import util
 
@@ -31,35 +43,323 @@ def safe_repr(obj):
         return '???'
 
 
+def _estimate_module_size(module):
+    """Get an approximation of the memory held by the nodes of *module*."""
+    from astroid import scoped_nodes
+    if isinstance(module, scoped_nodes.LazyModule):
+        # Not built yet, it's measured again once built.
+        return sys.getsizeof(module) + sys.getsizeof(module.__dict__)
+    size = 0
+    for node in module.nodes_of_class(object):
+        size += sys.getsizeof(node)
+        # Reading the __dict__ of a node creates it if it has none.
+        for value in gc.get_referents(node):
+            if type(value) is dict:
+                size += sys.getsizeof(value)
+    return size
+
+
+class ModuleCache(MutableMapping):
+    """Mapping of module names to built modules, with optional eviction.
+
+    When *max_modules* or *max_bytes* are set, the least recently used
+    modules are evicted whenever adding a module goes over one of these
+    limits. The byte budget is checked against an estimation of the size
+    of the nodes of each module. Pinned modules, such as the builtins
+    module, are never evicted, nor the modules for which *building*, if
+    given, returns True, as the modules still being built by the manager.
+    An evicted module is simply rebuilt by the manager the next time it
+    is requested.
+    """
+
+    def __init__(self, max_modules=None, max_bytes=None, building=None):
+        self._lock = threading.RLock()
+        self._modules = collections.OrderedDict()
+        self._sizes = {}
+        self.max_modules = max_modules
+        self.max_bytes = max_bytes
+        self.building = building
+        self.pinned = set([six.moves.builtins.__name__])
+        self.evictions = 0
+        self.size = 0
+
+    def __getitem__(self, modname):
+        with self._lock:
+            module = self._modules.pop(modname)
+            self._modules[modname] = module
+            return module
+
+    def __setitem__(self, modname, module):
+        with self._lock:
+            if modname in self._modules:
+                del self[modname]
+            self._modules[modname] = module
+            if self.max_bytes is not None:
+                self._sizes[modname] = _estimate_module_size(module)
+                self.size += self._sizes[modname]
+            self._evict()
+
+    def __delitem__(self, modname):
+        with self._lock:
+            del self._modules[modname]
+            self.size -= self._sizes.pop(modname, 0)
+
+    def __contains__(self, modname):
+        return modname in self._modules
+
+    def __iter__(self):
+        return iter(list(self._modules))
+
+    def __len__(self):
+        return len(self._modules)
+
+    def values(self):
+        # Listing the cache doesn't count as an access.
+        return list(self._modules.values())
+
+    def items(self):
+        return list(self._modules.items())
+
+    def get(self, modname, default=None):
+        with self._lock:
+            if modname in self._modules:
+                return self[modname]
+            return default
+
+    def setdefault(self, modname, module):
+        with self._lock:
+            if modname in self._modules:
+                return self[modname]
+            self[modname] = module
+            return module
+
+    def pop(self, modname, *default):
+        with self._lock:
+            return MutableMapping.pop(self, modname, *default)
+
+    def clear(self):
+        with self._lock:
+            self._modules.clear()
+            self._sizes.clear()
+            self.size = 0
+
+    def pin(self, modname):
+        """Never evict the module with the given name."""
+        self.pinned.add(modname)
+
+    def unpin(self, modname):
+        self.pinned.discard(modname)
+
+    def _over_limits(self):
+        if self.max_modules is not None and len(self._modules) > self.max_modules:
+            return True
+        return self.max_bytes is not None and self.size > self.max_bytes
+
+    def _evict(self):
+        if not self._over_limits():
+            return
+        # The most recently added module is kept, since it may still
+        # be under construction.
+        candidates = [modname for modname in list(self._modules)[:-1]
+                      if modname not in self.pinned
+                      and not (self.building and self.building(modname))]
+        for modname in candidates:
+            if not self._over_limits():
+                break
+            del self[modname]
+            self.evictions += 1
+
+
+class _BuildLocks(object):
+    """Per-module locks serializing the builds of modules across threads.
+
+    The locks are reentrant, since building a module can lead to inferring
+    imports of the module being built. Two threads building modules which
+    import each other would wait on each other forever, so instead of
+    waiting, :meth:`hold` reports when that would happen and the caller can
+    use the module as built so far, as it happens for import cycles in a
+    single thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # modname -> [lock, number of threads using the lock]
+        self._locks = {}
+        # modname -> [thread ident, recursion depth]
+        self._owners = {}
+        # thread ident -> modname of the lock the thread is waiting for
+        self._waiting = {}
+
+    def owner(self, modname):
+        """Get the ident of the thread building *modname*, if any."""
+        owner = self._owners.get(modname)
+        return owner[0] if owner else None
+
+    def is_held(self, modname):
+        """Check if a thread holds the build lock of *modname*."""
+        return modname in self._owners
+
+    def _would_deadlock(self, modname, ident):
+        seen = set()
+        while True:
+            owner = self._owners.get(modname)
+            if owner is None:
+                return False
+            if owner[0] == ident:
+                return True
+            if owner[0] in seen:
+                return False
+            seen.add(owner[0])
+            modname = self._waiting.get(owner[0])
+            if modname is None:
+                return False
+
+    @contextlib.contextmanager
+    def hold(self, modname):
+        """Hold the build lock of *modname* while in the block.
+
+        The context value is False if the lock couldn't be acquired
+        because waiting for it would deadlock.
+        """
+        ident = _thread.get_ident()
+        with self._lock:
+            entry = self._locks.setdefault(modname, [threading.RLock(), 0])
+            entry[1] += 1
+        lock = entry[0]
+        try:
+            if not lock.acquire(False):
+                with self._lock:
+                    deadlock = self._would_deadlock(modname, ident)
+                    if not deadlock:
+                        self._waiting[ident] = modname
+                if deadlock:
+                    yield False
+                    return
+                lock.acquire()
+                with self._lock:
+                    del self._waiting[ident]
+            with self._lock:
+                owner = self._owners.setdefault(modname, [ident, 0])
+                owner[1] += 1
+            try:
+                yield True
+            finally:
+                with self._lock:
+                    owner[1] -= 1
+                    if not owner[1]:
+                        del self._owners[modname]
+                lock.release()
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[modname]
+
+
 class AstroidManager(object):
     """the astroid manager, responsible to build astroid from files
      or modules.
 
     Use the Borg pattern.
+
+    Modules can be requested from several threads: each module is built
+    once, by the first thread requesting it, while the other ones wait for
+    the build to finish instead of getting a partially built module.
+
+    An *isolated* manager doesn't share its state with the other
+    managers: it has its own module caches and transforms, starting
+    with a copy of the transforms and the failed import hooks of the
+    default manager. Only the builtins module is shared with the default
+    manager and it should be considered as read-only. The modules of an
+    isolated manager are searched in its *search_path*, ``sys.path`` if
+    it's not given.
+
+    When :attr:`lazy_imports` is set, the modules imported by the
+    modules being inferred are only built once their contents are
+    needed (see :class:`~astroid.scoped_nodes.LazyModule`).
     """
 
     name = 'astroid loader'
     brain = {}
+    _build_locks = _BuildLocks()
+    # directory of the persistent cache of built modules, if any, which
+    # must not be writable by other users since its entries are unpickled
+    cache_directory = None
+    _disk_cache = None
+    # number of seconds failed lookups are remembered, forever if None
+    negative_cache_ttl = None
+    _negative_cache = None
+    _negative_cache_path = None
+    stats = astroid_stats.BuildStats(enabled=False)
+    # whether imported modules are built the first time they are used
+    lazy_imports = False
+    # whether function bodies are built the first time they are used
+    defer_function_bodies = False
+    # whether the nodes to transform are recorded while building modules,
+    # instead of walking the modules again to transform them
+    fuse_transforms = False
+    # whether the positions of the nodes of the built modules are stored
+    # in arrays (see astroid.positions)
+    store_positions = False
+    # whether the nodes of the built modules are indexed by class, for
+    # nodes_of_class (see astroid.nodeindex)
+    index_nodes = False
+    isolated = False
+    search_path = None
 
-    def __init__(self):
+    def __init__(self, isolated=False, search_path=None):
+        if isolated:
+            self._init_isolated(search_path)
+            return
+        if search_path is not None:
+            raise ValueError('Only isolated managers can have a search path.')
         self.__dict__ = AstroidManager.brain
         if not self.__dict__:
-            # NOTE: cache entries are added by the [re]builder
-            self.astroid_cache = {}
-            self._mod_file_cache = {}
-            self._failed_import_hooks = []
-            self.always_load_extensions = False
-            self.optimize_ast = False
-            self.extension_package_whitelist = set()
-            self._transform = transforms.TransformVisitor()
-
-            # Export these APIs for convenience
-            self.register_transform = self._transform.register_transform
-            self.unregister_transform = self._transform.unregister_transform
-
-    def visit_transforms(self, node):
-        """Visit the transforms and apply them to the given *node*."""
-        return self._transform.visit(node)
+            self._init_state()
+
+    def _init_state(self):
+        # NOTE: cache entries are added by the [re]builder
+        self.astroid_cache = ModuleCache(building=self._build_locks.is_held)
+        self._mod_file_cache = {}
+        self._failed_import_hooks = []
+        self.always_load_extensions = False
+        self.optimize_ast = False
+        self.extension_package_whitelist = set()
+        self._transform = transforms.TransformVisitor()
+        self.stats = astroid_stats.BuildStats()
+
+        # Export these APIs for convenience
+        self.register_transform = self._transform.register_transform
+        self.unregister_transform = self._transform.unregister_transform
+
+    def _init_isolated(self, search_path):
+        default = AstroidManager()
+        self._build_locks = _BuildLocks()
+        self._init_state()
+        self.isolated = True
+        if search_path is not None:
+            search_path = list(search_path)
+        self.search_path = search_path
+        self.always_load_extensions = default.always_load_extensions
+        self.optimize_ast = default.optimize_ast
+        self.extension_package_whitelist = set(default.extension_package_whitelist)
+        self._failed_import_hooks = list(default._failed_import_hooks)
+        for node_class, entries in default._transform.transforms.items():
+            self._transform.transforms[node_class] = list(entries)
+        self._share_builtins(default)
+
+    def _share_builtins(self, default):
+        # The builtins module is bootstrapped when raw_building is imported.
+        import astroid.raw_building # pylint: disable=unused-variable
+        builtins = default.astroid_cache[six.moves.builtins.__name__]
+        self.astroid_cache[builtins.name] = builtins
+
+    def visit_transforms(self, node, children=None):
+        """Visit the transforms and apply them to the given *node*.
+
+        If *children* is given, only these children of the module are visited.
+        """
+        return self._transform.visit(node, children)
 
     def ast_from_file(self, filepath, modname=None, fallback=True, source=False):
         """given a module name, return the astroid object"""
@@ -73,16 +373,58 @@ class AstroidManager(object):
                 modname = '.'.join(modutils.modpath_from_file(filepath))
             except ImportError:
                 modname = filepath
-        if modname in self.astroid_cache and self.astroid_cache[modname].file == filepath:
-            return self.astroid_cache[modname]
+        module = self._cached_module(modname)
+        if module is not None and module.file == filepath:
+            return module
         if source:
-            from astroid.builder import AstroidBuilder
-            return AstroidBuilder(self).file_build(filepath, modname)
+            with self._build_locks.hold(modname):
+                module = self.astroid_cache.get(modname)
+                if module is not None and module.file == filepath:
+                    return module
+                return self._build_from_file(filepath, modname)
         elif fallback and modname:
             return self.ast_from_module_name(modname)
         raise exceptions.AstroidBuildingError(
             'Unable to build an AST for {path}.', path=filepath)
 
+    def _build_from_file(self, filepath, modname):
+        disk_cache = self._get_disk_cache()
+        if disk_cache is not None:
+            module = disk_cache.load(filepath, modname)
+            if module is not None:
+                stat = os.stat(filepath)
+                module._source_stat = (stat.st_mtime, stat.st_size)
+                self.cache_module(module)
+                return module
+        from astroid.builder import AstroidBuilder
+        module = AstroidBuilder(self).file_build(filepath, modname)
+        if disk_cache is not None:
+            disk_cache.store(module)
+        return module
+
+    def _cached_module(self, modname):
+        """Get the cached module with the given name, unless it is still
+        being built by another thread.
+        """
+        owner = self._build_locks.owner(modname)
+        if owner is not None and owner != _thread.get_ident():
+            return None
+        module = self.astroid_cache.get(modname)
+        if module is None:
+            self.stats.miss('astroid_cache')
+        else:
+            self.stats.hit('astroid_cache')
+        return module
+
+    def _get_disk_cache(self):
+        if self.cache_directory is None:
+            return None
+        if (self._disk_cache is None
+                or self._disk_cache.directory != self.cache_directory):
+            from astroid import diskcache
+            self._disk_cache = diskcache.DiskCache(self.cache_directory, self)
+        return self._disk_cache
+
     def _build_stub_module(self, modname):
         from astroid.builder import AstroidBuilder
         return AstroidBuilder(self).string_build('', modname)
@@ -101,15 +443,100 @@ class AstroidManager(object):
             '.'.join(parts[:x]) in self.extension_package_whitelist
             for x in range(1, len(parts) + 1))
 
-    def ast_from_module_name(self, modname, context_file=None):
-        """given a module name, return the astroid object"""
-        if modname in self.astroid_cache:
-            return self.astroid_cache[modname]
+    def ast_from_module_name(self, modname, context_file=None, lazy=False):
+        """given a module name, return the astroid object
+
+        If *lazy* is true and the module isn't built yet, a module found
+        in a source file is returned as a lazy module, which is built
+        the first time its contents are used.
+        """
+        module = self._cached_module(modname)
+        if module is not None:
+            return module
         if modname == '__main__':
             return self._build_stub_module(modname)
-        old_cwd = os.getcwd()
-        if context_file:
-            os.chdir(os.path.dirname(context_file))
+        self._raise_cached_failure(('module', modname, context_file))
+        with self._build_locks.hold(modname):
+            # Either built by another thread in the meantime or,
+            # when waiting would deadlock, partially built.
+            module = self.astroid_cache.get(modname)
+            if module is not None:
+                return module
+            if lazy:
+                module = self._lazy_module(modname, context_file)
+                if module is not None:
+                    return module
+            return self._build_from_module_name(modname, context_file)
+
+    def _lazy_module(self, modname, context_file):
+        try:
+            spec = self.file_from_module_name(modname, context_file)
+        except exceptions.AstroidBuildingError:
+            # Built eagerly, giving a chance to the failed import hooks.
+            return None
+        if spec.type != modutils.ModuleType.PY_SOURCE or spec.location is None:
+            return None
+        from astroid import scoped_nodes
+        filepath = os.path.abspath(spec.location)
+        package = os.path.splitext(os.path.basename(filepath))[0] == '__init__'
+        module = scoped_nodes.LazyModule(modname, filepath, package=package,
+                                         context_file=context_file)
+        if self.isolated:
+            module.manager = self
+        self.astroid_cache[modname] = module
+        return module
+
+    def build_lazy_module(self, lazy):
+        """Build the tree of the given lazy module, which becomes a plain
+        module replacing it in the cache.
+
+        Return the module holding the tree: *lazy* itself, unless it is
+        used again while being built, as it happens for import cycles,
+        in which case the module built so far is returned. If the module
+        can't be built, the error is raised, again each time it is used.
+        """
+        from astroid import node_classes
+        from astroid import scoped_nodes
+        modname = lazy.name
+        with self._build_locks.hold(modname):
+            if not isinstance(lazy, scoped_nodes.LazyModule):
+                # Built by another thread in the meantime.
+                return lazy
+            if lazy._building:
+                partial = self.astroid_cache.get(modname)
+                if partial is None or partial is lazy:
+                    partial = scoped_nodes.Module(modname, None, lazy.file,
+                                                  lazy.path, lazy.package)
+                return partial
+            if lazy._build_error is not None:
+                # The traceback of the first failure isn't kept.
+                raise copy.copy(lazy._build_error)
+            lazy._building = True
+            if self.astroid_cache.get(modname) is lazy:
+                # The module being built is the one found in the cache.
+                del self.astroid_cache[modname]
+            try:
+                module = self._build_from_file(lazy.file, modname)
+            except exceptions.AstroidBuildingError as error:
+                self.astroid_cache.pop(modname, None)
+                self._cache_failure(('module', modname, lazy._context_file), error)
+                lazy._building = False
+                lazy._build_error = copy.copy(error)
+                util.reraise(error)
+            for child in module.body:
+                child.parent = lazy
+            # The lazy module takes the attributes of the built one and
+            # shares its __dict__, in case the latter is referenced by nodes
+            # built meanwhile.
+            lazy.__class__ = module.__class__
+            lazy.__dict__ = module.__dict__
+            for name, value in node_classes._slot_values(module).items():
+                setattr(lazy, name, value)
+            # Cached once built, for its size to be the one of its tree.
+            self.astroid_cache[modname] = lazy
+        return lazy
+
+    def _build_from_module_name(self, modname, context_file):
         try:
             spec = self.file_from_module_name(modname, context_file)
             if spec.type == modutils.ModuleType.PY_ZIPMODULE:
@@ -119,8 +546,15 @@ class AstroidManager(object):
             elif spec.type in (modutils.ModuleType.C_BUILTIN, modutils.ModuleType.C_EXTENSION):
                 if spec.type == modutils.ModuleType.C_EXTENSION and not self._can_load_extension(modname):
                     return self._build_stub_module(modname)
+                search_path = None
+                if spec.type == modutils.ModuleType.C_EXTENSION:
+                    search_path = self.search_path
+                    if context_file:
+                        search_path = modutils.search_path_from_context(
+                            context_file, search_path)
                 try:
-                    module = modutils.load_module_from_name(modname)
+                    with self.stats.timer(modname, astroid_stats.LIVE_IMPORT):
+                        module = modutils.load_module_from_name(modname, search_path)
                 except Exception as ex: # pylint: disable=broad-except
                     util.reraise(exceptions.AstroidImportError(
                         'Loading {modname} failed with:\n{error}',
@@ -143,9 +577,94 @@ class AstroidManager(object):
                     return hook(modname)
                 except exceptions.AstroidBuildingError:
                     pass
+            self._cache_failure(('module', modname, context_file), e)
             raise e
+
+    def iter_ast_from_directory(self, directory, blacklist=(), list_all=False,
+                                workers=0, queue_size=64):
+        """Build the modules of the package in *directory* as their files
+        are found by :func:`~astroid.modutils.iter_module_files`.
+
+        Generate ``(filepath, module)`` pairs, where *module* is the error
+        raised if the module couldn't be built. When *workers* is
+        positive, the files are walked by a separate thread while the
+        modules are built by *workers* threads, in the order they finish,
+        with at most *queue_size* files waiting to be built.
+        """
+        files = modutils.iter_module_files(directory, blacklist, list_all)
+        if workers <= 0:
+            for filepath in files:
+                yield filepath, self._build_or_error(filepath)
+            return
+        for result in self._build_in_parallel(files, workers, queue_size):
+            yield result
+
+    def _build_or_error(self, filepath):
+        try:
+            return self.ast_from_file(filepath)
+        except exceptions.AstroidBuildingError as exc:
+            return exc
+
+    def _build_in_parallel(self, files, workers, queue_size):
+        paths = six.moves.queue.Queue(queue_size)
+        results = six.moves.queue.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def put_path(item):
+            while not stop.is_set():
+                try:
+                    paths.put(item, timeout=0.1)
+                    return True
+                except six.moves.queue.Full:
+                    pass
+            return False
+
+        def walk():
+            try:
+                for filepath in files:
+                    if not put_path(filepath):
+                        return
+            except Exception: # pylint: disable=broad-except
+                results.put((done, sys.exc_info()))
+            for _ in range(workers):
+                put_path(done)
+
+        def build():
+            while not stop.is_set():
+                try:
+                    filepath = paths.get(timeout=0.1)
+                except six.moves.queue.Empty:
+                    continue
+                if filepath is done:
+                    break
+                try:
+                    results.put((filepath, self._build_or_error(filepath)))
+                except Exception: # pylint: disable=broad-except
+                    results.put((done, sys.exc_info()))
+            results.put((done, None))
+
+        threads = [threading.Thread(target=walk)]
+        threads.extend(threading.Thread(target=build) for _ in range(workers))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        running = workers
+        try:
+            while running:
+                filepath, module = results.get()
+                if filepath is not done:
+                    yield filepath, module
+                elif module is None:
+                    running -= 1
+                else:
+                    six.reraise(*module)
         finally:
-            os.chdir(old_cwd)
+            stop.set()
+            # Not to leave threads building modules, or tearing down
+            # their caches, once done.
+            for thread in threads:
+                thread.join()
 
     def zip_import_data(self, filepath):
         if zipimport is None:
@@ -158,12 +677,12 @@ class AstroidManager(object):
             except ValueError:
                 continue
             try:
-                importer = zipimport.zipimporter(eggpath + ext)
+                source, package = modutils.zip_module_source(eggpath + ext,
+                                                             resource)
                 zmodname = resource.replace(os.path.sep, '.')
-                if importer.is_package(resource):
+                if package:
                     zmodname = zmodname + '.__init__'
-                module = builder.string_build(importer.get_source(resource),
-                                              zmodname, filepath)
+                module = builder.string_build(source, zmodname, filepath)
                 return module
             except Exception: # pylint: disable=broad-except
                 continue
@@ -172,28 +691,79 @@ class AstroidManager(object):
     def file_from_module_name(self, modname, contextfile):
         try:
             value = self._mod_file_cache[(modname, contextfile)]
-            traceback = sys.exc_info()[2]
         except KeyError:
-            try:
-                value = modutils.file_info_from_modpath(
-                    modname.split('.'), context_file=contextfile)
-                traceback = sys.exc_info()[2]
-            except ImportError as ex:
-                value = exceptions.AstroidImportError(
-                    'Failed to import module {modname} with error:\n{error}.',
-                    modname=modname, error=ex)
-                traceback = sys.exc_info()[2]
-            self._mod_file_cache[(modname, contextfile)] = value
-        if isinstance(value, exceptions.AstroidBuildingError):
-            six.reraise(exceptions.AstroidBuildingError,
-                        value, traceback)
+            self.stats.miss('_mod_file_cache')
+        else:
+            self.stats.hit('_mod_file_cache')
+            return value
+        self._raise_cached_failure(('spec', modname, contextfile))
+        # Relative entries of sys.path are searched from the directory
+        # of the context file, without changing the working directory.
+        path = self.search_path
+        if contextfile:
+            path = modutils.search_path_from_context(contextfile, path)
+        try:
+            value = modutils.file_info_from_modpath(
+                modname.split('.'), path=path, context_file=contextfile)
+        except ImportError as ex:
+            error = exceptions.AstroidImportError(
+                'Failed to import module {modname} with error:\n{error}.',
+                modname=modname, error=ex)
+            self._cache_failure(('spec', modname, contextfile), error)
+            util.reraise(error)
+        self._mod_file_cache[(modname, contextfile)] = value
         return value
 
+    def _raise_cached_failure(self, key):
+        """Raise the error of a previous lookup which failed, if any.
+
+        Failures are forgotten when the search path changes, when they are
+        older than :attr:`negative_cache_ttl` seconds, or when the caches
+        are invalidated or refreshed.
+        """
+        negative_cache = self._negative_cache
+        if not negative_cache or key not in negative_cache:
+            return
+        if self._negative_cache_path != self._search_path():
+            self._negative_cache = None
+            return
+        error, expiry = negative_cache.get(key, (None, None))
+        if error is None:
+            return
+        if expiry is not None and expiry < time.time():
+            negative_cache.pop(key, None)
+            return
+        self.stats.hit('negative_cache')
+        # A new error each time, not to chain the traceback of every
+        # lookup to the cached one.
+        raise copy.copy(error)
+
+    def _cache_failure(self, key, error):
+        search_path = self._search_path()
+        if self._negative_cache is None or self._negative_cache_path != search_path:
+            self._negative_cache = {}
+            self._negative_cache_path = list(search_path)
+        expiry = None
+        if self.negative_cache_ttl is not None:
+            expiry = time.time() + self.negative_cache_ttl
+        # The error is raised afterwards, with a traceback which isn't kept.
+        self._negative_cache[key] = (copy.copy(error), expiry)
+
+    def _search_path(self):
+        if self.search_path is None:
+            return sys.path
+        return self.search_path
+
+    def clear_negative_cache(self):
+        """Forget the failed module lookups."""
+        self._negative_cache = None
+
     def ast_from_module(self, module, modname=None):
         """given an imported module, return the astroid object"""
         modname = modname or module.__name__
-        if modname in self.astroid_cache:
-            return self.astroid_cache[modname]
+        cached = self._cached_module(modname)
+        if cached is not None:
+            return cached
         try:
             # some builtin modules don't have __file__ attribute
             filepath = module.__file__
@@ -201,8 +771,12 @@ class AstroidManager(object):
                 return self.ast_from_file(filepath, modname)
         except AttributeError:
             pass
-        from astroid.builder import AstroidBuilder
-        return AstroidBuilder(self).module_build(module, modname)
+        with self._build_locks.hold(modname):
+            cached = self.astroid_cache.get(modname)
+            if cached is not None:
+                return cached
+            from astroid.builder import AstroidBuilder
+            return AstroidBuilder(self).module_build(module, modname)
 
     def ast_from_class(self, klass, modname=None):
         """get astroid for the given class"""
@@ -260,14 +834,120 @@ class AstroidManager(object):
         otherwise, it must raise `AstroidBuildingError`.
         """
         self._failed_import_hooks.append(hook)
+        # The new hook may resolve the imports which failed so far.
+        self.clear_negative_cache()
 
     def cache_module(self, module):
         """Cache a module if no module with the same name is known yet."""
         self.astroid_cache.setdefault(module.name, module)
 
+    def add_dependency(self, module, modname):
+        """Record that *module* holds nodes coming from the module *modname*.
+
+        *module* is invalidated along with *modname* by :meth:`invalidate`.
+        """
+        if modname and modname != module.name:
+            module._dependencies = module._dependencies | frozenset((modname,))
+
+    def invalidate(self, modname):
+        """Remove the given module from the cache, along with the modules
+        holding nodes which come from it, so that they are rebuilt the next
+        time they are requested.
+
+        Return the set of the names of the invalidated modules.
+        """
+        invalidated = set()
+        pending = [modname]
+        while pending:
+            name = pending.pop()
+            if name in invalidated or name == six.moves.builtins.__name__:
+                continue
+            invalidated.add(name)
+            self.astroid_cache.pop(name, None)
+            for key in [key for key in list(self._mod_file_cache) if key[0] == name]:
+                self._mod_file_cache.pop(key, None)
+            if self._negative_cache:
+                for key in [key for key in list(self._negative_cache) if key[1] == name]:
+                    self._negative_cache.pop(key, None)
+            pending.extend(dependent for dependent, module in self.astroid_cache.items()
+                           if name in module._dependencies)
+        return invalidated
+
+    def refresh(self):
+        """Rebuild the cached modules whose source file changed since they
+        were built, as well as the modules depending on them.
+
+        Only the modification time and the size of the files are checked.
+        Return the set of the names of the invalidated modules.
+        """
+        modutils.refresh_path_index()
+        modutils.clear_standard_module_cache()
+        self.clear_negative_cache()
+        files = {}
+        stale = []
+        for modname, module in self.astroid_cache.items():
+            if module._source_stat is None:
+                continue
+            files[modname] = module.file
+            try:
+                stat = os.stat(module.file)
+            except OSError:
+                stale.append(modname)
+                continue
+            if (stat.st_mtime, stat.st_size) != module._source_stat:
+                stale.append(modname)
+
+        invalidated = set()
+        for modname in stale:
+            invalidated |= self.invalidate(modname)
+        for modname in sorted(invalidated):
+            try:
+                if modname in files and os.path.exists(files[modname]):
+                    self.ast_from_file(files[modname], modname)
+                else:
+                    self.ast_from_module_name(modname)
+            except exceptions.AstroidBuildingError:
+                # Removed or now broken, it will fail again when requested.
+                pass
+        return invalidated
+
+    def prewarm(self, modnames, freeze=False):
+        """Build the given modules ahead of time, e.g. before forking workers.
+
+        The modules are pinned in the cache so that they are never evicted.
+        If *freeze* is true, a garbage collection is done and the surviving
+        objects are moved to the permanent generation of the garbage
+        collector (see :func:`gc.freeze`), so that the collections done in
+        the forked processes don't write to the memory pages they share
+        with their parent. :func:`gc.freeze` is only available from
+        Python 3.7: on older interpreters, *freeze* only does the garbage
+        collection and doesn't keep the pages shared.
+
+        Return a dictionary mapping the names of the modules which
+        couldn't be built to the error raised while building them.
+        """
+        failed = {}
+        for modname in modnames:
+            try:
+                self.ast_from_module_name(modname)
+            except exceptions.AstroidBuildingError as exc:
+                failed[modname] = exc
+                continue
+            self.astroid_cache.pin(modname)
+        if freeze:
+            gc.collect()
+            if hasattr(gc, 'freeze'):
+                gc.freeze()
+        return failed
+
     def clear_cache(self, astroid_builtin=None):
         # XXX clear transforms
         self.astroid_cache.clear()
+        self.clear_negative_cache()
+        if self.isolated:
+            self._mod_file_cache.clear()
+            self._share_builtins(AstroidManager())
+            return
         # force bootstrap again, else we may ends up with cache inconsistency
         # between the manager and CONST_PROXY, making
         # unittest_lookup.LookupTC.test_builtin_lookup fail depending on the
@@ -16,6 +16,7 @@ from astroid import exceptions
 
 class BlockRangeMixIn(object):
     """override block range """
+    __slots__ = ()
 
     @decorators.cachedproperty
     def blockstart_tolineno(self):
@@ -36,6 +37,7 @@ class BlockRangeMixIn(object):
 
 class FilterStmtsMixin(object):
     """Mixin for statement filtering and assignment type"""
+    __slots__ = ()
 
     def _get_filtered_stmts(self, _, node, _stmts, mystmt):
         """method used in _filter_stmts to get statements and trigger break"""
@@ -57,6 +59,7 @@ class FilterStmtsMixin(object):
 
 
 class AssignTypeMixin(object):
+    __slots__ = ()
 
     def assign_type(self):
         return self
@@ -80,6 +83,7 @@ class AssignTypeMixin(object):
 
 
 class ParentAssignTypeMixin(AssignTypeMixin):
+    __slots__ = ()
 
     def assign_type(self):
         return self.parent.assign_type()
@@ -94,6 +98,7 @@ class ParentAssignTypeMixin(AssignTypeMixin):
 
 class ImportFromMixin(FilterStmtsMixin):
     """MixIn for From and Import Nodes"""
+    __slots__ = ()
 
     def _infer_name(self, frame, name):
         return name
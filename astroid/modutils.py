@@ -23,10 +23,13 @@
 import abc
 import collections
 import enum
+import fnmatch
 import imp
 import os
 import platform
+import posixpath
 import sys
+import threading
 from distutils.sysconfig import get_python_lib # pylint: disable=import-error
 # pylint: disable=import-error, no-name-in-module
 from distutils.errors import DistutilsPlatformError
@@ -34,9 +37,10 @@ from distutils.errors import DistutilsPlatformError
 # distutils is replaced by virtualenv with a module that does
 # weird path manipulations in order to get to the
 # real distutils module.
-import zipimport
+import zipfile
 try:
     import importlib.machinery
+    import importlib.util
     _HAS_MACHINERY = True
 except ImportError:
     _HAS_MACHINERY = False
@@ -45,6 +49,13 @@ try:
     import pkg_resources
 except ImportError:
     pkg_resources = None
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir # pylint: disable=import-error
+    except ImportError:
+        scandir = None
 import six
 
 ModuleType = enum.Enum('ModuleType', 'C_BUILTIN C_EXTENSION PKG_DIRECTORY '
@@ -405,6 +416,28 @@ def file_info_from_modpath(modpath, path=None, context_file=None):
     return _spec_from_modpath(modpath, path, context)
 
 
+def search_path_from_context(context_file, path=None):
+    """return the list of directories where the modules imported from
+    the given file are searched
+
+    :type context_file: str
+    :param context_file: the file the modules are imported from
+
+    :type path: list or None
+    :param path:
+      optional list of path, sys.path if nothing or None is given
+
+    :rtype: list(str)
+    :return:
+      the given path, where relative entries are considered relative
+      to the directory of the context file instead of the working directory
+    """
+    context = os.path.dirname(os.path.abspath(context_file))
+    return [entry if os.path.isabs(entry)
+            else os.path.normpath(os.path.join(context, entry))
+            for entry in (path or sys.path)]
+
+
 def get_module_part(dotted_name, context_file=None):
     """given a dotted name return the module part of the name :
 
@@ -499,6 +532,81 @@ def get_module_files(src_directory, blacklist, list_all=False):
     return files
 
 
+def _scan_directory(directory):
+    """Get the names of the subdirectories which aren't symbolic links
+    and of the other files of *directory*.
+    """
+    dirnames = []
+    filenames = []
+    if scandir is not None:
+        for entry in scandir(directory):
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    dirnames.append(entry.name)
+            else:
+                filenames.append(entry.name)
+    else:
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if os.path.isdir(path):
+                if not os.path.islink(path):
+                    dirnames.append(name)
+            else:
+                filenames.append(name)
+    return dirnames, filenames
+
+
+def iter_module_files(src_directory, blacklist=(), list_all=False):
+    """given a package directory, generate the python module's files of the
+    package and its subpackages as they are found
+
+    Unlike :func:`get_module_files`, the tree isn't walked completely
+    before the first file is returned and the directories are listed
+    with :func:`os.scandir` when available, which saves a stat call per
+    entry. Unreadable directories are skipped.
+
+    :type src_directory: str
+    :param src_directory:
+      path of the directory corresponding to the package
+
+    :type blacklist: list or tuple
+    :param blacklist:
+      glob patterns of the names of the files or directories to ignore
+
+    :type list_all: bool
+    :param list_all:
+        get files from all paths, including ones without __init__.py
+
+    :rtype: iterator
+    :return:
+      an iterator on the python module's files in the package and its
+      subpackages
+    """
+    pending = [src_directory]
+    while pending:
+        directory = pending.pop()
+        try:
+            dirnames, filenames = _scan_directory(directory)
+        except OSError:
+            continue
+        if blacklist:
+            dirnames = [name for name in dirnames
+                        if not _is_blacklisted(name, blacklist)]
+            filenames = [name for name in filenames
+                         if not _is_blacklisted(name, blacklist)]
+        if not list_all and '__init__.py' not in filenames:
+            continue
+        for filename in filenames:
+            if _is_python_file(filename):
+                yield os.path.join(directory, filename)
+        pending.extend(os.path.join(directory, dirname)
+                       for dirname in reversed(dirnames))
+
+
+def _is_blacklisted(name, blacklist):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in blacklist)
+
+
 def get_source_file(filename, include_no_ext=False):
     """given a python module's file name return the matching source file
     name (the filename will be returned identically if it's a already an
@@ -532,10 +640,61 @@ def is_python_source(filename):
     return os.path.splitext(filename)[1][1:] in PY_SOURCE_EXTS
 
 
+# (modname, std_path) -> result of is_standard_module, for _STD_MODULE_PATH
+_STD_MODULE_CACHE = {}
+_STD_MODULE_PATH = None
+# names of the modules of the standard library directories, None if not
+# computed yet, False if they couldn't be listed
+_STD_MODULE_NAMES = None
+
+
+def clear_standard_module_cache():
+    """forget the results of `is_standard_module`
+
+    They are forgotten as well when sys.path changes.
+    """
+    global _STD_MODULE_PATH, _STD_MODULE_NAMES # pylint: disable=global-statement
+    _STD_MODULE_CACHE.clear()
+    _STD_MODULE_PATH = None
+    _STD_MODULE_NAMES = None
+
+
+def _standard_module_names():
+    """get the names of the modules which can be found in the standard
+    library directories, or False if some of them can't be listed
+    """
+    names = set(sys.builtin_module_names)
+    std_dirs = [_cache_normalize_path(path) for path in STD_LIB_DIRS]
+    ext_dir = _cache_normalize_path(EXT_LIB_DIR)
+    directories = set(std_dirs)
+    for entry in sys.path:
+        entry = _cache_normalize_path(entry)
+        if entry.startswith(ext_dir):
+            continue
+        if any(entry.startswith(std_dir) for std_dir in std_dirs):
+            directories.add(entry)
+    for directory in directories:
+        if not os.path.isdir(directory):
+            if os.path.exists(directory):
+                # Zipped standard library.
+                return False
+            continue
+        try:
+            listing = _DirectoryListing(directory)
+        except OSError:
+            return False
+        names.update(listing.modules)
+        names.update(listing.directories)
+    return names
+
+
 def is_standard_module(modname, std_path=None):
     """try to guess if a module is a standard python module (by default,
     see `std_path` parameter's description)
 
+    The results are cached until sys.path changes or
+    `clear_standard_module_cache` is called.
+
     :type modname: str
     :param modname: name of the module we are interested in
 
@@ -549,7 +708,28 @@ def is_standard_module(modname, std_path=None):
       - is located on the path listed in one of the directory in `std_path`
       - is a built-in module
     """
+    global _STD_MODULE_PATH, _STD_MODULE_NAMES # pylint: disable=global-statement
     modname = modname.split('.')[0]
+    if _STD_MODULE_PATH != sys.path:
+        clear_standard_module_cache()
+        _STD_MODULE_PATH = list(sys.path)
+    key = (modname, None if std_path is None else tuple(std_path))
+    try:
+        return _STD_MODULE_CACHE[key]
+    except KeyError:
+        pass
+    if std_path is None:
+        if _STD_MODULE_NAMES is None:
+            _STD_MODULE_NAMES = _standard_module_names()
+        if _STD_MODULE_NAMES is not False and modname not in _STD_MODULE_NAMES:
+            # Whatever it resolves to, it isn't in the standard library.
+            _STD_MODULE_CACHE[key] = False
+            return False
+    result = _STD_MODULE_CACHE[key] = _is_standard_module(modname, std_path)
+    return result
+
+
+def _is_standard_module(modname, std_path):
     try:
         filename = file_from_modpath([modname])
     except ImportError:
@@ -638,31 +818,141 @@ def _spec_from_modpath(modpath, path=None, context=None):
     return spec
 
 
-def _search_zip(modpath, pic):
-    for filepath, importer in list(pic.items()):
-        if importer is not None:
-            found = importer.find_module(modpath[0])
-            if found:
-                if not importer.find_module(os.path.sep.join(modpath)):
-                    raise ImportError('No module named %s in %s/%s' % (
-                        '.'.join(modpath[1:]), filepath, modpath))
-                #import code; code.interact(local=locals())
-                return (ModuleType.PY_ZIPMODULE,
-                        os.path.abspath(filepath) + os.path.sep + os.path.sep.join(modpath),
-                        filepath)
-    raise ImportError('No module named %s' % '.'.join(modpath))
+_ZIP_MODULE_SUFFIXES = ('.py', '.pyc', '.pyo')
 
 
-def _precache_zipimporters(path=None):
-    pic = sys.path_importer_cache
-    path = path or sys.path
-    for entry_path in path:
-        if entry_path not in pic:
-            try:
-                pic[entry_path] = zipimport.zipimporter(entry_path)
-            except zipimport.ZipImportError:
+class _ZipArchive(object):
+    """The modules contained in a zip archive, indexed once, and an open
+    handle on the archive for reading their sources.
+    """
+
+    def __init__(self, path, stamp):
+        self.path = path
+        self.stamp = stamp
+        self._lock = threading.Lock()
+        self._zipfile = zipfile.ZipFile(path)
+        self.names = set(self._zipfile.namelist())
+        # slash separated paths of the modules and packages
+        self.modules = set()
+        for name in self.names:
+            base, ext = posixpath.splitext(name)
+            if ext not in _ZIP_MODULE_SUFFIXES:
                 continue
-    return pic
+            if posixpath.basename(base) == '__init__':
+                self.modules.add(posixpath.dirname(base))
+            else:
+                self.modules.add(base)
+
+    def get_source(self, resource):
+        """Get the source of the module at *resource*, a slash separated
+        path in the archive, and whether it's a package.
+        """
+        for name, package in ((resource + '/__init__.py', True),
+                              (resource + '.py', False)):
+            if name in self.names:
+                with self._lock:
+                    data = self._zipfile.read(name)
+                if _HAS_MACHINERY and six.PY3:
+                    return importlib.util.decode_source(data), package
+                return data, package
+        raise ImportError('No source for %s in %s' % (resource, self.path))
+
+    def close(self):
+        self._zipfile.close()
+
+
+# archive path -> _ZipArchive
+_ZIP_ARCHIVES = {}
+# search path entry -> (archive path, prefix in the archive) or None
+_ZIP_PATH_ENTRIES = {}
+_ZIP_LOCK = threading.Lock()
+
+
+def _zip_archive(path):
+    """Get the index of the zip archive at *path*, built again when
+    the archive changed, or None if it can't be read.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    stamp = (stat.st_mtime, stat.st_size)
+    with _ZIP_LOCK:
+        archive = _ZIP_ARCHIVES.get(path)
+        if archive is not None and archive.stamp == stamp:
+            return archive
+        if archive is not None:
+            archive.close()
+        try:
+            archive = _ZipArchive(path, stamp)
+        except (IOError, OSError, zipfile.BadZipfile):
+            _ZIP_ARCHIVES.pop(path, None)
+            return None
+        _ZIP_ARCHIVES[path] = archive
+        return archive
+
+
+def _zip_path_entry(entry):
+    """Get the archive and the prefix in the archive of a search path
+    entry, if it's in a zip archive.
+    """
+    try:
+        return _ZIP_PATH_ENTRIES[entry]
+    except KeyError:
+        pass
+    result = None
+    archive, prefix = os.path.abspath(entry), ''
+    while archive and not os.path.isfile(archive):
+        head, tail = os.path.split(archive)
+        if head == archive:
+            break
+        archive, prefix = head, posixpath.join(tail, prefix)
+    if os.path.isfile(archive) and zipfile.is_zipfile(archive):
+        result = (archive, prefix)
+    _ZIP_PATH_ENTRIES[entry] = result
+    return result
+
+
+def zip_module_source(archive, resource):
+    """Get the source of a module in a zip archive and whether it's a
+    package.
+
+    The content of the archive is indexed once, until it is modified,
+    and read through a single open handle.
+
+    :type archive: str
+    :param archive: path of the zip archive
+
+    :type resource: str
+    :param resource:
+      path of the module in the archive, without extension, as found
+      in the location of the module's spec
+
+    :raise ImportError: if the source of the module isn't in the archive
+    """
+    zip_archive = _zip_archive(os.path.abspath(archive))
+    if zip_archive is None:
+        raise ImportError('Unable to read %s' % archive)
+    return zip_archive.get_source(resource.replace(os.path.sep, '/'))
+
+
+def _search_zip(modpath, path):
+    for entry in path:
+        found = _zip_path_entry(entry)
+        if found is None:
+            continue
+        zip_archive = _zip_archive(found[0])
+        if zip_archive is None:
+            continue
+        prefix = found[1]
+        if posixpath.join(prefix, modpath[0]) in zip_archive.modules:
+            if posixpath.join(prefix, *modpath) not in zip_archive.modules:
+                raise ImportError('No module named %s in %s/%s' % (
+                    '.'.join(modpath[1:]), entry, modpath))
+            return (ModuleType.PY_ZIPMODULE,
+                    os.path.abspath(entry) + os.path.sep + os.path.sep.join(modpath),
+                    entry)
+    raise ImportError('No module named %s' % '.'.join(modpath))
 
 
 def _is_namespace(modname):
@@ -718,6 +1008,11 @@ class ImpFinder(Finder):
         try:
             stream, mp_filename, mp_desc = imp.find_module(modname, submodule_path)
         except ImportError:
+            if (not processed and submodule_path is not None
+                    and (imp.is_builtin(modname) or imp.is_frozen(modname))):
+                # Found without an explicit path, as it would be by an import.
+                return ModuleSpec(name=modname, location=None,
+                                  type=ModuleType.C_BUILTIN)
             return None
 
         # Close resources.
@@ -742,15 +1037,73 @@ class ImpFinder(Finder):
         return path
 
 
-class ZipFinder(Finder):
+if _HAS_MACHINERY:
+    _FILE_FINDER_DETAILS = (
+        (importlib.machinery.ExtensionFileLoader, importlib.machinery.EXTENSION_SUFFIXES),
+        (importlib.machinery.SourceFileLoader, importlib.machinery.SOURCE_SUFFIXES),
+        (importlib.machinery.SourcelessFileLoader, importlib.machinery.BYTECODE_SUFFIXES),
+    )
+    _LOADER_TYPES = (
+        (importlib.machinery.ExtensionFileLoader, ModuleType.C_EXTENSION),
+        (importlib.machinery.SourceFileLoader, ModuleType.PY_SOURCE),
+        (importlib.machinery.SourcelessFileLoader, ModuleType.PY_COMPILED),
+    )
+# directory -> importlib.machinery.FileFinder, which caches the directory
+# content until its modification time changes
+_FILE_FINDERS = {}
+
+
+def _file_finder(directory):
+    # Relative entries are relative to the current working directory.
+    directory = os.path.abspath(directory)
+    try:
+        return _FILE_FINDERS[directory]
+    except KeyError:
+        finder = importlib.machinery.FileFinder(directory, *_FILE_FINDER_DETAILS)
+        _FILE_FINDERS[directory] = finder
+        return finder
+
+
+class ImportlibFinder(ImpFinder):
+    """Find modules with the path entry finders of importlib.
+
+    The finders are kept between lookups, so that the directories are
+    listed once instead of being probed for each module.
+    """
+
+    def find_module(self, modname, module_parts, processed, submodule_path):
+        if submodule_path is None:
+            if importlib.machinery.BuiltinImporter.find_spec(modname) is not None:
+                return ModuleSpec(name=modname, type=ModuleType.C_BUILTIN)
+            if importlib.machinery.FrozenImporter.find_spec(modname) is not None:
+                return ModuleSpec(name=modname, type=ModuleType.PY_FROZEN)
+            search_path = sys.path
+        else:
+            search_path = submodule_path
+        for entry in search_path:
+            spec = _file_finder(entry).find_spec(modname)
+            if spec is None or spec.loader is None:
+                # Namespace package portions are handled by PEP420SpecFinder.
+                continue
+            if spec.submodule_search_locations:
+                return ModuleSpec(name=modname, type=ModuleType.PKG_DIRECTORY,
+                                  location=os.path.dirname(spec.origin))
+            for loader_class, module_type in _LOADER_TYPES:
+                if isinstance(spec.loader, loader_class):
+                    return ModuleSpec(name=modname, type=module_type,
+                                      location=spec.origin)
+        if not processed and submodule_path is not None:
+            # Found without an explicit path, as it would be by an import.
+            if importlib.machinery.BuiltinImporter.find_spec(modname) is not None:
+                return ModuleSpec(name=modname, type=ModuleType.C_BUILTIN)
+        return None
 
-    def __init__(self, path):
-        super(ZipFinder, self).__init__(path)
-        self._zipimporters = _precache_zipimporters(path)
+
+class ZipFinder(Finder):
 
     def find_module(self, modname, module_parts, processed, submodule_path):
         try:
-            file_type, filename, path = _search_zip(module_parts, self._zipimporters)
+            file_type, filename, path = _search_zip(module_parts, self._path)
         except ImportError:
             return None
 
@@ -777,11 +1130,213 @@ class PEP420SpecFinder(Finder):
         return None
 
 
+# Path index.
+
+if sys.version_info >= (3, 0):
+    _PACKAGE_INITS = ('__init__.py', '__init__' + importlib.machinery.BYTECODE_SUFFIXES[0])
+else:
+    _PACKAGE_INITS = ('__init__.py', '__init__.pyc', '__init__.pyo')
+
+
+class _DirectoryListing(object):
+    """The modules and the subdirectories of a directory, scanned once."""
+
+    def __init__(self, directory):
+        self.files = set()
+        self.directories = set()
+        # module name -> (priority, file name, module type)
+        self.modules = {}
+        if scandir is not None:
+            for entry in scandir(directory):
+                if entry.is_dir():
+                    self.directories.add(entry.name)
+                elif entry.is_file():
+                    self.files.add(entry.name)
+        else:
+            for name in os.listdir(directory):
+                if os.path.isdir(os.path.join(directory, name)):
+                    self.directories.add(name)
+                else:
+                    self.files.add(name)
+        suffixes = imp.get_suffixes()
+        for filename in self.files:
+            for priority, (suffix, _, imp_type) in enumerate(suffixes):
+                if not filename.endswith(suffix):
+                    continue
+                modname = filename[:-len(suffix)]
+                if not modname or '.' in modname:
+                    continue
+                known = self.modules.get(modname)
+                if known is None or known[0] > priority:
+                    self.modules[modname] = (priority, filename,
+                                             _imp_type_to_module_type(imp_type))
+
+
+class _PathIndex(object):
+    """Index of the modules found in the directories of the search path.
+
+    Each directory is listed the first time a module is searched in it,
+    and later searches are answered from the listings, in the same order
+    as imp.find_module would find them. As importlib's FileFinder does, a
+    directory is listed again when its modification time changed since it
+    was listed, which costs a stat of the directory for each search instead
+    of probing the files of every searched module. Modules which aren't
+    found in the listings, such as zipped or namespace packages, are
+    searched with the regular finders.
+    """
+
+    def __init__(self):
+        # directory -> (modification time, listing)
+        self._listings = {}
+        self._namespaces = {}
+
+    def listing(self, directory):
+        """Get the listing of the given directory, or None if it isn't one."""
+        key = _cache_normalize_path(directory)
+        try:
+            mtime = os.stat(key).st_mtime
+        except OSError:
+            mtime = None
+        known = self._listings.get(key)
+        if known is not None and known[0] == mtime:
+            return known[1]
+        listing = None
+        if mtime is not None:
+            try:
+                listing = _DirectoryListing(key)
+            except OSError:
+                # Not a directory, such as a zip archive.
+                pass
+        self._listings[key] = (mtime, listing)
+        return listing
+
+    def _is_package(self, directory):
+        listing = self.listing(directory)
+        return listing is not None and any(init in listing.files
+                                           for init in _PACKAGE_INITS)
+
+    def _search(self, modname, path):
+        for entry in path:
+            listing = self.listing(entry)
+            if listing is None:
+                continue
+            if (modname in listing.directories
+                    and self._is_package(os.path.join(entry, modname))):
+                return ModuleSpec(name=modname, type=ModuleType.PKG_DIRECTORY,
+                                  location=os.path.join(entry, modname))
+            module = listing.modules.get(modname)
+            if module is not None:
+                return ModuleSpec(name=modname, type=module[2],
+                                  location=os.path.join(entry, module[1]))
+        return None
+
+    def find_module(self, modname, processed, submodule_path):
+        """Find *modname* in *submodule_path*, or in sys.path if None."""
+        if submodule_path is not None:
+            spec = self._search(modname, submodule_path)
+            if spec is None and not processed and (imp.is_builtin(modname)
+                                                   or imp.is_frozen(modname)):
+                spec = ModuleSpec(name=modname, type=ModuleType.C_BUILTIN)
+            return spec
+        if imp.is_builtin(modname) or imp.is_frozen(modname):
+            return ModuleSpec(name=modname, type=ModuleType.C_BUILTIN)
+        return self._search(modname, sys.path)
+
+    def is_setuptools_namespace(self, location):
+        try:
+            return self._namespaces[location]
+        except KeyError:
+            result = self._namespaces[location] = _is_setuptools_namespace(location)
+            return result
+
+    def refresh(self):
+        """Forget the listings and the setuptools namespace packages.
+
+        The listings of the directories are checked when they are used,
+        but changes made within the resolution of their modification
+        time can only be seen this way.
+        """
+        self._listings.clear()
+        self._namespaces.clear()
+
+
+_PATH_INDEX = None
+
+
+def enable_path_index():
+    """Enable the index of the modules found in the directories of sys.path.
+
+    Once enabled, the directories are listed instead of being probed for
+    each searched module, and listed again when their modification time
+    changes. :func:`refresh_path_index` lists them all again.
+    """
+    global _PATH_INDEX # pylint: disable=global-statement
+    if _PATH_INDEX is None:
+        _PATH_INDEX = _PathIndex()
+
+
+def disable_path_index():
+    """Disable and forget the index of the directories of sys.path."""
+    global _PATH_INDEX # pylint: disable=global-statement
+    _PATH_INDEX = None
+
+
+def refresh_path_index():
+    """Rescan the indexed directories and forget the other finder caches."""
+    if _PATH_INDEX is not None:
+        _PATH_INDEX.refresh()
+    _ZIP_PATH_ENTRIES.clear()
+    for finder in _FILE_FINDERS.values():
+        finder.invalidate_caches()
+
+
+class _PathIndexFinder(ImpFinder):
+
+    def find_module(self, modname, module_parts, processed, submodule_path):
+        return _PATH_INDEX.find_module(modname, processed, submodule_path)
+
+    def contribute_to_path(self, spec, processed):
+        if spec.location is None:
+            return None
+        if _PATH_INDEX.is_setuptools_namespace(spec.location):
+            return super(_PathIndexFinder, self).contribute_to_path(spec, processed)
+        return [spec.location]
+
+
+if _HAS_MACHINERY and sys.version_info[:2] > (3, 3):
+    _SPEC_FINDERS = [ImportlibFinder, ZipFinder, PEP420SpecFinder]
+else:
+    _SPEC_FINDERS = [ImpFinder, ZipFinder]
+
+
+def register_spec_finder(finder):
+    """Register a finder class for looking up modules.
+
+    *finder* is a :class:`Finder` subclass, instantiated with the search
+    path. Its ``find_module`` method returns a :class:`ModuleSpec` or None,
+    and its ``contribute_to_path`` method returns the search path of the
+    submodules of a found package. Registered finders are used after the
+    builtin ones, but before the lookup of implicit namespace packages.
+    """
+    if PEP420SpecFinder in _SPEC_FINDERS:
+        _SPEC_FINDERS.insert(_SPEC_FINDERS.index(PEP420SpecFinder), finder)
+    else:
+        _SPEC_FINDERS.append(finder)
+
+
+def unregister_spec_finder(finder):
+    """Unregister a finder class registered with `register_spec_finder`."""
+    _SPEC_FINDERS.remove(finder)
+
+
 def _find_spec_with_path(search_path, modname, module_parts, processed, submodule_path):
-    finders = [finder(search_path) for finder in (ImpFinder, ZipFinder)]
-    if _HAS_MACHINERY and sys.version_info[:2] > (3, 3):
-        finders.append(PEP420SpecFinder(search_path))
+    if _PATH_INDEX is not None:
+        finder = _PathIndexFinder(search_path)
+        spec = finder.find_module(modname, module_parts, processed, submodule_path)
+        if spec is not None:
+            return finder, spec
 
+    finders = [finder(search_path) for finder in _SPEC_FINDERS]
     for finder in finders:
         spec = finder.find_module(modname, module_parts, processed, submodule_path)
         if spec is None:
@@ -848,6 +1403,13 @@ def _has_init(directory):
     else return None
     """
     mod_or_pack = os.path.join(directory, '__init__')
+    if _PATH_INDEX is not None:
+        listing = _PATH_INDEX.listing(directory)
+        if listing is not None:
+            for ext in PY_SOURCE_EXTS + ('pyc', 'pyo'):
+                if '__init__.' + ext in listing.files:
+                    return mod_or_pack + '.' + ext
+            return None
     for ext in PY_SOURCE_EXTS + ('pyc', 'pyo'):
         if os.path.exists(mod_or_pack + '.' + ext):
             return mod_or_pack + '.' + ext
@@ -11,6 +11,8 @@
 """
 
 import abc
+import gc
+import operator
 import pprint
 import warnings
 try:
@@ -28,6 +30,7 @@ from astroid import decorators
 from astroid import exceptions
 from astroid import manager
 from astroid import mixins
+from astroid import positions
 from astroid import util
 
 
@@ -142,7 +145,165 @@ def _container_getitem(instance, elts, index):
 
 
 
-class NodeNG(object):
+_FIELD_GROUPS = ('_astroid_fields', '_other_fields', '_other_other_fields')
+_MISSING = object()
+
+
+def _class_lookup(namespace, bases, name, default=_MISSING):
+    """Look *name* up in the namespace of a class being created, then in its bases."""
+    if name in namespace:
+        return namespace[name]
+    for base in bases:
+        for klass in base.__mro__:
+            if name in vars(klass):
+                return vars(klass)[name]
+    return default
+
+
+def _slotted_names(bases):
+    names = set()
+    for base in bases:
+        for klass in base.__mro__:
+            names.update(vars(klass).get('__slots__', ()))
+    return names
+
+
+class _NodeMeta(type):
+    """Metaclass storing the fields of the nodes in slots
+
+    The attributes listed in ``_astroid_fields``, ``_other_fields`` and
+    ``_other_other_fields`` are given slots, and the class attributes
+    declaring their default value are moved to ``_slot_defaults``, where
+    :meth:`NodeNG.__getattr__` finds them. The other attributes, such as
+    the ones set by the brains or by cached properties, go to the
+    ``__dict__`` of the node, only created when one of them is set.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        namespace = dict(namespace)
+        defaults = {}
+        for base in reversed(bases):
+            defaults.update(getattr(base, '_slot_defaults', {}))
+        defaults.update(namespace.pop('_slot_defaults', {}))
+        inherited = _slotted_names(bases)
+        slots = list(namespace.get('__slots__', ()))
+        for slot in slots:
+            # A slot shadowing a class attribute of a base, such as
+            # LocalsDictNodeNG._cached_qname, keeps it as its default value.
+            value = _class_lookup({}, bases, slot)
+            if (slot not in namespace and value is not _MISSING
+                    and not hasattr(type(value), '__get__')):
+                defaults[slot] = value
+        for group in _FIELD_GROUPS:
+            for field in _class_lookup(namespace, bases, group, ()):
+                if field in inherited or field in slots:
+                    continue
+                value = _class_lookup(namespace, bases, field, None)
+                if hasattr(type(value), '__set__'):
+                    # A property standing for the field, as FunctionDef.body
+                    continue
+                slots.append(field)
+                if field not in namespace and value is not None:
+                    defaults[field] = value
+        for attr, value in list(namespace.items()):
+            if ((attr in slots or attr in inherited)
+                    and not hasattr(type(value), '__get__')):
+                defaults[attr] = namespace.pop(attr)
+        namespace['__slots__'] = tuple(slots)
+        namespace['_slot_defaults'] = defaults
+        cls = super(_NodeMeta, mcs).__new__(mcs, name, bases, namespace)
+        # The values cached in slots are neither pickled nor copied.
+        skipped = (('__dict__', '__weakref__')
+                   + tuple(getattr(cls, '_cache_slots', ())))
+        cls._slot_members = tuple(
+            (slot, vars(klass)[slot])
+            for klass in cls.__mro__
+            for slot in vars(klass).get('__slots__', ())
+            if slot not in skipped)
+        return cls
+
+
+class _AbstractNodeMeta(_NodeMeta, abc.ABCMeta):
+    """Metaclass of the node classes having abstract methods"""
+
+
+def _slot_values(node):
+    """Get a dictionary of the slots set on *node*."""
+    values = {}
+    for name, member in node._slot_members:
+        try:
+            values[name] = member.__get__(node, type(node))
+        except AttributeError:
+            pass
+    return values
+
+
+def _instance_dict(node):
+    """Get the ``__dict__`` of *node*, or None if it has none yet.
+
+    Reading ``node.__dict__`` would create an empty one, so it is looked
+    for among the dictionaries the node refers to which aren't slot values.
+    """
+    held = [value for value in gc.get_referents(node) if type(value) is dict]
+    if held:
+        fields = set(id(value) for value in _slot_values(node).values())
+        for value in held:
+            if id(value) not in fields:
+                return value
+    return None
+
+
+def _clear_cached_parents(node):
+    """Clear the values cached by *node* and by its children which depend
+    on the parent of *node*.
+
+    The children whose values depend on it have cached values too, unless
+    they are scoped nodes, which don't cache their frame and their scope.
+    The bodies of functions not built yet have none.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        for name in node._cache_slots:
+            # Not set when it isn't, not to create a __dict__ for it.
+            if getattr(node, name) is not None:
+                setattr(node, name, None)
+        for field in node._astroid_fields:
+            if field == 'body' and node.is_function and node._deferred_body:
+                continue
+            # The fields aren't set yet while the node is being created.
+            values = [getattr(node, field, None)]
+            while values:
+                value = values.pop()
+                if isinstance(value, (list, tuple)):
+                    values.extend(value)
+                elif isinstance(value, NodeNG) and value._has_cached_parents():
+                    stack.append(value)
+
+
+def _walk_nodes_of_class(node, klass, skip_klass):
+    """Walk the subtree of *node* for NodeNG.nodes_of_class.
+
+    The iterators over the children of the nodes being walked are kept in
+    a stack, so that the nodes found are yielded from a single generator,
+    whatever their depth.
+    """
+    if isinstance(node, klass):
+        yield node
+    stack = [node.get_children()]
+    while stack:
+        for child in stack[-1]:
+            if skip_klass is not None and isinstance(child, skip_klass):
+                continue
+            if isinstance(child, klass):
+                yield child
+            stack.append(child.get_children())
+            break
+        else:
+            stack.pop()
+
+
+class NodeNG(six.with_metaclass(_NodeMeta, object)):
     """Base Class for all Astroid node classes.
 
     It represents a node of the new abstract syntax tree.
@@ -150,11 +311,18 @@ class NodeNG(object):
     is_statement = False
     optional_assign = False # True for For (and for Comprehension if py <3.0)
     is_function = False # True for FunctionDef nodes
+    # the __dict__ is only created for the attributes which aren't slotted
+    __slots__ = ('lineno', 'col_offset', '_parent', '_cached_root', '_cached_frame',
+                 '_cached_scope', '_cached_statement', '__dict__')
+    # slots caching the nodes found in the parents of the node, cleared
+    # when it is given another parent
+    _cache_slots = ('_cached_root', '_cached_frame', '_cached_scope',
+                    '_cached_statement')
     # attributes below are set by the builder module or by raw factories
     lineno = None
     col_offset = None
-    # parent node in the tree
-    parent = None
+    _parent = None
+    _cached_root = _cached_frame = _cached_scope = _cached_statement = None
     # attributes containing child node(s) redefined in most concrete classes:
     _astroid_fields = ()
     # attributes containing non-nodes:
@@ -167,7 +335,54 @@ class NodeNG(object):
     def __init__(self, lineno=None, col_offset=None, parent=None):
         self.lineno = lineno
         self.col_offset = col_offset
-        self.parent = parent
+        # A new node has no cached values to clear.
+        self._parent = parent
+        self._cached_root = self._cached_frame = None
+        self._cached_scope = self._cached_statement = None
+
+    def _set_parent(self, parent):
+        if parent is self._parent:
+            return
+        self._parent = parent
+        if self._has_cached_parents():
+            _clear_cached_parents(self)
+
+    # parent node in the tree
+    parent = property(operator.attrgetter('_parent'), _set_parent)
+
+    def _has_cached_parents(self):
+        """Tell whether the children of the node may have cached values
+        depending on its parent."""
+        return (self._cached_root is not None
+                or self._cached_frame is not None
+                or self._cached_scope is not None
+                or self._cached_statement is not None)
+
+    def __getattr__(self, name):
+        # Only called for the attributes not set on the node: the unset
+        # fields get their default value, the other attributes are looked
+        # up by the next bases, such as bases.Proxy.
+        try:
+            return self._slot_defaults[name]
+        except KeyError:
+            pass
+        try:
+            getattr_ = super(NodeNG, self).__getattr__
+        except AttributeError:
+            raise AttributeError('%r object has no attribute %r'
+                                 % (type(self).__name__, name))
+        return getattr_(name)
+
+    def __getstate__(self):
+        # The state pickle would get otherwise creates an empty __dict__
+        # on every node without dynamic attributes.
+        node_dict = _instance_dict(self)
+        if node_dict and '__cache' in node_dict:
+            # The results of the methods decorated with cached, keyed by
+            # bound methods which can't be pickled on Python 2.
+            node_dict = node_dict.copy()
+            del node_dict['__cache']
+        return node_dict, _slot_values(self)
 
     def infer(self, context=None, **kwargs):
         """main interface to the interface system, return a generator on inferred
@@ -263,6 +478,11 @@ class NodeNG(object):
 
     def parent_of(self, node):
         """return true if i'm a parent of the given node"""
+        store = getattr(self.root(), '_positions', None)
+        if store is not None:
+            result = store.parent_of(self, node)
+            if result is not None:
+                return result
         parent = node.parent
         while parent is not None:
             if self is parent:
@@ -274,27 +494,41 @@ class NodeNG(object):
         """return the first parent node marked as statement node"""
         if self.is_statement:
             return self
-        return self.parent.statement()
+        statement = self._cached_statement
+        if statement is None:
+            statement = self._cached_statement = self.parent.statement()
+        return statement
 
     def frame(self):
         """return the first parent frame node (i.e. Module, FunctionDef or
         ClassDef)
 
         """
-        return self.parent.frame()
+        frame = self._cached_frame
+        if frame is None:
+            frame = self._cached_frame = self.parent.frame()
+        return frame
 
     def scope(self):
         """return the first node defining a new scope (i.e. Module,
         FunctionDef, ClassDef, Lambda but also GenExpr)
 
         """
-        return self.parent.scope()
+        scope = self._cached_scope
+        if scope is None:
+            scope = self._cached_scope = self.parent.scope()
+        return scope
 
     def root(self):
         """return the root node of the tree, (i.e. a Module)"""
-        if self.parent:
-            return self.parent.root()
-        return self
+        root = self._cached_root
+        if root is None:
+            if self.parent:
+                root = self.parent.root()
+            else:
+                root = self
+            self._cached_root = root
+        return root
 
     def child_sequence(self, child):
         """search for the right sequence where the child lies in"""
@@ -353,14 +587,14 @@ class NodeNG(object):
     # these are lazy because they're relatively expensive to compute for every
     # single node, and they rarely get looked at
 
-    @decorators.cachedproperty
+    @positions.lineproperty
     def fromlineno(self):
         if self.lineno is None:
             return self._fixed_source_line()
         else:
             return self.lineno
 
-    @decorators.cachedproperty
+    @positions.lineproperty
     def tolineno(self):
         if not self._astroid_fields:
             # can't have children
@@ -409,13 +643,12 @@ class NodeNG(object):
 
         klass may be a class object or a tuple of class objects
         """
-        if isinstance(self, klass):
-            yield self
-        for child_node in self.get_children():
-            if skip_klass is not None and isinstance(child_node, skip_klass):
-                continue
-            for matching in child_node.nodes_of_class(klass, skip_klass):
-                yield matching
+        index = getattr(self.root(), '_node_index', None)
+        if index is not None:
+            found = index.nodes_of_class(self, klass, skip_klass)
+            if found is not None:
+                return iter(found)
+        return _walk_nodes_of_class(self, klass, skip_klass)
 
     def _infer_name(self, frame, name):
         # overridden for ImportFrom, Import, Global, TryExcept and Arguments
@@ -612,7 +845,7 @@ class Statement(NodeNG):
 
 
 
-@six.add_metaclass(abc.ABCMeta)
+@six.add_metaclass(_AbstractNodeMeta)
 class _BaseContainer(mixins.ParentAssignTypeMixin,
                      NodeNG, bases.Instance):
     """Base class for Set, FrozenSet, Tuple and List."""
@@ -649,6 +882,7 @@ class _BaseContainer(mixins.ParentAssignTypeMixin,
 class LookupMixIn(object):
     """Mixin looking up a name in the right scope
     """
+    __slots__ = ()
 
     def lookup(self, name):
         """lookup a variable name
@@ -867,7 +1101,7 @@ class Arguments(mixins.AssignTypeMixin, NodeNG):
             return name
         return None
 
-    @decorators.cachedproperty
+    @positions.lineproperty
     def fromlineno(self):
         lineno = super(Arguments, self).fromlineno
         return max(lineno, self.parent.fromlineno or 0)
@@ -1188,6 +1422,14 @@ class Const(NodeNG, bases.Instance):
         self.value = value
         super(Const, self).__init__(lineno, col_offset, parent)
 
+    def __getattr__(self, name):
+        # Instances created without calling __init__, as unpickling does,
+        # don't have a value yet, and looking up _proxied needs it,
+        # which would recurse through Proxy.__getattr__ indefinitely.
+        if name == 'value':
+            raise AttributeError(name)
+        return super(Const, self).__getattr__(name)
+
     def getitem(self, index, context=None):
         if isinstance(self.value, six.string_types):
             return Const(self.value[index])
@@ -1227,7 +1469,10 @@ class Decorators(NodeNG):
 
     def scope(self):
         # skip the function node to go directly to the upper level scope
-        return self.parent.parent.scope()
+        scope = self._cached_scope
+        if scope is None:
+            scope = self._cached_scope = self.parent.parent.scope()
+        return scope
 
 
 class DelAttr(mixins.ParentAssignTypeMixin, NodeNG):
@@ -0,0 +1,110 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""Index of the nodes of a module by class
+
+When :attr:`~astroid.manager.AstroidManager.index_nodes` is set, a
+:class:`NodeIndex` is built for every module once its transforms are
+applied. It keeps the numbers the :class:`~astroid.positions.NodeNumbering`
+of the module gives to the nodes of each class, sorted. As the nodes are
+numbered in prefix order, ``nodes_of_class`` then finds the nodes of a
+subtree by looking up the range of numbers of the subtree in the lists of
+the classes asked for, instead of walking it.
+
+The index describes the module as it was built: the subtrees holding
+functions whose body wasn't built then, or nodes added to the module
+afterwards, are walked as if there was no index. It is dropped when
+astroid replaces nodes of the module, by applying transforms to it again,
+extracting nodes with ``extract_node`` or moving them to a new module with
+:meth:`~astroid.builder.AstroidBuilder.string_rebuild`.
+"""
+
+from array import array
+import bisect
+
+
+class NodeIndex(object):
+    """The nodes of *module* by class, by the numbers of its numbering."""
+
+    def __init__(self, module):
+        self.numbering = module._get_numbering()
+        self._classes = {}
+        self._matching = {}
+        for number, node in enumerate(self.numbering.nodes):
+            try:
+                self._classes[type(node)].append(number)
+            except KeyError:
+                self._classes[type(node)] = array('l', [number])
+
+    def __len__(self):
+        return len(self.numbering)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_matching'] = {}
+        return state
+
+    def _numbers_of(self, klass, start, end):
+        """Get the sorted numbers of the nodes of *klass* from *start* to *end*."""
+        try:
+            classes = self._matching[klass]
+        except KeyError:
+            classes = self._matching[klass] = [
+                cls for cls in self._classes if issubclass(cls, klass)]
+        groups = []
+        for cls in classes:
+            numbers = self._classes[cls]
+            low = bisect.bisect_left(numbers, start)
+            high = bisect.bisect_left(numbers, end)
+            if low < high:
+                groups.append(numbers[low:high])
+        if len(groups) == 1:
+            return groups[0]
+        found = []
+        for numbers in groups:
+            found.extend(numbers)
+        found.sort()
+        return found
+
+    def _skip(self, found, skipped):
+        """Drop the numbers of *found* which are in the subtrees of the
+        nodes numbered *skipped*, both being sorted.
+        """
+        kept = []
+        position = 0
+        skipped_end = -1
+        for number in found:
+            while position < len(skipped) and skipped[position] <= number:
+                skipped_end = max(skipped_end,
+                                  self.numbering.end[skipped[position]])
+                position += 1
+            if number >= skipped_end:
+                kept.append(number)
+        return kept
+
+    def nodes_of_class(self, node, klass, skip_klass=None):
+        """Get the nodes of the subtree of *node* which are instances of
+        *klass*, as :meth:`~astroid.node_classes.NodeNG.nodes_of_class`
+        does, or None if the index can't tell.
+        """
+        numbering = self.numbering
+        if node.parent is None:
+            # The module, which may be a lazy module taking the place
+            # of the one indexed.
+            number = 0
+        else:
+            number = numbering.number(node)
+            if number is None:
+                return None
+        end = numbering.end[number]
+        deferred = numbering.deferred
+        position = bisect.bisect_left(deferred, number)
+        if position < len(deferred) and deferred[position] < end:
+            return None
+        found = self._numbers_of(klass, number, end)
+        if skip_klass is not None and found:
+            skipped = self._numbers_of(skip_klass, number + 1, end)
+            if skipped:
+                found = self._skip(found, skipped)
+        return [node if found_number == number else numbering.nodes[found_number]
+                for found_number in found]
@@ -0,0 +1,226 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""Positions and parents of the nodes of a module, stored in arrays
+
+When :attr:`~astroid.manager.AstroidManager.store_positions` is set, a
+:class:`PositionStore` is built for every module once its transforms are
+applied. It stores the first and last line and the column of each node of
+the module in integer arrays, by the numbers the :class:`NodeNumbering`
+of the module gives them, instead of in attributes of the nodes.
+``fromlineno``, ``tolineno``, and through them ``block_range``, as well as
+``parent_of``, are then answered from these arrays and from the numbering
+without walking the tree nor caching values on the nodes.
+
+The numbering is built once for a module and shared with the index of its
+nodes by class and the index of its nodes by position.
+
+The nodes keep their ``lineno``, ``col_offset`` and ``parent`` attributes,
+which astroid and its users read and assign everywhere, so the store
+doesn't make the modules smaller: the arrays and the numbering cost about
+120 bytes per node, while the lines cached on a node when they are read
+without a store take about 180 bytes. It pays off for the modules whose
+lines are read for most of their nodes, as when they are checked by pylint.
+
+The store describes the module as it was built: the nodes added to the
+module afterwards, such as the bodies of the functions built lazily, are
+not in the store and are handled as if there was none. Like the index of
+the nodes, it is dropped when astroid replaces nodes of the module.
+"""
+
+from array import array
+
+from astroid import decorators
+
+
+# Values of the arrays standing for None and for lines which aren't stored.
+_NONE = -1
+_UNSET = -2
+
+
+def built_children(node):
+    """Get the children of *node*, without building its deferred body."""
+    if not node.is_function or node._deferred_body is None:
+        return list(node.get_children())
+    children = []
+    for field in node._astroid_fields:
+        if field == 'body':
+            continue
+        value = getattr(node, field)
+        if isinstance(value, (list, tuple)):
+            children.extend(value)
+        elif value is not None:
+            children.append(value)
+    return children
+
+
+class NodeNumbering(object):
+    """The nodes of *module* numbered in prefix order, the order in which
+    ``nodes_of_class`` walks them.
+
+    ``nodes`` holds the nodes by number, and the integer arrays ``parent``
+    and ``end`` the number of the parent of each node and the number
+    following the last node of its subtree. ``deferred`` holds the sorted
+    numbers of the functions whose body isn't built, unless *build_bodies*
+    is true, in which case these bodies are built and numbered.
+    """
+
+    def __init__(self, module, build_bodies=False):
+        self.nodes = []
+        self._numbers = {}
+        self.parent = array('l')
+        self.end = array('l')
+        self.deferred = array('l')
+        stack = [(module, _NONE)]
+        while stack:
+            node, parent = stack.pop()
+            if node is None:
+                # All the nodes of the subtree of its parent are numbered.
+                self.end[parent] = len(self.nodes)
+                continue
+            number = len(self.nodes)
+            self.nodes.append(node)
+            self._numbers[node] = number
+            self.parent.append(parent)
+            self.end.append(number + 1)
+            if build_bodies:
+                children = list(node.get_children())
+            else:
+                if node.is_function and node._deferred_body is not None:
+                    self.deferred.append(number)
+                children = built_children(node)
+            stack.append((None, number))
+            stack.extend((child, number) for child in reversed(children))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_numbers']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._numbers = dict((node, number)
+                             for number, node in enumerate(self.nodes))
+
+    def number(self, node):
+        """Get the number of *node*, or None if it isn't numbered."""
+        return self._numbers.get(node)
+
+
+class PositionStore(object):
+    """Positions of the nodes of *module*, stored in arrays.
+
+    The position of a node which isn't in the store is None.
+    """
+
+    def __init__(self, module):
+        # Not imported at the top level, as node_classes uses this module.
+        from astroid import node_classes
+        self.numbering = numbering = module._get_numbering()
+        self._fromlineno = array('l', (_value(node.fromlineno)
+                                       for node in numbering.nodes))
+        self._col_offset = array('l', (_value(node.col_offset)
+                                       for node in numbering.nodes))
+        self._tolineno = array('l', [_UNSET]) * len(numbering)
+        last_children = {}
+        deferred = set(numbering.deferred)
+        for number in range(len(numbering) - 1, -1, -1):
+            node = numbering.nodes[number]
+            # The children are numbered after their parent, the last one last.
+            parent = numbering.parent[number]
+            if parent != _NONE:
+                last_children.setdefault(parent, number)
+            if number in deferred or last_children.get(number) in deferred:
+                # Its last line depends on the nodes not built yet.
+                deferred.add(number)
+            else:
+                self._tolineno[number] = _value(node.tolineno)
+
+        # The lines cached on the nodes while computing them are dropped.
+        for node in numbering.nodes:
+            node_dict = node_classes._instance_dict(node)
+            if node_dict is not None:
+                node_dict.pop('fromlineno', None)
+                node_dict.pop('tolineno', None)
+                if not node_dict:
+                    del node.__dict__
+
+    def __len__(self):
+        return len(self.numbering)
+
+    def index(self, node):
+        """Get the number of *node* in the store, or None if it isn't in it."""
+        return self.numbering.number(node)
+
+    def _get(self, values, node):
+        number = self.numbering.number(node)
+        if number is None:
+            return None
+        value = values[number]
+        return None if value < 0 else value
+
+    def fromlineno(self, node):
+        return self._get(self._fromlineno, node)
+
+    def tolineno(self, node):
+        return self._get(self._tolineno, node)
+
+    def col_offset(self, node):
+        return self._get(self._col_offset, node)
+
+    def parent(self, node):
+        """Get the parent of *node* when it was built."""
+        numbering = self.numbering
+        number = numbering.number(node)
+        if number is None or numbering.parent[number] == _NONE:
+            return None
+        return numbering.nodes[numbering.parent[number]]
+
+    def parent_of(self, node, child):
+        """Tell whether *node* is a parent of *child*, None if one of them
+        isn't in the store.
+        """
+        numbering = self.numbering
+        number = numbering.number(node)
+        child_number = numbering.number(child)
+        if number is None or child_number is None:
+            return None
+        return number < child_number < numbering.end[number]
+
+    def line(self, node, name):
+        """Get the line *name*, fromlineno or tolineno, of *node*.
+
+        Raise KeyError if it isn't stored.
+        """
+        number = self.numbering.number(node)
+        if number is None:
+            raise KeyError(name)
+        value = (self._fromlineno if name == 'fromlineno' else self._tolineno)[number]
+        if value == _UNSET:
+            raise KeyError(name)
+        return None if value == _NONE else value
+
+
+def _value(value):
+    return _NONE if value is None else value
+
+
+class lineproperty(decorators.cachedproperty):
+    """A cached property giving a line of a node, answered by the position
+    store of its module if there is one.
+    """
+    __slots__ = ()
+
+    def __get__(self, inst, objtype=None):
+        if inst is None:
+            return self
+        positions = getattr(inst.root(), '_positions', None)
+        if positions is not None:
+            try:
+                return positions.line(inst, self.wrapped.__name__)
+            except KeyError:
+                pass
+        return super(lineproperty, self).__get__(inst, objtype)
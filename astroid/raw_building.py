@@ -245,9 +245,10 @@ class InspectBuilder(object):
 
     # astroid from living objects ###############################################
 
-    def __init__(self):
+    def __init__(self, manager=None):
         self._done = {}
         self._module = None
+        self._manager = manager or MANAGER
 
     def inspect_build(self, module, modname=None, path=None):
         """build astroid from a living module (i.e. using inspect)
@@ -264,7 +265,9 @@ class InspectBuilder(object):
             node = build_module(modname)
         node.file = node.path = path and os.path.abspath(path) or path
         node.name = modname
-        MANAGER.cache_module(node)
+        if self._manager.isolated:
+            node.manager = self._manager
+        self._manager.cache_module(node)
         node.package = hasattr(module, '__path__')
         self._done = {}
         self.object_build(node, module)
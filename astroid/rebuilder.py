@@ -11,6 +11,8 @@ order to get a single Astroid representation
 """
 
 import _ast
+import ast
+import functools
 import sys
 
 import astroid
@@ -78,14 +80,16 @@ CONTEXTS = {_ast.Load: astroid.Load,
 
 
 def _get_doc(node):
+    """Get the body of the node without its docstring, and the docstring
+
+    The _ast node is left as it is, since it may be shared with other tools.
+    """
     try:
         if isinstance(node.body[0], _ast.Expr) and isinstance(node.body[0].value, _ast.Str):
-            doc = node.body[0].value.s
-            node.body = node.body[1:]
-            return node, doc
+            return node.body[1:], node.body[0].value.s
     except IndexError:
         pass # ast built from scratch
-    return node, None
+    return node.body, None
 
 def _visit_or_none(node, attr, visitor, parent, visit='visit',
                    **kws):
@@ -104,23 +108,59 @@ def _get_context(node):
     return CONTEXTS.get(type(node.ctx), astroid.Load)
 
 
+def _can_defer_body(body):
+    """Check if building the given function body can be deferred.
+
+    It can't be when building it has effects outside of the function:
+    global statements add names to the module, imports from other
+    modules and attribute assignments are handled when the module
+    is post built.
+    """
+    for statement in body:
+        for node in ast.walk(statement):
+            if isinstance(node, (_ast.Global, _ast.ImportFrom)):
+                return False
+            if (isinstance(node, _ast.Attribute)
+                    and not isinstance(node.ctx, _ast.Load)):
+                return False
+    return True
+
+
+def _build_deferred_body(manager, body, parent):
+    """build the body of a function whose building was deferred
+
+    A rebuilder of its own is used, the one of the module not being kept
+    alive by the functions not built yet, nor shared between the threads
+    building them. Its nodes aren't recorded, the function transforms its
+    body itself.
+    """
+    rebuilder = TreeRebuilder(manager)
+    rebuilder._global_names.append({})
+    return [rebuilder.visit(child, parent) for child in body]
+
+
 class TreeRebuilder(object):
     """Rebuilds the _ast tree to become an Astroid tree"""
 
-    def __init__(self, manager):
+    def __init__(self, manager, transforms=None):
         self._manager = manager
         self._global_names = []
         self._import_from_nodes = []
         self._delayed_assattr = []
         self._visit_meths = {}
         self._peepholer = astpeephole.ASTPeepholeOptimizer()
+        # When a transform visitor is given, the nodes having transforms
+        # are recorded as they are built, children first, to be transformed
+        # once the module is built without walking it again.
+        self._transforms = transforms
+        self._transformed_nodes = []
 
     def visit_module(self, node, modname, modpath, package):
         """visit a Module node by returning a fresh instance of it"""
-        node, doc = _get_doc(node)
+        body, doc = _get_doc(node)
         newnode = nodes.Module(name=modname, doc=doc, file=modpath, path=modpath,
                                package=package, parent=None)
-        newnode.postinit([self.visit(child, newnode) for child in node.body])
+        newnode.postinit([self.visit(child, newnode) for child in body])
         return newnode
 
     def visit(self, node, parent):
@@ -132,7 +172,18 @@ class TreeRebuilder(object):
             visit_name = 'visit_' + REDIRECT.get(cls_name, cls_name).lower()
             visit_method = getattr(self, visit_name)
             self._visit_meths[cls] = visit_method
-        return visit_method(node, parent)
+        newnode = visit_method(node, parent)
+        if (self._transforms is not None
+                and newnode.__class__ in self._transforms.transforms):
+            self._transformed_nodes.append(newnode)
+        return newnode
+
+    def _add_transformed(self, newnode):
+        """record a node built without :meth:`visit` to be transformed"""
+        if (self._transforms is not None
+                and newnode.__class__ in self._transforms.transforms):
+            self._transformed_nodes.append(newnode)
+        return newnode
 
     def _save_assignment(self, node, name=None):
         """save assignement situation since node.parent is not available yet"""
@@ -309,23 +360,28 @@ class TreeRebuilder(object):
 
     def visit_classdef(self, node, parent, newstyle=None):
         """visit a ClassDef node to become astroid"""
-        node, doc = _get_doc(node)
+        body, doc = _get_doc(node)
         newnode = nodes.ClassDef(node.name, doc, node.lineno,
                                  node.col_offset, parent)
         metaclass = None
         if PY3:
             for keyword in node.keywords:
                 if keyword.arg == 'metaclass':
+                    # The metaclass isn't a child of the class, it isn't
+                    # transformed.
+                    recorded = len(self._transformed_nodes)
                     metaclass = self.visit(keyword, newnode).value
+                    del self._transformed_nodes[recorded:]
                 break
         if node.decorator_list:
-            decorators = self.visit_decorators(node, newnode)
+            decorators = self._add_transformed(
+                self.visit_decorators(node, newnode))
         else:
             decorators = None
         newnode.postinit([self.visit(child, newnode)
                           for child in node.bases],
                          [self.visit(child, newnode)
-                          for child in node.body],
+                          for child in body],
                          decorators, newstyle, metaclass)
         return newnode
 
@@ -472,21 +528,30 @@ class TreeRebuilder(object):
     def _visit_functiondef(self, cls, node, parent):
         """visit an FunctionDef node to become astroid"""
         self._global_names.append({})
-        node, doc = _get_doc(node)
+        body, doc = _get_doc(node)
         newnode = cls(node.name, doc, node.lineno,
                       node.col_offset, parent)
         if node.decorator_list:
-            decorators = self.visit_decorators(node, newnode)
+            decorators = self._add_transformed(
+                self.visit_decorators(node, newnode))
         else:
             decorators = None
         if PY3 and node.returns:
             returns = self.visit(node.returns, newnode)
         else:
             returns = None
-        newnode.postinit(self.visit(node.args, newnode),
-                         [self.visit(child, newnode)
-                          for child in node.body],
-                         decorators, returns)
+        if self._manager.defer_function_bodies and _can_defer_body(body):
+            newnode.postinit(self.visit(node.args, newnode), [],
+                             decorators, returns)
+            newnode._deferred_body = functools.partial(
+                _build_deferred_body, self._manager, body)
+            if self._transforms is not None:
+                newnode._pending_transforms = self._transforms
+        else:
+            newnode.postinit(self.visit(node.args, newnode),
+                             [self.visit(child, newnode)
+                              for child in body],
+                             decorators, returns)
         self._global_names.pop()
         return newnode
 
@@ -777,7 +842,8 @@ class TreeRebuilder3(TreeRebuilder):
         """visit an ExceptHandler node by returning a fresh instance of it"""
         newnode = nodes.ExceptHandler(node.lineno, node.col_offset, parent)
         if node.name:
-            name = self.visit_assignname(node, newnode, node.name)
+            name = self._add_transformed(
+                self.visit_assignname(node, newnode, node.name))
         else:
             name = None
         newnode.postinit(_visit_or_none(node, 'type', self, newnode),
@@ -815,7 +881,7 @@ class TreeRebuilder3(TreeRebuilder):
         if node.finalbody:
             newnode = nodes.TryFinally(node.lineno, node.col_offset, parent)
             if node.handlers:
-                body = [self.visit_tryexcept(node, newnode)]
+                body = [self._add_transformed(self.visit_tryexcept(node, newnode))]
             else:
                 body = [self.visit(child, newnode)
                         for child in node.body]
@@ -16,6 +16,7 @@ Lambda, GeneratorExp, DictComp and SetComp to some extent).
 
 import io
 import itertools
+import threading
 import warnings
 
 import six
@@ -25,15 +26,19 @@ from astroid import context as contextmod
 from astroid import exceptions
 from astroid import decorators as decorators_mod
 from astroid.interpreter import objectmodel
+from astroid import intervals
 from astroid import manager
 from astroid import mixins
 from astroid import node_classes
+from astroid import positions
 from astroid import decorators as decorators_mod
 from astroid import util
 
 
 BUILTINS = six.moves.builtins.__name__
 ITER_METHODS = ('__iter__', '__getitem__')
+# held while creating the lock of a deferred function body
+_BODY_LOCK_CREATION = threading.Lock()
 
 
 def _c3_merge(sequences, cls, context):
@@ -119,14 +124,30 @@ class LocalsDictNodeNG(node_classes.LookupMixIn,
 
     locals = {}
 
+    # Slotted by the classes whose qualified name is looked up often; the
+    # comprehension scopes keep it in their __dict__, as a slot would clash
+    # with the layout of their other base.
+    _cache_slots = node_classes.NodeNG._cache_slots + ('_cached_qname',)
+    _cached_qname = None
+
+    def _has_cached_parents(self):
+        # Their frame and their scope are themselves, which is not cached,
+        # but the values cached by their children may depend on their parent.
+        return True
+
     def qname(self):
         """return the 'qualified' name of the node, eg module.name,
         module.class.name ...
         """
         # pylint: disable=no-member; github.com/pycqa/astroid/issues/278
-        if self.parent is None:
-            return self.name
-        return '%s.%s' % (self.parent.frame().qname(), self.name)
+        qname = self._cached_qname
+        if qname is None:
+            if self.parent is None:
+                qname = self.name
+            else:
+                qname = '%s.%s' % (self.parent.frame().qname(), self.name)
+            self._cached_qname = qname
+        return qname
 
     def frame(self):
         """return the first parent frame node (i.e. Module, FunctionDef or ClassDef)
@@ -224,6 +245,7 @@ class LocalsDictNodeNG(node_classes.LookupMixIn,
 
 
 class Module(LocalsDictNodeNG):
+    __slots__ = ('_cached_qname',)
     _astroid_fields = ('body',)
 
     fromlineno = 0
@@ -251,6 +273,20 @@ class Module(LocalsDictNodeNG):
 
     # Future imports
     future_imports = None
+    # (modification time, size) of the file at build time, if built from one
+    _source_stat = None
+    # names of the modules whose nodes were added to this module's locals
+    _dependencies = frozenset()
+    # the isolated manager which built this module, the default one if None
+    manager = None
+    # the numbering of the nodes shared by the indexes below
+    _numbering = None
+    # the positions of the nodes of the module, if they are stored
+    _positions = None
+    # the nodes of the module by class, if they are indexed
+    _node_index = None
+    # the nodes of the module by position, built when first queried
+    _interval_index = None
     special_attributes = objectmodel.ModuleModel()
 
     # names of python special attributes (handled by getattr impl.)
@@ -316,6 +352,51 @@ class Module(LocalsDictNodeNG):
         """
         return self.fromlineno, self.tolineno
 
+    def _get_numbering(self, build_bodies=False):
+        """Get the numbering of the nodes of the module, built once for
+        its indexes, see :class:`~astroid.positions.NodeNumbering`.
+
+        If *build_bodies* is true, the numbering is built again if the
+        bodies of some functions weren't built.
+        """
+        numbering = self._numbering
+        if numbering is None or build_bodies and numbering.deferred:
+            numbering = positions.NodeNumbering(self, build_bodies)
+            self._numbering = numbering
+        return numbering
+
+    def _drop_indexes(self):
+        """Drop the positions and the indexes of the nodes of the module,
+        which describe its tree as it was before being changed.
+        """
+        self._numbering = None
+        self._positions = None
+        self._node_index = None
+        self._interval_index = None
+
+    def node_at(self, line, col=0):
+        """Get the innermost node of the module at the given line and
+        column, or None if there is none.
+
+        The nodes without a line or a column, such as the arguments of
+        the functions, are never returned. See :mod:`astroid.intervals`.
+        """
+        if self._interval_index is None:
+            self._interval_index = intervals.IntervalIndex(self)
+        return self._interval_index.node_at(line, col)
+
+    def statement_at(self, line, col=0):
+        """Get the innermost statement at the given line and column, or None."""
+        node = self.node_at(line, col)
+        return None if node is None else node.statement()
+
+    def scope_at(self, line, col=0):
+        """Get the innermost scope at the given line and column, the
+        module itself if no node is there.
+        """
+        node = self.node_at(line, col)
+        return self if node is None else node.scope()
+
     def scope_lookup(self, node, name, offset=0):
         if name in self.scope_attrs and name not in self.locals:
             try:
@@ -402,15 +483,17 @@ class Module(LocalsDictNodeNG):
         if relative_only and level is None:
             level = 0
         absmodname = self.relative_to_absolute_name(modname, level)
+        manager = self.manager or MANAGER
+        lazy = manager.lazy_imports
 
         try:
-            return MANAGER.ast_from_module_name(absmodname)
+            return manager.ast_from_module_name(absmodname, lazy=lazy)
         except exceptions.AstroidBuildingError:
             # we only want to import a sub module or package of this module,
             # skip here
             if relative_only:
                 raise
-        return MANAGER.ast_from_module_name(modname)
+        return manager.ast_from_module_name(modname, lazy=lazy)
 
     def relative_to_absolute_name(self, modname, level):
         """return the absolute module name for a relative import.
@@ -496,9 +579,61 @@ class Module(LocalsDictNodeNG):
         return True
 
 
+def _lazy_module_attribute(name):
+    def getter(self):
+        return getattr(self._build(), name)
+    return property(getter)
+
+
+class LazyModule(Module):
+    """A module whose tree is built the first time it is used.
+
+    The name, file and package of the module are known when it's created,
+    but its source file is only parsed when its contents, such as its
+    ``body``, its ``locals`` or the results of ``getattr``, are needed.
+    It then becomes a plain :class:`Module`, which is the one found in
+    the cache of the manager. If it can't be built, using it raises the
+    error of the build, such as :class:`~astroid.exceptions.AstroidSyntaxError`.
+    """
+
+    # the context file the module was looked up from
+    _context_file = None
+    # whether the tree of the module is being built
+    _building = False
+    # the error raised when the tree of the module couldn't be built
+    _build_error = None
+
+    def __init__(self, name, file, package=None, context_file=None):
+        # pylint: disable=super-init-not-called
+        self.name = name
+        self.file = self.path = file
+        self.package = package
+        self.parent = None
+        self.pure_python = True
+        self._context_file = context_file
+
+    def _build(self):
+        """Build the tree of the module and return the module holding it."""
+        return (self.manager or MANAGER).build_lazy_module(self)
+
+    body = _lazy_module_attribute('body')
+    locals = _lazy_module_attribute('locals')
+    globals = _lazy_module_attribute('globals')
+    doc = _lazy_module_attribute('doc')
+    future_imports = _lazy_module_attribute('future_imports')
+    file_encoding = _lazy_module_attribute('file_encoding')
+    file_bytes = _lazy_module_attribute('file_bytes')
+
+    def accept(self, visitor):
+        return self._build().accept(visitor)
+
+
 class ComprehensionScope(LocalsDictNodeNG):
     def frame(self):
-        return self.parent.frame()
+        frame = self._cached_frame
+        if frame is None:
+            frame = self._cached_frame = self.parent.frame()
+        return frame
 
     scope_lookup = LocalsDictNodeNG._scope_lookup
 
@@ -620,6 +755,7 @@ def _infer_decorator_callchain(node):
 
 
 class Lambda(mixins.FilterStmtsMixin, LocalsDictNodeNG):
+    __slots__ = ('_cached_qname',)
     _astroid_fields = ('args', 'body',)
     _other_other_fields = ('locals',)
     name = '<lambda>'
@@ -699,6 +835,9 @@ class Lambda(mixins.FilterStmtsMixin, LocalsDictNodeNG):
 
 
 class FunctionDef(node_classes.Statement, Lambda):
+    # slotted along with the fields, as every function has them
+    __slots__ = ('_body', '_locals', 'instance_attrs', '_deferred_body',
+                 '_pending_transforms', '_building_body', '_body_lock')
     if six.PY3:
         _astroid_fields = ('decorators', 'args', 'returns', 'body')
         returns = None
@@ -711,6 +850,14 @@ class FunctionDef(node_classes.Statement, Lambda):
     _other_fields = ('name', 'doc')
     _other_other_fields = ('locals', '_type')
     _type = None
+    # function building the body from its _ast statements, when deferred
+    # by the rebuilder until the body or the locals are first used
+    _deferred_body = None
+    # transforms to apply to the body once built
+    _pending_transforms = None
+    _building_body = False
+    # lock of the deferred body, while it is built
+    _body_lock = None
 
     def __init__(self, name=None, doc=None, lineno=None,
                  col_offset=None, parent=None):
@@ -722,6 +869,65 @@ class FunctionDef(node_classes.Statement, Lambda):
             frame = parent.frame()
             frame.set_local(name, self)
 
+    def _build_deferred_body(self):
+        # The lock of the body is only created when built.
+        with _BODY_LOCK_CREATION:
+            lock = self._body_lock
+            if lock is None:
+                lock = self._body_lock = threading.RLock()
+        with lock:
+            build = self._deferred_body
+            if build is None or self._building_body:
+                # Built by another thread, or being built by this one:
+                # its transforms see the body built so far.
+                return
+            self._building_body = True
+            transforms = self._pending_transforms
+            local_names = dict((name, list(values))
+                               for name, values in self._locals.items())
+            try:
+                self._body = build(self)
+                if transforms is not None:
+                    self._body = transforms.visit_nodes(self._body)
+            except Exception as exc: # pylint: disable=broad-except
+                # Left to be built again the next time the body is used,
+                # raising the error again, instead of hiding it behind
+                # an AttributeError for the body.
+                self._body = []
+                self._locals = local_names
+                util.reraise(exceptions.AstroidBuildingError(
+                    'Building the body of {name} failed:\n{error}',
+                    name=self.name, modname=self.root().name, error=exc))
+            finally:
+                self._building_body = False
+            self._pending_transforms = None
+            # Cleared last, the other threads waiting for the body
+            # until then.
+            self._deferred_body = None
+            self._body_lock = None
+
+    @property
+    def body(self):
+        if self._deferred_body is not None:
+            self._build_deferred_body()
+        return self._body
+
+    @body.setter
+    def body(self, body):
+        if self._deferred_body is not None:
+            self._deferred_body = None
+        self._body = body
+
+    @property
+    def locals(self):
+        if self._deferred_body is not None:
+            self._build_deferred_body()
+        return self._locals
+
+    @locals.setter
+    def locals(self, value):
+        self._locals = value
+
     # pylint: disable=arguments-differ; different than Lambdas
     def postinit(self, args, body, decorators=None, returns=None):
         self.args = args
@@ -827,7 +1033,7 @@ class FunctionDef(node_classes.Statement, Lambda):
                 pass
         return type_name
 
-    @decorators_mod.cachedproperty
+    @positions.lineproperty
     def fromlineno(self):
         # lineno is the line number of the first decorator, we want the def
         # statement lineno
@@ -1075,6 +1281,8 @@ class ClassDef(mixins.FilterStmtsMixin, LocalsDictNodeNG,
     # some of the attributes below are set by the builder module or
     # by a raw factories
 
+    # slotted along with the fields, as every class has them
+    __slots__ = ('instance_attrs', '_cached_qname')
     # a dictionary of class instances attributes
     _astroid_fields = ('decorators', 'bases', 'body') # name
 
@@ -0,0 +1,126 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""Statistics about the caches of a manager and the time spent building modules
+
+The statistics are only collected once enabled. A build step only counts
+the module's own work: the time spent building the other modules it
+needs while it runs is counted for these modules, not for it.
+"""
+
+import collections
+import contextlib
+import json
+import threading
+import time
+
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+# The steps timed for each module.
+PARSE = 'parse'
+REBUILD = 'rebuild'
+POST_BUILD = 'post_build'
+TRANSFORMS = 'transforms'
+INSPECT = 'inspect'
+LIVE_IMPORT = 'live_import'
+
+
+class BuildStats(object):
+    """Hits and misses of the caches of a manager and build timings.
+
+    Callbacks registered with :meth:`register_callback` are called with
+    the module name, the name of the step and the number of seconds it
+    took, every time a build step is timed.
+
+    The timings of every step are added up for all the modules, but only
+    the last *max_modules* modules timed are detailed.
+    """
+
+    def __init__(self, enabled=False, max_modules=100):
+        self.enabled = enabled
+        self.max_modules = max_modules
+        self._lock = threading.Lock()
+        self._callbacks = []
+        # the timers running in each thread, innermost last
+        self._running = threading.local()
+        self.reset()
+
+    def reset(self):
+        """Forget the collected statistics."""
+        with self._lock:
+            # cache name -> [hits, misses]
+            self._caches = {}
+            # modname -> {step: seconds}, least recently timed first
+            self._modules = collections.OrderedDict()
+            # step -> seconds
+            self._totals = {}
+
+    def hit(self, cache):
+        if self.enabled:
+            with self._lock:
+                self._caches.setdefault(cache, [0, 0])[0] += 1
+
+    def miss(self, cache):
+        if self.enabled:
+            with self._lock:
+                self._caches.setdefault(cache, [0, 0])[1] += 1
+
+    def record(self, modname, step, seconds):
+        """Add *seconds* to the time spent on *step* for *modname*."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._totals[step] = self._totals.get(step, 0) + seconds
+            steps = self._modules.pop(modname, {})
+            steps[step] = steps.get(step, 0) + seconds
+            self._modules[modname] = steps
+            while len(self._modules) > self.max_modules:
+                self._modules.popitem(last=False)
+        for callback in self._callbacks:
+            callback(modname, step, seconds)
+
+    @contextlib.contextmanager
+    def timer(self, modname, step):
+        """Time the block as the given *step* of the build of *modname*.
+
+        The time spent in the timers nested in the block isn't counted.
+        """
+        if not self.enabled:
+            yield
+            return
+        running = self._running.__dict__.setdefault('timers', [])
+        # seconds spent in the nested timers
+        running.append(0)
+        start = _clock()
+        try:
+            yield
+        finally:
+            elapsed = _clock() - start
+            nested = running.pop()
+            if running:
+                running[-1] += elapsed
+            self.record(modname, step, elapsed - nested)
+
+    def register_callback(self, callback):
+        self._callbacks.append(callback)
+
+    def unregister_callback(self, callback):
+        self._callbacks.remove(callback)
+
+    def as_dict(self):
+        """Get the statistics as a dictionary of builtin types."""
+        with self._lock:
+            caches = dict((name, {'hits': hits, 'misses': misses})
+                          for name, (hits, misses) in self._caches.items())
+            modules = dict((modname, dict(steps))
+                           for modname, steps in self._modules.items())
+            totals = dict(self._totals)
+        return {'caches': caches, 'modules': modules, 'totals': totals}
+
+    def to_json(self, **kwargs):
+        """Get the statistics as a JSON document.
+
+        The keyword arguments are given to :func:`json.dumps`.
+        """
+        return json.dumps(self.as_dict(), **kwargs)
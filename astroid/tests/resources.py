@@ -10,6 +10,7 @@ import sys
 import pkg_resources
 
 from astroid import builder
+from astroid import manager
 from astroid import MANAGER
 from astroid.bases import  BUILTINS
 
@@ -25,6 +26,15 @@ def build_file(path, modname=None):
     return builder.AstroidBuilder().file_build(find(path), modname)
 
 
+def isolated_builder(**options):
+    """Get a builder using a new isolated manager, the given options being
+    set on the manager."""
+    astroid_manager = manager.AstroidManager(isolated=True)
+    for name, value in options.items():
+        setattr(astroid_manager, name, value)
+    return builder.AstroidBuilder(astroid_manager)
+
+
 class SysPathSetup(object):
     def setUp(self):
         sys.path.insert(0, find(''))
@@ -8,16 +8,26 @@
 
 """tests for the astroid builder and rebuilder module"""
 
+import ast
+import codecs
+import gc
 import os
 import sys
+import tempfile
+import threading
+import textwrap
+import time
 import unittest
 
 import six
 
+from astroid import bases
 from astroid import builder
 from astroid import exceptions
 from astroid import manager
+from astroid import node_classes
 from astroid import nodes
+from astroid import rebuilder
 from astroid import test_utils
 from astroid import util
 from astroid.tests import resources
@@ -258,6 +268,24 @@ class BuilderTest(unittest.TestCase):
         """check that a file with no trailing new line is parseable"""
         resources.build_file('data/noendingnewline.py')
 
+    def test_file_bytes_kept(self):
+        data = u'# -*- coding: latin-1 -*-\r\nVALUE = "\xe9t\xe9"\r\n'.encode('latin-1')
+        fd, path = tempfile.mkstemp(suffix='.py')
+        try:
+            with os.fdopen(fd, 'wb') as stream:
+                stream.write(data)
+            module = self.builder.file_build(path, 'latin1_module')
+        finally:
+            os.remove(path)
+        self.assertEqual(module.file_bytes, data)
+        # Python 2 keeps the declared name of the encoding.
+        self.assertEqual(codecs.lookup(module.file_encoding).name, 'iso8859-1')
+        with module.stream() as stream:
+            self.assertEqual(stream.read(), data)
+        if six.PY3:
+            self.assertEqual(module.body[0].value.value, u'\xe9t\xe9')
+        self.assertEqual(module['VALUE'].fromlineno, 2)
+
     def test_missing_file(self):
         with self.assertRaises(exceptions.AstroidBuildingError):
             resources.build_file('data/inexistant.py')
@@ -716,6 +744,308 @@ class ModuleBuildTest(resources.SysPathSetup, FileBuildTest):
         else:
             self.module = abuilder.module_build(data.module, 'data.module')
 
+
+class DeferredFunctionBodyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = manager.AstroidManager()
+        self.manager.defer_function_bodies = True
+        self.transformed = []
+
+    def tearDown(self):
+        self.manager.defer_function_bodies = False
+
+    def test_body_built_on_first_use(self):
+        module = builder.parse('''
+            @staticmethod
+            def func(arg, *args):
+                value = 1
+                return value
+        ''')
+        func = module['func']
+        self.assertIsNotNone(func._deferred_body)
+        self.assertIsInstance(func.args, nodes.Arguments)
+        self.assertIsInstance(func.decorators, nodes.Decorators)
+        self.assertIsNotNone(func._deferred_body)
+        self.assertIn('value', func.locals)
+        self.assertIsNone(func._deferred_body)
+        self.assertEqual(sorted(func.locals), ['arg', 'args', 'value'])
+        self.assertEqual(len(func.body), 2)
+        self.assertIs(func.body[0].parent, func)
+        self.assertEqual(next(func.infer_call_result(None)).value, 1)
+
+    def test_no_instance_dict(self):
+        module = builder.parse('''
+            def func(arg):
+                return [elt for elt in arg]
+        ''')
+        func = module['func']
+        deferred = set(['_deferred_body', '_pending_transforms',
+                        '_building_body', '_body_lock'])
+        self.assertFalse(deferred & set(node_classes._instance_dict(func) or ()))
+        # Only the manager and the statements are kept to build the body.
+        self.assertFalse([value for value in gc.get_referents(func._deferred_body)
+                          if isinstance(value, rebuilder.TreeRebuilder)])
+        self.assertIsInstance(func.body[0], nodes.Return)
+        self.assertFalse(deferred & set(node_classes._instance_dict(func) or ()))
+
+    def test_not_deferred(self):
+        module = builder.parse('''
+            def uses_global():
+                global X
+                X = 1
+            def assigns_attribute(obj):
+                obj.attr = 1
+        ''')
+        self.assertIn('X', module.locals)
+        for name in ('uses_global', 'assigns_attribute'):
+            self.assertIsNone(module[name]._deferred_body)
+
+    def test_transforms_applied_once_built(self):
+        def transform(node):
+            self.transformed.append(node.value)
+        self.manager.register_transform(nodes.Const, transform)
+        try:
+            module = builder.parse('''
+                A = 1
+                def func():
+                    return 2
+            ''')
+            self.assertEqual(self.transformed, [1])
+            module['func'].body # pylint: disable=pointless-statement
+            self.assertEqual(self.transformed, [1, 2])
+        finally:
+            self.manager.unregister_transform(nodes.Const, transform)
+
+    def test_failed_build_raised(self):
+        def transform(node):
+            self.transformed.append(node.value)
+            if len(self.transformed) == 1:
+                raise AttributeError('broken transform')
+        self.manager.register_transform(nodes.Const, transform)
+        try:
+            module = builder.parse('''
+                def func(arg):
+                    value = 1
+                    return value
+            ''')
+            func = module['func']
+            with self.assertRaises(exceptions.AstroidBuildingError) as failure:
+                func.body # pylint: disable=pointless-statement
+            self.assertIsInstance(failure.exception.error, AttributeError)
+            self.assertFalse(func._building_body)
+            self.assertIsNotNone(func._deferred_body)
+            self.assertEqual(sorted(func._locals), ['arg'])
+            # Built again once used again.
+            self.assertEqual(len(func.body), 2)
+            self.assertEqual(func.locals['value'], [func.body[0].targets[0]])
+            self.assertIsNone(func._deferred_body)
+        finally:
+            self.manager.unregister_transform(nodes.Const, transform)
+
+    def test_transforms_see_the_body(self):
+        def transform(node):
+            self.transformed.append(len(node.frame().body))
+        self.manager.register_transform(nodes.Return, transform)
+        try:
+            module = builder.parse('''
+                def func():
+                    value = 1
+                    return value
+            ''')
+            self.assertEqual(len(module['func'].body), 2)
+            self.assertEqual(self.transformed, [2])
+        finally:
+            self.manager.unregister_transform(nodes.Return, transform)
+
+    def test_body_built_once_by_threads(self):
+        module = builder.parse('''
+            def func():
+                value = 1
+                return value
+        ''')
+        func = module['func']
+        build = func._deferred_body
+        builds = []
+
+        def slow_build(node):
+            builds.append(node)
+            time.sleep(0.05)
+            return build(node)
+        func._deferred_body = slow_build
+        bodies = []
+        threads = [threading.Thread(target=lambda: bodies.append(func.body))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(builds, [func])
+        self.assertEqual(len(bodies), 4)
+        for body in bodies:
+            self.assertIs(body, func.body)
+            self.assertEqual(len(body), 2)
+
+
+class AstBuildTest(unittest.TestCase):
+
+    CODE = (b'"""module doc"""\n'
+            b'class A(object):\n'
+            b'    """class doc"""\n'
+            b'def func(arg):\n'
+            b'    """func doc"""\n'
+            b'    return arg\n'
+            b'VALUE = func(A())\n')
+
+    def setUp(self):
+        self.builder = builder.AstroidBuilder()
+
+    def test_ast_build(self):
+        node = ast.parse(self.CODE)
+        module = self.builder.ast_build(node, self.CODE, 'ast_built')
+        self.assertEqual(module.name, 'ast_built')
+        self.assertEqual(module.doc, 'module doc')
+        self.assertEqual(module['A'].doc, 'class doc')
+        self.assertEqual(module['func'].doc, 'func doc')
+        self.assertEqual(len(module['func'].body), 1)
+        self.assertEqual(module.file_bytes, self.CODE)
+        # Without an encoding declaration, Python 2 sources are ASCII.
+        self.assertEqual(module.file_encoding, 'utf-8' if six.PY3 else None)
+        inferred = next(module['VALUE'].infer())
+        self.assertIsInstance(inferred, bases.Instance)
+        self.assertEqual(inferred.name, 'A')
+
+    def test_ast_is_not_modified(self):
+        node = ast.parse(self.CODE)
+        dumped = ast.dump(node)
+        first = self.builder.ast_build(node, self.CODE, 'ast_built')
+        second = self.builder.ast_build(node, self.CODE, 'ast_built')
+        self.assertEqual(ast.dump(node), dumped)
+        self.assertEqual(first.doc, second.doc)
+        self.assertEqual(second['func'].doc, 'func doc')
+
+    def test_ast_build_without_source(self):
+        module = builder.parse_ast(ast.parse(self.CODE), module_name='ast_built')
+        self.assertIsNone(module.file_bytes)
+        self.assertEqual(module.doc, 'module doc')
+
+    def test_ast_build_not_a_module(self):
+        node = ast.parse('x = 1').body[0]
+        with self.assertRaises(exceptions.AstroidBuildingError):
+            self.builder.ast_build(node)
+
+
+class StringRebuildTest(unittest.TestCase):
+
+    OLD = textwrap.dedent('''
+    """module doc"""
+    import os
+
+    class A(object):
+        def method(self):
+            self.attr = 1
+            return compute()
+
+    def compute():
+        return 1
+
+    def setup():
+        B.added = 2
+
+    class B(object):
+        pass
+
+    A.removed = 3
+    ''')
+
+    NEW = textwrap.dedent('''
+    """module doc"""
+    import os
+    import sys
+
+    class A(object):
+        def method(self):
+            self.attr = 1
+            return compute()
+
+    def compute():
+        return 'changed'
+
+    def setup():
+        B.added = 2
+
+    class B(object):
+        other = 1
+    ''')
+
+    def setUp(self):
+        self.manager = manager.AstroidManager(isolated=True)
+        self.builder = builder.AstroidBuilder(self.manager)
+
+    def _positions(self, module):
+        return [(node.__class__.__name__, node.lineno, node.col_offset,
+                 node.fromlineno, node.tolineno)
+                for node in module.nodes_of_class(node_classes.NodeNG)]
+
+    def test_unchanged_statements_are_reused(self):
+        previous = self.builder.string_build(self.OLD, 'rebuilt')
+        class_a, setup = previous['A'], previous['setup']
+        module = self.builder.string_rebuild(previous, self.NEW)
+        self.assertIs(module['A'], class_a)
+        self.assertIs(module['setup'], setup)
+        self.assertIs(class_a.parent, module)
+        self.assertEqual(module.doc, 'module doc')
+        self.assertIs(self.manager.astroid_cache['rebuilt'], module)
+
+    def test_same_tree_as_full_build(self):
+        previous = self.builder.string_build(self.OLD, 'rebuilt')
+        module = self.builder.string_rebuild(previous, self.NEW)
+        expected = builder.AstroidBuilder(self.manager).string_build(self.NEW, 'rebuilt')
+        self.assertEqual(module.as_string(), expected.as_string())
+        self.assertEqual(self._positions(module), self._positions(expected))
+        self.assertEqual(sorted(module.locals), sorted(expected.locals))
+        for name, values in expected.locals.items():
+            self.assertEqual([value.fromlineno for value in module.locals[name]],
+                             [value.fromlineno for value in values])
+        self.assertEqual(sorted(module['A'].locals), ['method'])
+        self.assertEqual(sorted(module['A'].instance_attrs), ['attr'])
+        self.assertEqual(sorted(module['B'].locals), ['added', 'other'])
+
+    def test_inference_uses_rebuilt_statements(self):
+        previous = self.builder.string_build(self.OLD, 'rebuilt')
+        call = previous['A']['method'].body[1].value
+        self.assertEqual(next(call.infer()).value, 1)
+        module = self.builder.string_rebuild(previous, self.NEW)
+        call = module['A']['method'].body[1].value
+        self.assertEqual(next(call.infer()).value, 'changed')
+
+    def test_transforms_only_changed_statements(self):
+        visited = []
+        def transform(node):
+            visited.append(node.name)
+        self.manager.register_transform(nodes.FunctionDef, transform)
+        previous = self.builder.string_build(self.OLD, 'rebuilt')
+        del visited[:]
+        self.builder.string_rebuild(previous, self.NEW)
+        self.assertEqual(visited, ['compute'])
+
+    def test_moved_deferred_body(self):
+        self.manager.defer_function_bodies = True
+        previous = self.builder.string_build(self.OLD, 'rebuilt')
+        compute = previous['compute']
+        module = self.builder.string_rebuild(previous, '\n\n' + self.OLD)
+        self.assertIs(module['compute'], compute)
+        self.assertEqual(compute.body[0].lineno, 13)
+        self.assertEqual(compute.tolineno, 13)
+
+    def test_changed_future_imports(self):
+        previous = self.builder.string_build(self.OLD, 'rebuilt')
+        module = self.builder.string_rebuild(
+            previous, 'from __future__ import division\n' + self.OLD)
+        self.assertIsNot(module['A'], previous['A'])
+        self.assertEqual(module.future_imports, set(['division']))
+
+
 @unittest.skipIf(six.PY3, "guess_encoding not used on Python 3")
 class TestGuessEncoding(unittest.TestCase):
     def setUp(self):
@@ -0,0 +1,190 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""tests for the persistent cache of built modules"""
+
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import textwrap
+import unittest
+
+import six
+
+import astroid
+from astroid import builder
+from astroid import diskcache
+from astroid import manager
+from astroid import nodes
+from astroid.tests import resources
+
+
+BUILTINS = six.moves.builtins.__name__
+
+SOURCE = textwrap.dedent('''
+    import os
+    from collections import OrderedDict
+
+    class Klass(object):
+        def __init__(self):
+            self.attr = OrderedDict()
+
+        def method(self):
+            return os.path.join('a', 'b')
+
+    CONSTANT = Klass().method()
+''')
+
+
+class DiskCacheTest(resources.AstroidCacheSetupMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.manager = manager.AstroidManager()
+        self.source_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(tempfile.mkdtemp(), 'cache')
+        self.filepath = os.path.join(self.source_dir, 'cachedmod.py')
+        self._write(SOURCE)
+        self.manager.cache_directory = self.cache_dir
+        self.builds = []
+        self._orig_file_build = builder.AstroidBuilder.file_build
+        builds = self.builds
+        orig_file_build = self._orig_file_build
+
+        def file_build(instance, path, modname=None):
+            builds.append(path)
+            return orig_file_build(instance, path, modname)
+        builder.AstroidBuilder.file_build = file_build
+
+    def tearDown(self):
+        builder.AstroidBuilder.file_build = self._orig_file_build
+        self.manager.cache_directory = None
+        self.manager.astroid_cache.pop('cachedmod', None)
+        shutil.rmtree(self.source_dir)
+        shutil.rmtree(os.path.dirname(self.cache_dir))
+
+    def _write(self, source):
+        with open(self.filepath, 'w') as stream:
+            stream.write(source)
+
+    def _build(self):
+        self.manager.astroid_cache.pop('cachedmod', None)
+        return self.manager.ast_from_file(self.filepath, 'cachedmod')
+
+    def _entries(self):
+        return [name for name in os.listdir(self.cache_dir)
+                if name.endswith('.ast')]
+
+    def test_module_is_reused_from_disk(self):
+        first = self._build()
+        self.assertEqual(len(self._entries()), 1)
+        second = self._build()
+        self.assertEqual(self.builds, [self.filepath])
+        self.assertIsNot(first, second)
+        self.assertIs(self.manager.astroid_cache['cachedmod'], second)
+        self.assertEqual(second.as_string(), first.as_string())
+        klass = second['Klass']
+        self.assertIsInstance(klass, nodes.ClassDef)
+        self.assertIs(klass.root(), second)
+        self.assertIn('attr', klass.instance_attrs)
+        # References to other modules are not copied.
+        obj = next(klass.ancestors())
+        self.assertIs(obj.root(), self.manager.astroid_cache[BUILTINS])
+
+    def test_changed_source_is_rebuilt(self):
+        self._build()
+        self._write(SOURCE + '\nOTHER = 2\n')
+        module = self._build()
+        self.assertEqual(self.builds, [self.filepath] * 2)
+        self.assertIn('OTHER', module.locals)
+        self.assertIn('OTHER', self._build().locals)
+        self.assertEqual(len(self.builds), 2)
+
+    def test_corrupted_entry_is_rebuilt(self):
+        self._build()
+        entry = os.path.join(self.cache_dir, self._entries()[0])
+        with open(entry, 'rb') as stream:
+            data = stream.read()
+        with open(entry, 'wb') as stream:
+            stream.write(data[:len(data) // 2])
+        module = self._build()
+        self.assertEqual(len(self.builds), 2)
+        self.assertIn('Klass', module.locals)
+        # The entry was written again after the rebuild.
+        self._build()
+        self.assertEqual(len(self.builds), 2)
+
+    def test_transforms_are_part_of_the_key(self):
+        self._build()
+
+        def transform(node):
+            node.transformed = True
+        self.manager.register_transform(nodes.ClassDef, transform)
+        try:
+            module = self._build()
+        finally:
+            self.manager.unregister_transform(nodes.ClassDef, transform)
+        self.assertEqual(len(self.builds), 2)
+        self.assertTrue(module['Klass'].transformed)
+        self.assertEqual(len(self._entries()), 2)
+
+    def test_context_and_inference_tips_are_stored(self):
+        self._write(textwrap.dedent('''
+            first, second = 1, 2
+            del first
+            mapping = dict(key=second)
+        '''))
+        self._build()
+        module = self._build()
+        self.assertEqual(len(self.builds), 1)
+        target = module.body[0].targets[0]
+        self.assertIs(target.ctx, astroid.Store)
+        inferred = next(module['mapping'].infer())
+        self.assertIsInstance(inferred, nodes.Dict)
+
+    def test_changed_dependency_is_rebuilt(self):
+        dependency = os.path.join(self.source_dir, 'cacheddep.py')
+        with open(dependency, 'w') as stream:
+            stream.write('FIRST = 1\n')
+        self._write('from cacheddep import *\n')
+        sys.path.insert(0, self.source_dir)
+        try:
+            self.assertIn('FIRST', self._build().locals)
+            self.assertIn('FIRST', self._build().locals)
+            self.assertEqual(self.builds.count(self.filepath), 1)
+            with open(dependency, 'a') as stream:
+                stream.write('SECOND = 2\n')
+            self.manager.invalidate('cacheddep')
+            self.assertIn('SECOND', self._build().locals)
+            self.assertEqual(self.builds.count(self.filepath), 2)
+        finally:
+            sys.path.remove(self.source_dir)
+            self.manager.invalidate('cacheddep')
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), 'requires file owners')
+    def test_entries_writable_by_others_are_not_used(self):
+        self._build()
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache_dir).st_mode), 0o700)
+        entry = os.path.join(self.cache_dir, self._entries()[0])
+        os.chmod(entry, 0o622)
+        self._build()
+        self.assertEqual(len(self.builds), 2)
+        os.chmod(self.cache_dir, 0o777)
+        self._build()
+        self._build()
+        self.assertEqual(len(self.builds), 4)
+
+    def test_stdlib_module_round_trip(self):
+        cache = diskcache.DiskCache(self.cache_dir, self.manager)
+        module = self.manager.ast_from_module_name('textwrap')
+        self.assertTrue(cache.store(module))
+        loaded = cache.load(module.file, 'textwrap')
+        self.assertIsNotNone(loaded)
+        self.assertIsNot(loaded, module)
+        self.assertEqual(loaded.as_string(), module.as_string())
+        self.assertEqual(sorted(loaded.locals), sorted(module.locals))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""tests for the index of the nodes of the modules by position"""
+
+import textwrap
+import unittest
+
+import six
+
+from astroid import nodes
+from astroid.tests import resources
+
+
+SOURCE = textwrap.dedent('''\
+    import os
+
+    @decorator(1)
+    def function(arg, other=2):
+        value = call(arg, other)
+        if value:
+            return [elt for elt in other]
+        return lambda: arg
+
+    class Klass(object):
+        """doc"""
+        attr = function(1,
+                        2)
+''')
+
+
+class IntervalIndexTest(unittest.TestCase):
+
+    def _build(self, source=SOURCE, defer_function_bodies=False):
+        self.builder = resources.isolated_builder(
+            defer_function_bodies=defer_function_bodies)
+        return self.builder.string_build(source, 'intervals')
+
+    def test_node_at(self):
+        module = self._build()
+        self.assertIsNone(module._interval_index)
+        node = module.node_at(5, 22)
+        self.assertIsNotNone(module._interval_index)
+        self.assertIsInstance(node, nodes.Name)
+        self.assertEqual(node.name, 'other')
+        self.assertEqual(module.node_at(5, 17).name, 'arg')
+        # The innermost of the nodes starting at the same position.
+        self.assertEqual(module.node_at(5, 12).name, 'call')
+        self.assertIsInstance(module.node_at(5, 12).parent, nodes.Call)
+        node = module.node_at(1, 0)
+        self.assertIsInstance(node, nodes.Import)
+        self.assertIsNone(module.node_at(2, 0))
+        self.assertIsNone(module.node_at(20, 0))
+
+    def test_indentation_and_headers(self):
+        module = self._build()
+        function = module['function']
+        self.assertIs(module.node_at(6, 0), function)
+        self.assertIsInstance(module.node_at(3, 11), nodes.Const)
+        # The arguments have no position, their names have one.
+        self.assertIs(module.node_at(4, 12), function)
+        self.assertEqual(module.node_at(4, 13).name, 'arg')
+
+    def test_multiline_statement(self):
+        module = self._build()
+        assign = module['Klass'].body[0]
+        self.assertIs(module.statement_at(13, 0), assign)
+        self.assertEqual(module.node_at(13, 24).value, 2)
+
+    def test_statement_and_scope_at(self):
+        module = self._build()
+        function = module['function']
+        self.assertIs(module.statement_at(5, 22), function.body[0])
+        self.assertIs(module.scope_at(5, 22), function)
+        if six.PY3:
+            self.assertIsInstance(module.scope_at(7, 21), nodes.ListComp)
+        else:
+            # List comprehensions have no scope of their own on Python 2.
+            self.assertIs(module.scope_at(7, 21), function)
+        self.assertIsInstance(module.scope_at(8, 23), nodes.Lambda)
+        self.assertIs(module.scope_at(11, 4), module['Klass'])
+        self.assertIsNone(module.statement_at(2, 0))
+        self.assertIs(module.scope_at(2, 0), module)
+
+    def test_deferred_function_bodies(self):
+        module = self._build(defer_function_bodies=True)
+        self.assertIsNotNone(module['function']._deferred_body)
+        self.assertEqual(module.node_at(5, 22).name, 'other')
+
+    def test_dropped_by_string_rebuild(self):
+        module = self._build()
+        self.assertEqual(module.node_at(5, 22).name, 'other')
+        rebuilt = self.builder.string_rebuild(module, 'new = 1\n' + SOURCE)
+        self.assertIsNone(module._interval_index)
+        self.assertIs(rebuilt['function'], module['function'])
+        self.assertEqual(rebuilt.node_at(6, 22).name, 'other')
+        self.assertIsInstance(rebuilt.statement_at(1, 0), nodes.Assign)
+
+
+if __name__ == '__main__':
+    unittest.main()
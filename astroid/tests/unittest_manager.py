@@ -5,9 +5,16 @@
 # Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
 # For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
 
+import gc
+import json
 import os
 import platform
+import shutil
 import sys
+import tempfile
+import threading
+import time
+import traceback
 import unittest
 
 import six
@@ -15,6 +22,8 @@ import six
 import astroid
 from astroid import exceptions
 from astroid import manager
+from astroid import modutils
+from astroid import stats as astroid_stats
 from astroid.tests import resources
 
 
@@ -226,6 +235,709 @@ class AstroidManagerTest(resources.SysPathSetup,
         del self.manager._failed_import_hooks[0]
 
 
+class ModuleCacheTest(resources.AstroidCacheSetupMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.cache = manager.ModuleCache()
+        self.modules = [astroid.parse('x = %d' % index, module_name='mod%d' % index)
+                        for index in range(4)]
+
+    def test_evicts_least_recently_used(self):
+        self.cache.max_modules = 3
+        for module in self.modules[:3]:
+            self.cache[module.name] = module
+        self.cache['mod0'] # pylint: disable=pointless-statement
+        self.cache['mod3'] = self.modules[3]
+        self.assertEqual(sorted(self.cache), ['mod0', 'mod2', 'mod3'])
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_pinned_modules_are_kept(self):
+        self.cache.max_modules = 1
+        self.cache[BUILTINS] = self._builtins
+        self.cache.pin('mod0')
+        for module in self.modules:
+            self.cache[module.name] = module
+        self.assertEqual(sorted(self.cache), [BUILTINS, 'mod0', 'mod3'])
+        self.assertEqual(self.cache.evictions, 2)
+
+    def test_byte_budget(self):
+        self.cache['mod0'] = self.modules[0]
+        self.cache.max_bytes = 0
+        self.cache['mod1'] = self.modules[1]
+        self.assertGreater(self.cache.size, 0)
+        self.assertEqual(list(self.cache), ['mod1'])
+        del self.cache['mod1']
+        self.assertEqual(self.cache.size, 0)
+
+    def test_evicted_modules_are_rebuilt(self):
+        cache = astroid.MANAGER.astroid_cache
+        cache.pop('unittest', None)
+        cache.pop('collections', None)
+        # Keep the modules cached by the previous tests out of the way.
+        previous = set(cache) - cache.pinned
+        for modname in previous:
+            cache.pin(modname)
+        cache.max_modules = len(cache) + 1
+        try:
+            first = astroid.MANAGER.ast_from_module_name('unittest')
+            astroid.MANAGER.ast_from_module_name('collections')
+            self.assertNotIn('unittest', cache)
+            self.assertIn(BUILTINS, cache)
+            second = astroid.MANAGER.ast_from_module_name('unittest')
+            self.assertIsNot(first, second)
+            self.assertEqual(second.name, 'unittest')
+        finally:
+            cache.max_modules = None
+            for modname in previous:
+                cache.unpin(modname)
+
+
+    def test_modules_being_built_are_kept(self):
+        directory = tempfile.mkdtemp()
+        try:
+            for modname, source in (('othermod', 'VALUE = 1\n'),
+                                    ('selfimport', 'from othermod import *\n'
+                                                   'from selfimport import *\n')):
+                with open(os.path.join(directory, modname + '.py'), 'w') as stream:
+                    stream.write(source)
+            isolated = manager.AstroidManager(isolated=True, search_path=[directory])
+            isolated.astroid_cache.max_modules = 1
+            module = isolated.ast_from_module_name('selfimport')
+            self.assertIs(isolated.ast_from_module_name('selfimport'), module)
+            self.assertEqual(module.wildcard_import_names(), ['VALUE'])
+        finally:
+            shutil.rmtree(directory)
+
+
+class ContextFileTest(resources.AstroidCacheSetupMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.manager = manager.AstroidManager()
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'rel_lib'))
+        self.context_file = os.path.join(self.directory, 'main.py')
+        self.relmod = os.path.join(self.directory, 'rel_lib', 'relmod.py')
+        for filename in (self.context_file, self.relmod):
+            with open(filename, 'w') as stream:
+                stream.write('VALUE = 1\n')
+        sys.path.append('rel_lib')
+        self.chdirs = []
+        self._orig_chdir = os.chdir
+        os.chdir = self._chdir
+
+    def tearDown(self):
+        os.chdir = self._orig_chdir
+        sys.path.remove('rel_lib')
+        self.manager.invalidate('relmod')
+        shutil.rmtree(self.directory)
+
+    def _chdir(self, path):
+        self.chdirs.append(path)
+        self._orig_chdir(path)
+
+    def test_relative_path_entry_from_context(self):
+        """relative entries of sys.path are searched from the context file
+        directory, as if it was the working directory
+        """
+        cwd = os.getcwd()
+        module = self.manager.ast_from_module_name('relmod', self.context_file)
+        self.assertEqual(module.file, self.relmod)
+        self.assertEqual(self.chdirs, [])
+        self.assertEqual(os.getcwd(), cwd)
+
+    def test_relative_path_entry_without_context(self):
+        with self.assertRaises(exceptions.AstroidBuildingError):
+            self.manager.ast_from_module_name('relmod')
+        self.assertEqual(self.chdirs, [])
+
+    def test_same_resolution_as_in_context_directory(self):
+        """modules are found as they were by changing the working directory
+        to the context file directory
+        """
+        modnames = ('os', 'sys', 'time', 'unittest', 'xml.dom', 'relmod')
+        cwd = os.getcwd()
+        expected = {}
+        self._orig_chdir(self.directory)
+        try:
+            for modname in modnames:
+                spec = modutils.file_info_from_modpath(
+                    modname.split('.'), context_file=self.context_file)
+                expected[modname] = (spec.type, spec.location and
+                                     os.path.abspath(spec.location))
+        finally:
+            self._orig_chdir(cwd)
+        for modname in modnames:
+            spec = self.manager.file_from_module_name(modname, self.context_file)
+            self.assertEqual((spec.type, spec.location), expected[modname])
+        self.assertEqual(self.chdirs, [])
+
+
+class NegativeCacheTest(resources.SysPathSetup,
+                        resources.AstroidCacheSetupMixin,
+                        unittest.TestCase):
+
+    def setUp(self):
+        super(NegativeCacheTest, self).setUp()
+        self.manager = manager.AstroidManager()
+        self.manager.clear_negative_cache()
+        self.lookups = []
+        self.hook_calls = []
+        self._orig_file_info = modutils.file_info_from_modpath
+
+        def file_info_from_modpath(modpath, *args, **kwargs):
+            self.lookups.append('.'.join(modpath))
+            return self._orig_file_info(modpath, *args, **kwargs)
+        modutils.file_info_from_modpath = file_info_from_modpath
+
+    def tearDown(self):
+        modutils.file_info_from_modpath = self._orig_file_info
+        self.manager.negative_cache_ttl = None
+        self.manager.clear_negative_cache()
+        super(NegativeCacheTest, self).tearDown()
+
+    def _hook(self, modname):
+        self.hook_calls.append(modname)
+        raise exceptions.AstroidBuildingError(modname=modname)
+
+    def _fail(self, modname='unknown_negative_mod'):
+        with self.assertRaises(exceptions.AstroidBuildingError):
+            self.manager.ast_from_module_name(modname)
+
+    def test_failed_import_is_cached(self):
+        self._fail()
+        self._fail()
+        self.assertEqual(self.lookups, ['unknown_negative_mod'])
+        with self.assertRaises(exceptions.AstroidBuildingError):
+            self.manager.file_from_module_name('unknown_negative_mod', None)
+        self.assertEqual(len(self.lookups), 1)
+
+    def test_cached_failure_traceback(self):
+        errors = []
+        for _ in range(3):
+            with self.assertRaises(exceptions.AstroidBuildingError) as cm:
+                self.manager.ast_from_module_name('unknown_negative_mod')
+            errors.append(cm.exception)
+        self.assertIsNot(errors[1], errors[2])
+        self.assertEqual(str(errors[2]), str(errors[0]))
+        if six.PY3:
+            # The traceback of each error only holds its own lookup.
+            depths = [len(traceback.extract_tb(error.__traceback__))
+                      for error in errors[1:]]
+            self.assertEqual(depths[0], depths[1])
+
+    def test_failed_hooks_are_cached(self):
+        self.manager.register_failed_import_hook(self._hook)
+        try:
+            self._fail()
+            self._fail()
+        finally:
+            self.manager._failed_import_hooks.remove(self._hook)
+        self.assertEqual(self.hook_calls, ['unknown_negative_mod'])
+
+    def test_missing_submodule_attribute(self):
+        package = self.manager.ast_from_module_name('data.package')
+        del self.lookups[:]
+        for _ in range(3):
+            with self.assertRaises(exceptions.AttributeInferenceError):
+                package.getattr('missing_submodule')
+        self.assertEqual(self.lookups, ['data.package.missing_submodule'])
+
+    def test_ttl(self):
+        self.manager.negative_cache_ttl = 0.01
+        self._fail()
+        time.sleep(0.02)
+        self._fail()
+        self.assertEqual(len(self.lookups), 2)
+
+    def test_sys_path_change(self):
+        self._fail()
+        sys.path.append('unknown_negative_dir')
+        try:
+            self._fail()
+        finally:
+            sys.path.remove('unknown_negative_dir')
+        self.assertEqual(len(self.lookups), 2)
+
+    def test_invalidate(self):
+        self._fail()
+        self.manager.invalidate('unknown_negative_mod')
+        self._fail()
+        self.assertEqual(len(self.lookups), 2)
+
+
+class BuildStatsTest(resources.AstroidCacheSetupMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.manager = manager.AstroidManager()
+        self.manager.stats.reset()
+        self.manager.stats.enabled = True
+        self.records = []
+        self.manager.stats.register_callback(self._callback)
+
+    def tearDown(self):
+        self.manager.stats.unregister_callback(self._callback)
+        self.manager.stats.enabled = False
+        self.manager.stats.reset()
+
+    def _callback(self, modname, step, seconds):
+        self.records.append((modname, step, seconds))
+
+    def test_build_steps(self):
+        self.manager.astroid_cache.pop('textwrap', None)
+        self.manager.ast_from_module_name('textwrap')
+        data = self.manager.stats.as_dict()
+        steps = data['modules']['textwrap']
+        self.assertEqual(sorted(steps),
+                         ['parse', 'post_build', 'rebuild', 'transforms'])
+        for seconds in steps.values():
+            self.assertGreaterEqual(seconds, 0)
+        for step in steps:
+            self.assertGreaterEqual(data['totals'][step], steps[step])
+        recorded = [record[1] for record in self.records if record[0] == 'textwrap']
+        self.assertEqual(sorted(recorded), sorted(steps))
+
+    def test_cache_lookups(self):
+        self.manager.astroid_cache.pop('textwrap', None)
+        self.manager._mod_file_cache.pop(('textwrap', None), None)
+        self.manager.ast_from_module_name('textwrap')
+        self.manager.ast_from_module_name('textwrap')
+        self.manager.file_from_module_name('textwrap', None)
+        caches = self.manager.stats.as_dict()['caches']
+        self.assertGreaterEqual(caches['astroid_cache']['hits'], 1)
+        self.assertGreaterEqual(caches['astroid_cache']['misses'], 1)
+        self.assertGreaterEqual(caches['_mod_file_cache']['hits'], 1)
+        self.assertGreaterEqual(caches['_mod_file_cache']['misses'], 1)
+
+    def test_concurrent_lookups(self):
+        stats = astroid_stats.BuildStats(enabled=True)
+
+        def count():
+            for _ in range(10000):
+                stats.hit('cache')
+                stats.miss('cache')
+
+        threads = [threading.Thread(target=count) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(stats.as_dict()['caches']['cache'],
+                         {'hits': 80000, 'misses': 80000})
+
+    def test_live_import(self):
+        self.manager.astroid_cache.pop('time', None)
+        self.manager.ast_from_module_name('time')
+        steps = self.manager.stats.as_dict()['modules']['time']
+        self.assertIn('live_import', steps)
+        self.assertIn('inspect', steps)
+
+    def test_json(self):
+        self.manager.ast_from_module_name('textwrap')
+        data = json.loads(self.manager.stats.to_json())
+        self.assertEqual(data, self.manager.stats.as_dict())
+
+    def test_nested_timers(self):
+        stats = astroid_stats.BuildStats(enabled=True)
+        with stats.timer('outer', astroid_stats.POST_BUILD):
+            time.sleep(0.05)
+            with stats.timer('inner', astroid_stats.PARSE):
+                time.sleep(0.1)
+        modules = stats.as_dict()['modules']
+        self.assertGreaterEqual(modules['inner']['parse'], 0.1)
+        self.assertLess(modules['outer']['post_build'], 0.1)
+
+    def test_modules_capped(self):
+        stats = astroid_stats.BuildStats(enabled=True, max_modules=2)
+        for modname in ('first', 'second', 'first', 'third'):
+            stats.record(modname, astroid_stats.PARSE, 1)
+        data = stats.as_dict()
+        self.assertEqual(data['modules'], {'first': {'parse': 2},
+                                           'third': {'parse': 1}})
+        self.assertEqual(data['totals'], {'parse': 4})
+
+    def test_disabled(self):
+        self.assertFalse(manager.AstroidManager(isolated=True).stats.enabled)
+        self.manager.stats.enabled = False
+        self.manager.astroid_cache.pop('textwrap', None)
+        self.manager.ast_from_module_name('textwrap')
+        self.assertEqual(self.manager.stats.as_dict(),
+                         {'caches': {}, 'modules': {}, 'totals': {}})
+        self.assertEqual(self.records, [])
+
+
+class InvalidationTest(resources.AstroidCacheSetupMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.manager = manager.AstroidManager()
+        self.directory = tempfile.mkdtemp()
+        sys.path.insert(0, self.directory)
+        self._write('base', 'X = 1\n')
+        self._write('star', 'from base import *\n')
+        self._write('other', 'Y = 2\n')
+
+    def tearDown(self):
+        sys.path.remove(self.directory)
+        for modname in ('base', 'star', 'other'):
+            self.manager.invalidate(modname)
+        shutil.rmtree(self.directory)
+
+    def _write(self, modname, source):
+        with open(os.path.join(self.directory, modname + '.py'), 'w') as stream:
+            stream.write(source)
+
+    def test_invalidate_dependents(self):
+        star = self.manager.ast_from_module_name('star')
+        other = self.manager.ast_from_module_name('other')
+        self.assertIn('X', star.locals)
+        self.assertEqual(self.manager.invalidate('base'), set(['base', 'star']))
+        self.assertNotIn('base', self.manager.astroid_cache)
+        self.assertNotIn('star', self.manager.astroid_cache)
+        self.assertIs(self.manager.astroid_cache['other'], other)
+
+    def test_builtins_are_never_invalidated(self):
+        self.assertEqual(self.manager.invalidate(BUILTINS), set())
+        self.assertIn(BUILTINS, self.manager.astroid_cache)
+
+    def test_refresh_rebuilds_stale_modules(self):
+        self.manager.ast_from_module_name('star')
+        other = self.manager.ast_from_module_name('other')
+        self.assertEqual(self.manager.refresh(), set())
+        self._write('base', 'X = 1\nZ = 3\n')
+        self.assertEqual(self.manager.refresh(), set(['base', 'star']))
+        self.assertIn('base', self.manager.astroid_cache)
+        star = self.manager.astroid_cache['star']
+        self.assertIn('Z', star.locals)
+        self.assertIs(self.manager.astroid_cache['other'], other)
+
+    def test_refresh_removed_module(self):
+        self.manager.ast_from_module_name('other')
+        os.remove(os.path.join(self.directory, 'other.py'))
+        self.assertEqual(self.manager.refresh(), set(['other']))
+        self.assertNotIn('other', self.manager.astroid_cache)
+
+
+class ThreadedBuildTest(resources.AstroidCacheSetupMixin, unittest.TestCase):
+
+    MODULES = ('argparse', 'calendar', 'collections', 'csv', 'decimal',
+               'difflib', 'json', 'logging', 'optparse', 'pprint', 'shutil',
+               'textwrap', 'unittest')
+
+    def setUp(self):
+        self.manager = manager.AstroidManager()
+        self.builds = []
+        for modname in self.MODULES:
+            self.manager.astroid_cache.pop(modname, None)
+        self.manager.register_transform(astroid.Module, self._count)
+
+    def tearDown(self):
+        self.manager.unregister_transform(astroid.Module, self._count)
+
+    def _count(self, module):
+        self.builds.append(module.name)
+
+    def test_modules_are_built_once(self):
+        errors = []
+        barrier = threading.Event()
+
+        def build(modnames):
+            barrier.wait()
+            try:
+                for modname in modnames:
+                    module = self.manager.ast_from_module_name(modname)
+                    # The module was completely built before being returned.
+                    self.assertIn(module.name, self.builds)
+            except Exception as exc: # pylint: disable=broad-except
+                errors.append(exc)
+
+        threads = []
+        for index in range(8):
+            # Every thread asks for all the modules, in a different order.
+            shift = index % len(self.MODULES)
+            modnames = self.MODULES[shift:] + self.MODULES[:shift]
+            if index % 2:
+                modnames = modnames[::-1]
+            thread = threading.Thread(target=build, args=(modnames,))
+            thread.start()
+            threads.append(thread)
+        barrier.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        for modname in self.MODULES:
+            self.assertEqual(self.builds.count(modname), 1, modname)
+        # Anonymous modules, such as the ones built by the brain
+        # plugins, aren't cached.
+        duplicates = set(name for name in self.builds
+                         if name and self.builds.count(name) > 1)
+        self.assertEqual(duplicates, set())
+
+    def test_import_cycle_between_threads(self):
+        directory = tempfile.mkdtemp()
+        sources = {'cycle_a': 'import cycle_b\nclass A(object):\n'
+                              '    def __init__(self):\n'
+                              '        self.attr = cycle_b.B()\n',
+                   'cycle_b': 'import cycle_a\nclass B(object):\n'
+                              '    def __init__(self):\n'
+                              '        self.attr = cycle_a.A()\n'}
+        for modname, source in sources.items():
+            with open(os.path.join(directory, modname + '.py'), 'w') as stream:
+                stream.write(source)
+        sys.path.insert(0, directory)
+        try:
+            threads = [threading.Thread(target=self.manager.ast_from_module_name,
+                                        args=(modname,))
+                       for modname in sources]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(30)
+                self.assertFalse(thread.is_alive())
+            for modname in sources:
+                self.assertIn(modname, self.manager.astroid_cache)
+        finally:
+            sys.path.remove(directory)
+            for modname in sources:
+                self.manager.invalidate(modname)
+            shutil.rmtree(directory)
+
+
+class PrewarmTest(resources.AstroidCacheSetupMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.manager = manager.AstroidManager()
+
+    def tearDown(self):
+        self.manager.astroid_cache.unpin('calendar')
+
+    def test_modules_are_built_and_pinned(self):
+        failed = self.manager.prewarm(['calendar', 'missing_prewarmed_module'])
+        self.assertEqual(list(failed), ['missing_prewarmed_module'])
+        self.assertIsInstance(failed['missing_prewarmed_module'],
+                              exceptions.AstroidImportError)
+        self.assertIn('calendar', self.manager.astroid_cache)
+        self.assertIn('calendar', self.manager.astroid_cache.pinned)
+        self.assertNotIn('missing_prewarmed_module',
+                         self.manager.astroid_cache.pinned)
+
+    @unittest.skipUnless(hasattr(gc, 'freeze'), 'requires gc.freeze')
+    def test_freeze(self):
+        try:
+            self.manager.prewarm(['calendar'], freeze=True)
+            self.assertGreater(gc.get_freeze_count(), 0)
+        finally:
+            gc.unfreeze()
+
+
+class LazyModuleTest(resources.AstroidCacheSetupMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.manager = manager.AstroidManager()
+        self.directory = tempfile.mkdtemp()
+        sys.path.insert(0, self.directory)
+        self._write('lazymod', 'X = 1\n')
+        self._write('brokenlazymod', 'def broken(:\n')
+        self.builds = []
+        self._orig_build_from_file = self.manager._build_from_file
+
+        def build_from_file(filepath, modname):
+            self.builds.append(modname)
+            return self._orig_build_from_file(filepath, modname)
+        self.manager._build_from_file = build_from_file
+
+    def tearDown(self):
+        del self.manager._build_from_file
+        self.manager.lazy_imports = False
+        sys.path.remove(self.directory)
+        for modname in ('lazymod', 'brokenlazymod', 'importer'):
+            self.manager.invalidate(modname)
+        shutil.rmtree(self.directory)
+
+    def _write(self, modname, source):
+        with open(os.path.join(self.directory, modname + '.py'), 'w') as stream:
+            stream.write(source)
+
+    def test_built_on_first_use(self):
+        module = self.manager.ast_from_module_name('lazymod', lazy=True)
+        self.assertIsInstance(module, astroid.scoped_nodes.LazyModule)
+        self.assertEqual(module.name, 'lazymod')
+        self.assertEqual(module.file, os.path.join(self.directory, 'lazymod.py'))
+        self.assertFalse(module.package)
+        self.assertIs(self.manager.ast_from_module_name('lazymod', lazy=True), module)
+        self.assertEqual(self.builds, [])
+
+        self.assertEqual(next(module.igetattr('X')).value, 1)
+        self.assertEqual(self.builds, ['lazymod'])
+        self.assertIs(type(module), astroid.nodes.Module)
+        self.assertIs(module.body[0].root(), module)
+        self.assertIs(self.manager.ast_from_module_name('lazymod'), module)
+        self.assertEqual(self.builds, ['lazymod'])
+
+    def test_size_measured_once_built(self):
+        self._write('biglazymod', ''.join('def function%d(arg):\n'
+                                          '    return [arg, %d]\n' % (i, i)
+                                          for i in range(50)))
+        cache = self.manager.astroid_cache
+        cache.max_bytes = 10 ** 9
+        try:
+            self.manager.ast_from_module_name('biglazymod')
+            eager_size = cache._sizes['biglazymod']
+            self.manager.invalidate('biglazymod')
+            module = self.manager.ast_from_module_name('biglazymod', lazy=True)
+            module.body # pylint: disable=pointless-statement
+            self.assertIs(cache['biglazymod'], module)
+            self.assertEqual(cache._sizes['biglazymod'], eager_size)
+        finally:
+            cache.max_bytes = None
+            self.manager.invalidate('biglazymod')
+
+    def test_missing_module(self):
+        with self.assertRaises(exceptions.AstroidImportError):
+            self.manager.ast_from_module_name('missing_lazymod', lazy=True)
+
+    def test_broken_module(self):
+        module = self.manager.ast_from_module_name('brokenlazymod', lazy=True)
+        with self.assertRaises(exceptions.AstroidSyntaxError) as first:
+            module.body
+        self.assertIsInstance(first.exception.error, SyntaxError)
+        self.assertIsInstance(module, astroid.scoped_nodes.LazyModule)
+        self.assertNotIn('brokenlazymod', self.manager.astroid_cache)
+        with self.assertRaises(exceptions.AstroidSyntaxError):
+            module.getattr('broken')
+        self.assertEqual(self.builds, ['brokenlazymod'])
+        with self.assertRaises(exceptions.AstroidSyntaxError):
+            self.manager.ast_from_module_name('brokenlazymod')
+
+    def test_lazy_imports(self):
+        self.manager.lazy_imports = True
+        module = astroid.builder.AstroidBuilder(self.manager).string_build(
+            'import lazymod\nlazymod\nfrom lazymod import X\nX', 'importer')
+        imported = next(module.body[1].value.infer())
+        self.assertIsInstance(imported, astroid.scoped_nodes.LazyModule)
+        self.assertEqual(self.builds, [])
+        self.assertEqual(next(module.body[3].value.infer()).value, 1)
+        self.assertEqual(self.builds, ['lazymod'])
+
+
+class DirectoryBuildTest(resources.AstroidCacheSetupMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.manager = manager.AstroidManager()
+        self.directory = tempfile.mkdtemp()
+        self.package = os.path.join(self.directory, 'dirbuildpkg')
+        os.mkdir(self.package)
+        self.expected = {}
+        for modname, source in (('__init__', ''), ('first', 'X = 1\n'),
+                                ('second', 'Y = 2\n'),
+                                ('broken', 'def broken(:\n')):
+            filepath = os.path.join(self.package, modname + '.py')
+            with open(filepath, 'w') as stream:
+                stream.write(source)
+            self.expected[filepath] = modname
+        sys.path.insert(0, self.directory)
+
+    def tearDown(self):
+        sys.path.remove(self.directory)
+        for modname in ('dirbuildpkg', 'dirbuildpkg.first', 'dirbuildpkg.second'):
+            self.manager.invalidate(modname)
+        shutil.rmtree(self.directory)
+
+    def _check(self, results):
+        results = dict(results)
+        self.assertEqual(set(results), set(self.expected))
+        for filepath, module in results.items():
+            if self.expected[filepath] == 'broken':
+                self.assertIsInstance(module, exceptions.AstroidSyntaxError)
+            else:
+                self.assertEqual(module.file, filepath)
+                self.assertIs(self.manager.astroid_cache[module.name], module)
+
+    def test_sequential(self):
+        self._check(self.manager.iter_ast_from_directory(self.package))
+
+    def test_parallel(self):
+        self._check(self.manager.iter_ast_from_directory(
+            self.package, workers=2, queue_size=1))
+
+    def test_blacklist(self):
+        results = dict(self.manager.iter_ast_from_directory(
+            self.package, blacklist=['b*.py'], workers=2))
+        del self.expected[os.path.join(self.package, 'broken.py')]
+        self._check(results)
+
+    def test_close_early(self):
+        threads = threading.active_count()
+        results = self.manager.iter_ast_from_directory(self.package, workers=2,
+                                                       queue_size=1)
+        filepath, _ = next(results)
+        self.assertIn(filepath, self.expected)
+        results.close()
+        # The workers are done once closed.
+        self.assertEqual(threading.active_count(), threads)
+
+
+class IsolatedManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.default = manager.AstroidManager()
+        self.directories = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        for value, directory in enumerate(self.directories):
+            with open(os.path.join(directory, 'isolatedmod.py'), 'w') as stream:
+                stream.write('VALUE = %d\n' % value)
+        self.managers = [manager.AstroidManager(isolated=True,
+                                                search_path=[directory])
+                         for directory in self.directories]
+
+    def tearDown(self):
+        for directory in self.directories:
+            shutil.rmtree(directory)
+
+    def test_separate_caches(self):
+        first, second = [isolated.ast_from_module_name('isolatedmod')
+                         for isolated in self.managers]
+        self.assertIsNot(first, second)
+        self.assertEqual(next(first['VALUE'].infer()).value, 0)
+        self.assertEqual(next(second['VALUE'].infer()).value, 1)
+        self.assertIs(first.manager, self.managers[0])
+        self.assertNotIn('isolatedmod', self.default.astroid_cache)
+        with self.assertRaises(exceptions.AstroidImportError):
+            self.default.ast_from_module_name('isolatedmod')
+
+    def test_imports_use_the_module_manager(self):
+        for value, isolated in enumerate(self.managers):
+            module = astroid.builder.AstroidBuilder(isolated).string_build(
+                'import isolatedmod\nisolatedmod.VALUE', 'importer')
+            inferred = next(module.body[-1].value.infer())
+            self.assertEqual(inferred.value, value)
+            self.assertIs(isolated.astroid_cache['importer'], module)
+
+    def test_builtins_are_shared(self):
+        builtins = self.default.astroid_cache[BUILTINS]
+        for isolated in self.managers:
+            self.assertIs(isolated.ast_from_module_name(BUILTINS), builtins)
+            isolated.clear_cache()
+            self.assertIs(isolated.astroid_cache[BUILTINS], builtins)
+
+    def test_transforms_are_copied(self):
+        def transform(node):
+            node.transformed = True
+        isolated = self.managers[0]
+        isolated.register_transform(astroid.nodes.ClassDef, transform)
+        module = astroid.builder.AstroidBuilder(isolated).string_build(
+            'class A(object): pass', 'transformed')
+        self.assertTrue(module['A'].transformed)
+        default_transforms = self.default._transform.transforms[astroid.nodes.ClassDef]
+        self.assertNotIn((transform, None), default_transforms)
+        module = astroid.builder.AstroidBuilder(self.default).string_build(
+            'class A(object): pass', 'not_transformed')
+        self.assertFalse(hasattr(module['A'], 'transformed'))
+        self.default.astroid_cache.pop('not_transformed')
+
+    def test_search_path_requires_isolation(self):
+        with self.assertRaises(ValueError):
+            manager.AstroidManager(search_path=self.directories)
+
+
 class BorgAstroidManagerTC(unittest.TestCase):
 
     def test_borg(self):
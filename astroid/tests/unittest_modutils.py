@@ -12,8 +12,11 @@ unit tests for module modutils (module manipulation utilities)
 """
 import email
 import os
+import shutil
 import sys
+import tempfile
 import unittest
+import zipfile
 from xml import etree
 
 import astroid
@@ -39,6 +42,24 @@ class ModuleFileTest(unittest.TestCase):
         self.assertEqual(spec.type, modutils.ModuleType.PY_ZIPMODULE)
         self.assertEqual(spec.location.split(os.sep)[-3:], ["data", "MyPyPa-0.1.0-py2.5.zip", self.package])
 
+    def test_find_zipped_submodule(self):
+        directory = tempfile.mkdtemp()
+        try:
+            archive = os.path.join(directory, 'archive.zip')
+            with zipfile.ZipFile(archive, 'w') as stream:
+                stream.writestr('zpkg/__init__.py', '')
+                stream.writestr('zpkg/zmod.py', 'X = 1\n')
+            spec = modutils._find_spec(['zpkg', 'zmod'], [archive])
+            self.assertEqual(spec.type, modutils.ModuleType.PY_ZIPMODULE)
+            self.assertEqual(spec.location,
+                             os.path.join(archive, 'zpkg', 'zmod'))
+            with self.assertRaises(ImportError):
+                modutils._find_spec(['zpkg', 'missing'], [archive])
+        finally:
+            modutils._ZIP_PATH_ENTRIES.pop(archive, None)
+            modutils._ZIP_ARCHIVES.pop(archive).close()
+            shutil.rmtree(directory)
+
     def test_find_egg_module(self):
         spec = modutils._find_spec(
             [self.package], [resources.find('data/MyPyPa-0.1.0-py2.5.egg')])
@@ -142,6 +163,194 @@ class FileFromModPathTest(resources.SysPathSetup, unittest.TestCase):
         # file with unicode characters.
         modutils.file_from_modpath(["data", "unicode_package", "core"])
 
+    def test_builtin_with_explicit_path(self):
+        path = modutils.search_path_from_context(__file__)
+        spec = modutils.file_info_from_modpath(['sys'], path=path)
+        self.assertEqual(spec.type, modutils.ModuleType.C_BUILTIN)
+        self.assertIsNone(spec.location)
+
+
+class SearchPathFromContextTest(unittest.TestCase):
+
+    def test_relative_entries(self):
+        context = os.path.abspath(resources.find('data/module.py'))
+        directory = os.path.dirname(context)
+        path = modutils.search_path_from_context(
+            context, ['', 'sub', os.path.join('..', 'other'), os.sep])
+        self.assertEqual(path, [directory, os.path.join(directory, 'sub'),
+                                os.path.join(os.path.dirname(directory), 'other'),
+                                os.sep])
+
+
+class PathIndexTest(resources.SysPathSetup, unittest.TestCase):
+
+    MODPATHS = (['os'], ['sys'], ['unittest', 'case'], ['xml', 'dom', 'minidom'],
+                ['email'], ['data', 'module'], ['data', 'package', 'subpackage', 'module'],
+                ['data', 'absimp', 'sidepackage'], ['mypypa'], ['turlututu'],
+                ['data', 'package', 'turlututu'])
+
+    def setUp(self):
+        super(PathIndexTest, self).setUp()
+        sys.path.insert(1, resources.find('data/MyPyPa-0.1.0-py2.5.zip'))
+        self.directory = tempfile.mkdtemp()
+        sys.path.append(self.directory)
+        modutils.enable_path_index()
+
+    def tearDown(self):
+        modutils.disable_path_index()
+        sys.path.remove(self.directory)
+        shutil.rmtree(self.directory)
+        del sys.path[1]
+        super(PathIndexTest, self).tearDown()
+
+    def _specs(self):
+        specs = []
+        for modpath in self.MODPATHS:
+            try:
+                specs.append(modutils.file_info_from_modpath(modpath))
+            except ImportError:
+                specs.append(None)
+        return specs
+
+    def test_same_results_as_without_index(self):
+        specs = self._specs()
+        modutils.disable_path_index()
+        self.assertEqual(specs, self._specs())
+        self.assertIsNone(specs[-1])
+
+    def test_no_filesystem_access_once_listed(self):
+        modutils.file_info_from_modpath(['unittest', 'case'])
+        modutils.file_info_from_modpath(['data', 'package', 'subpackage', 'module'])
+        expected = modutils.file_info_from_modpath(['unittest', 'util'])
+
+        def forbidden(*args):
+            raise AssertionError('unexpected filesystem access: %r' % (args, ))
+        stat = os.stat
+        stated = []
+
+        def record_stat(path):
+            stated.append(path)
+            return stat(path)
+        patched = [(os, 'listdir'), (modutils, 'scandir'),
+                   (os.path, 'exists'), (os.path, 'isfile'), (os.path, 'isdir'),
+                   (modutils.imp, 'find_module')]
+        originals = [getattr(obj, name) for obj, name in patched]
+        for obj, name in patched:
+            setattr(obj, name, forbidden)
+        os.stat = record_stat
+        try:
+            spec = modutils.file_info_from_modpath(['unittest', 'util'])
+            package = modutils.file_info_from_modpath(['data', 'package', 'hello'])
+        finally:
+            os.stat = stat
+            for (obj, name), original in zip(patched, originals):
+                setattr(obj, name, original)
+        self.assertEqual(spec, expected)
+        self.assertEqual(package.type, modutils.ModuleType.PY_SOURCE)
+        # Only the listed entries of the path are checked for changes.
+        self.assertTrue(stated)
+        for path in stated:
+            self.assertFalse(path.endswith('.py'), path)
+            self.assertIn(path, modutils._PATH_INDEX._listings)
+
+    def test_changed_directory_listed_again(self):
+        first = tempfile.mkdtemp()
+        sys.path.insert(0, first)
+        try:
+            with open(os.path.join(self.directory, 'shadowed_mod.py'), 'w'):
+                pass
+            spec = modutils.file_info_from_modpath(['shadowed_mod'])
+            self.assertEqual(os.path.dirname(spec.location), self.directory)
+            # Created after the first lookup, in a directory listed by it.
+            filename = os.path.join(first, 'shadowed_mod.py')
+            with open(filename, 'w'):
+                pass
+            # Make sure the modification time changes, whatever its resolution.
+            stat = os.stat(first)
+            os.utime(first, (stat.st_atime, stat.st_mtime + 1))
+            spec = modutils.file_info_from_modpath(['shadowed_mod'])
+            self.assertEqual(spec.location, filename)
+        finally:
+            sys.path.remove(first)
+            shutil.rmtree(first)
+
+    def test_refresh(self):
+        with self.assertRaises(ImportError):
+            modutils.file_info_from_modpath(['indexed_mod'])
+        filename = os.path.join(self.directory, 'indexed_mod.py')
+        with open(filename, 'w'):
+            pass
+        # Make sure the modification time changes.
+        stat = os.stat(self.directory)
+        os.utime(self.directory, (stat.st_atime, stat.st_mtime + 1))
+        modutils.refresh_path_index()
+        spec = modutils.file_info_from_modpath(['indexed_mod'])
+        self.assertEqual(spec.location, filename)
+
+
+@unittest.skipUnless(sys.version_info[:2] > (3, 3), "Needs importlib.machinery")
+class ImportlibFinderTest(unittest.TestCase):
+
+    def test_same_results_as_imp(self):
+        stdlib = os.path.dirname(os.__file__)
+        names = sorted(set(os.path.splitext(name)[0] for name in os.listdir(stdlib)))
+        names = [name for name in names if name.isidentifier()]
+        for name in names:
+            expected = modutils.ImpFinder(sys.path).find_module(name, [name], [], None)
+            spec = modutils.ImportlibFinder(sys.path).find_module(name, [name], [], None)
+            if expected is None:
+                self.assertIsNone(spec, name)
+                continue
+            self.assertEqual(spec.type, expected.type, name)
+            self.assertEqual(spec.location, expected.location and
+                             os.path.abspath(expected.location), name)
+
+    def test_submodule(self):
+        spec = modutils.ImportlibFinder(sys.path).find_module(
+            'minidom', ['xml', 'dom', 'minidom'], ['xml', 'dom'],
+            [os.path.join(os.path.dirname(os.__file__), 'xml', 'dom')])
+        self.assertEqual(spec.type, modutils.ModuleType.PY_SOURCE)
+        self.assertEqual(os.path.basename(spec.location), 'minidom.py')
+
+
+class RegisterSpecFinderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'generated.py')
+        with open(self.filename, 'w'):
+            pass
+        filename = self.filename
+
+        class BuildOutputFinder(modutils.Finder):
+            def find_module(self, modname, module_parts, processed, submodule_path):
+                if module_parts == ['build_output_mod']:
+                    return modutils.ModuleSpec(name=modname, location=filename,
+                                               type=modutils.ModuleType.PY_SOURCE)
+                return None
+        self.finder = BuildOutputFinder
+        modutils.register_spec_finder(self.finder)
+
+    def tearDown(self):
+        modutils.unregister_spec_finder(self.finder)
+        shutil.rmtree(self.directory)
+
+    def test_custom_finder(self):
+        spec = modutils.file_info_from_modpath(['build_output_mod'])
+        self.assertEqual(spec.location, self.filename)
+        self.assertEqual(spec.type, modutils.ModuleType.PY_SOURCE)
+        # Regular modules are still found by the builtin finders.
+        self.assertEqual(modutils.file_info_from_modpath(['os']).type,
+                         modutils.ModuleType.PY_SOURCE)
+
+    def test_unregistered_finder(self):
+        modutils.unregister_spec_finder(self.finder)
+        try:
+            with self.assertRaises(ImportError):
+                modutils.file_info_from_modpath(['build_output_mod'])
+        finally:
+            modutils.register_spec_finder(self.finder)
+
 
 class GetSourceFileTest(unittest.TestCase):
 
@@ -211,6 +420,57 @@ class StandardLibModuleTest(resources.SysPathSetup, unittest.TestCase):
         self.assertFalse(modutils.is_standard_module('xml.whatever', etree.__path__))
 
 
+class StandardModuleCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.std_path = (self.directory, )
+        modutils.clear_standard_module_cache()
+        self._orig_file_from_modpath = modutils.file_from_modpath
+        self.lookups = []
+
+        def file_from_modpath(modpath, *args, **kwargs):
+            self.lookups.append(modpath)
+            return self._orig_file_from_modpath(modpath, *args, **kwargs)
+        modutils.file_from_modpath = file_from_modpath
+
+    def tearDown(self):
+        modutils.file_from_modpath = self._orig_file_from_modpath
+        if self.directory in sys.path:
+            sys.path.remove(self.directory)
+        shutil.rmtree(self.directory)
+        modutils.clear_standard_module_cache()
+
+    def _create_module(self, modname):
+        with open(os.path.join(self.directory, modname + '.py'), 'w'):
+            pass
+
+    def test_results_are_cached(self):
+        self.assertTrue(modutils.is_standard_module('hashlib'))
+        self.assertTrue(modutils.is_standard_module('hashlib.md5'))
+        self.assertFalse(modutils.is_standard_module('xml', self.std_path))
+        self.assertEqual(self.lookups, [['hashlib'], ['xml']])
+
+    def test_non_standard_names_are_not_searched(self):
+        self.assertFalse(modutils.is_standard_module('astroid'))
+        self.assertFalse(modutils.is_standard_module('unknown'))
+        self.assertEqual(self.lookups, [])
+
+    def test_invalidated_by_sys_path_changes(self):
+        self._create_module('stdcache_mod')
+        self.assertFalse(modutils.is_standard_module('stdcache_mod', self.std_path))
+        sys.path.append(self.directory)
+        self.assertTrue(modutils.is_standard_module('stdcache_mod', self.std_path))
+
+    def test_explicit_invalidation(self):
+        sys.path.append(self.directory)
+        self.assertFalse(modutils.is_standard_module('stdcache_mod', self.std_path))
+        self._create_module('stdcache_mod')
+        self.assertFalse(modutils.is_standard_module('stdcache_mod', self.std_path))
+        modutils.clear_standard_module_cache()
+        self.assertTrue(modutils.is_standard_module('stdcache_mod', self.std_path))
+
+
 class IsRelativeTest(unittest.TestCase):
 
     def test_knownValues_is_relative_1(self):
@@ -224,6 +484,51 @@ class IsRelativeTest(unittest.TestCase):
         self.assertFalse(modutils.is_relative('astroid', astroid.__path__[0]))
 
 
+class ZipModuleSourceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.archive = os.path.join(self.directory, 'archive.zip')
+        self._write({'zpkg/__init__.py': 'A = 1\n', 'zpkg/zmod.py': 'B = 2\n'})
+
+    def tearDown(self):
+        archive = modutils._ZIP_ARCHIVES.pop(self.archive, None)
+        if archive is not None:
+            archive.close()
+        shutil.rmtree(self.directory)
+
+    def _write(self, files):
+        with zipfile.ZipFile(self.archive, 'w') as stream:
+            for name, source in files.items():
+                stream.writestr(name, source)
+
+    def test_sources(self):
+        self.assertEqual(modutils.zip_module_source(self.archive, 'zpkg'),
+                         ('A = 1\n', True))
+        self.assertEqual(
+            modutils.zip_module_source(self.archive, os.path.join('zpkg', 'zmod')),
+            ('B = 2\n', False))
+        with self.assertRaises(ImportError):
+            modutils.zip_module_source(self.archive, 'missing')
+
+    def test_index_built_once(self):
+        modutils.zip_module_source(self.archive, 'zpkg')
+        index = modutils._ZIP_ARCHIVES[self.archive]
+        modutils.zip_module_source(self.archive, 'zpkg/zmod')
+        self.assertIs(modutils._ZIP_ARCHIVES[self.archive], index)
+        self.assertEqual(index.modules, set(['zpkg', 'zpkg/zmod']))
+
+    def test_modified_archive(self):
+        modutils.zip_module_source(self.archive, 'zpkg')
+        self._write({'zpkg/__init__.py': 'A = 1\n', 'zpkg/other.py': 'C = 3\n'})
+        stat = os.stat(self.archive)
+        os.utime(self.archive, (stat.st_atime, stat.st_mtime + 10))
+        self.assertEqual(modutils.zip_module_source(self.archive, 'zpkg/other'),
+                         ('C = 3\n', False))
+        with self.assertRaises(ImportError):
+            modutils.zip_module_source(self.archive, 'zpkg/zmod')
+
+
 class GetModuleFilesTest(unittest.TestCase):
 
     def test_get_module_files_1(self):
@@ -244,6 +549,25 @@ class GetModuleFilesTest(unittest.TestCase):
             [os.path.join(non_package, 'file.py')],
         )
 
+    def test_iter_module_files(self):
+        package = resources.find('data/find_test')
+        modules = modutils.iter_module_files(package, ['module?.py', 'no*'])
+        self.assertEqual(sorted(modules),
+                         [os.path.join(package, x)
+                          for x in ('__init__.py', 'module.py')])
+        non_package = resources.find('data/notamodule')
+        self.assertEqual(list(modutils.iter_module_files(non_package)), [])
+        self.assertEqual(
+            list(modutils.iter_module_files(non_package, list_all=True)),
+            modutils.get_module_files(non_package, [], list_all=True))
+
+    def test_iter_module_files_subpackages(self):
+        data = resources.find('data')
+        modules = set(modutils.iter_module_files(data, ['find_test']))
+        self.assertEqual(modules, set(modutils.get_module_files(data, ['find_test'])))
+        self.assertIn(os.path.join(data, 'package', 'subpackage', 'module.py'),
+                      modules)
+
     def test_load_module_set_attribute(self):
         import xml.etree.ElementTree
         import xml
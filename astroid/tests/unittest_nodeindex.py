@@ -0,0 +1,142 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""tests for the index of the nodes of the modules by class"""
+
+import pickle
+import textwrap
+import unittest
+
+from astroid import builder
+from astroid import manager
+from astroid import node_classes
+from astroid import nodes
+from astroid.tests import resources
+
+
+SOURCE = textwrap.dedent('''
+    import os
+
+    def function(arg, other=2):
+        if arg:
+            return [elt for elt in other]
+        def nested():
+            return lambda: arg
+        return nested
+
+    class Klass(object):
+        attr = function(1)
+
+        def method(self):
+            yield self.attr
+''')
+
+QUERIES = [
+    (nodes.Name, None),
+    (nodes.Return, None),
+    (nodes.Return, nodes.FunctionDef),
+    (nodes.Name, (nodes.Lambda, nodes.ListComp)),
+    ((nodes.ClassDef, nodes.FunctionDef), None),
+    (node_classes.Statement, None),
+    (object, None),
+    (nodes.Global, None),
+]
+
+
+def _walk(node, klass, skip_klass=None):
+    return list(node_classes._walk_nodes_of_class(node, klass, skip_klass))
+
+
+class NodeIndexTest(unittest.TestCase):
+
+    def _build(self, index_nodes, defer_function_bodies=False):
+        self.builder = resources.isolated_builder(
+            index_nodes=index_nodes, defer_function_bodies=defer_function_bodies)
+        return self.builder.string_build(SOURCE, 'nodeindex')
+
+    def test_same_nodes(self):
+        module = self._build(True)
+        self.assertIsNotNone(module._node_index)
+        self.assertIsNone(self._build(False)._node_index)
+        self.assertEqual(len(module._node_index), len(_walk(module, object)))
+        for node in _walk(module, object):
+            for klass, skip_klass in QUERIES:
+                found = module._node_index.nodes_of_class(node, klass, skip_klass)
+                self.assertEqual(found, _walk(node, klass, skip_klass))
+                self.assertEqual(list(node.nodes_of_class(klass, skip_klass)),
+                                 found)
+
+    def test_skip_klass(self):
+        module = self._build(True)
+        function = module['function']
+        returns = list(function.nodes_of_class(nodes.Return, nodes.FunctionDef))
+        self.assertEqual([node.fromlineno for node in returns], [6, 9])
+        # The node itself isn't skipped.
+        self.assertEqual(list(function.nodes_of_class(nodes.FunctionDef,
+                                                      nodes.FunctionDef)),
+                         [function])
+
+    def test_nodes_added_later(self):
+        module = self._build(True)
+        node = nodes.Name('added', parent=module)
+        self.assertIsNone(module._node_index.nodes_of_class(node, nodes.Name))
+        self.assertEqual(list(node.nodes_of_class(nodes.Name)), [node])
+
+    def test_deferred_function_bodies(self):
+        module = self._build(True, defer_function_bodies=True)
+        function = module['function']
+        self.assertIsNotNone(function._deferred_body)
+        index = module._node_index
+        self.assertIsNone(index.nodes_of_class(module, nodes.Name))
+        self.assertIsNotNone(index.nodes_of_class(module['Klass'].body[0],
+                                                  nodes.Name))
+        expected = _walk(self._build(False), nodes.Name)
+        self.assertEqual([node.as_string() for node in module.nodes_of_class(nodes.Name)],
+                         [node.as_string() for node in expected])
+
+    def test_extracted_nodes(self):
+        astroid_manager = manager.AstroidManager()
+        astroid_manager.index_nodes = True
+        try:
+            name = builder.extract_node('function(__(arg))\n')
+        finally:
+            astroid_manager.index_nodes = False
+        module = name.root()
+        self.assertIsNone(module._node_index)
+        calls = list(module.nodes_of_class(nodes.Call))
+        self.assertEqual([call.func.name for call in calls], ['function'])
+        self.assertIs(calls[0].args[0], name)
+
+    def test_transformed_again(self):
+        module = self._build(True)
+        self.assertIsNotNone(module._node_index)
+        astroid_manager = self.builder._manager
+
+        def transform(node):
+            return nodes.Const(3, node.lineno, node.col_offset, node.parent)
+        astroid_manager.register_transform(nodes.ListComp, transform)
+        astroid_manager.visit_transforms(module)
+        self.assertIsNone(module._node_index)
+        self.assertEqual(list(module.nodes_of_class(nodes.ListComp)), [])
+        self.assertEqual([const.value for const in module.nodes_of_class(nodes.Const)],
+                         [2, 3, 1])
+
+    def test_pickle(self):
+        module = self._build(True)
+        # The isolated manager can't be pickled.
+        module.manager = None
+        copied = pickle.loads(pickle.dumps(module, pickle.HIGHEST_PROTOCOL))
+        method = copied['Klass']['method']
+        self.assertEqual(copied._node_index.nodes_of_class(method, nodes.Name),
+                         _walk(method, nodes.Name))
+
+    def test_walk_is_lazy(self):
+        module = self._build(False, defer_function_bodies=True)
+        function = module['function']
+        self.assertIs(next(function.nodes_of_class(nodes.Arguments)),
+                      function.args)
+        self.assertIsNotNone(function._deferred_body)
+
+
+if __name__ == '__main__':
+    unittest.main()
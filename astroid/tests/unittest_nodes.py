@@ -10,6 +10,7 @@
 """tests for specific behaviour of astroid nodes
 """
 import os
+import pickle
 import sys
 import textwrap
 import unittest
@@ -804,5 +805,125 @@ class ContextTest(unittest.TestCase):
         self.assertIs(starred.ctx, astroid.Store)
 
 
+class SlotsTest(unittest.TestCase):
+
+    def test_fields_are_slotted(self):
+        for cls in (nodes.Name, nodes.Call, nodes.Assign, nodes.FunctionDef,
+                    nodes.ClassDef, nodes.Module, nodes.Const, nodes.List):
+            for field in (cls._astroid_fields + cls._other_fields
+                          + cls._other_other_fields):
+                self.assertIn(field, dict(cls._slot_members),
+                              '%s.%s' % (cls.__name__, field))
+
+    def test_field_defaults(self):
+        self.assertIsNone(nodes.Assert().fail)
+        self.assertIsNone(nodes.Name().lineno)
+        self.assertEqual(nodes.Module('test', None).lineno, 0)
+        self.assertEqual(nodes.Module('test', None).fromlineno, 0)
+        with self.assertRaises(AttributeError):
+            nodes.Name().unknown # pylint: disable=expression-not-assigned
+
+    def test_dict_created_for_dynamic_attributes(self):
+        node = builder.extract_node('if a:\n    pass')
+        self.assertIsNone(node_classes._instance_dict(node))
+        # Cached on the node, unlike the lines answered by a position store.
+        node.blockstart_tolineno # pylint: disable=pointless-statement
+        self.assertEqual(node_classes._instance_dict(node),
+                         {'blockstart_tolineno': 1})
+        node._explicit_inference = len
+        self.assertIs(node.__dict__['_explicit_inference'], len)
+        del node.blockstart_tolineno
+        self.assertNotIn('blockstart_tolineno', node.__dict__)
+
+    def test_const_proxies_its_class(self):
+        node = nodes.Const(1)
+        self.assertEqual(node.name, 'int')
+        self.assertIsNone(node_classes._instance_dict(node))
+
+    def test_pickle(self):
+        module = builder.parse('''
+        def func(arg=1):
+            if arg:
+                return arg
+        ''')
+        func = module['func']
+        func.body[0].blockstart_tolineno # pylint: disable=pointless-statement
+        copied = pickle.loads(pickle.dumps(module, pickle.HIGHEST_PROTOCOL))
+        copied_func = copied['func']
+        self.assertEqual(copied_func.as_string(), func.as_string())
+        self.assertIs(copied_func.parent, copied)
+        # The annotations of the arguments aren't slots on Python 2.
+        self.assertEqual(copied_func.args.__dict__, func.args.__dict__)
+        self.assertEqual(copied_func.body[0].__dict__, {'blockstart_tolineno': 3})
+        self.assertIsNone(node_classes._instance_dict(copied_func.body[0].body[0]))
+
+
+class CachedParentsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.module = builder.parse('''
+        class Klass(object):
+            @decorator
+            def method(self):
+                if self:
+                    return [elt for elt in self]
+        ''')
+        self.klass = self.module['Klass']
+        self.method = self.klass['method']
+        self.name = next(self.method.body[0].nodes_of_class(nodes.Name))
+        self.comprehension = next(self.method.nodes_of_class(nodes.ListComp))
+
+    def test_cached(self):
+        self.assertIs(self.name.frame(), self.method)
+        self.assertIs(self.name._cached_frame, self.method)
+        self.assertIs(self.name.scope(), self.method)
+        self.assertIs(self.name.statement(), self.method.body[0])
+        self.assertIs(self.name.root(), self.module)
+        self.assertIs(self.comprehension.frame(), self.method)
+        self.assertEqual(self.method.qname(), '.Klass.method')
+        self.assertEqual(self.method._cached_qname, '.Klass.method')
+        self.assertIsNone(node_classes._instance_dict(self.name))
+
+    def test_cleared_with_new_parent(self):
+        self.assertIs(self.name.root(), self.module)
+        self.assertIs(self.comprehension.frame(), self.method)
+        decorators = self.method.decorators
+        self.assertIs(decorators.scope(), self.klass)
+        self.assertEqual(self.method.qname(), '.Klass.method')
+
+        other = builder.parse('''
+        def function():
+            pass
+        ''', module_name='other')
+        function = other['function']
+        self.klass.parent = function
+        self.assertIs(self.name.root(), other)
+        self.assertIs(self.name.frame(), self.method)
+        self.assertIs(self.comprehension.frame(), self.method)
+        self.assertIs(decorators.scope(), self.klass)
+        self.assertEqual(self.method.qname(), 'other.function.Klass.method')
+
+        self.method.parent = function
+        self.assertIs(decorators.scope(), function)
+        self.assertEqual(self.method.qname(), 'other.function.method')
+
+    def test_new_node(self):
+        node = nodes.Name('name', parent=self.method.body[0])
+        self.assertIs(node.statement(), self.method.body[0])
+        self.assertIs(node.frame(), self.method)
+        node.parent = self.klass
+        self.assertIs(node.frame(), self.klass)
+
+    def test_not_pickled(self):
+        self.name.root() # pylint: disable=pointless-statement
+        self.method.qname() # pylint: disable=pointless-statement
+        self.assertNotIn('_cached_root', node_classes._slot_values(self.name))
+        self.assertNotIn('_cached_qname', node_classes._slot_values(self.method))
+        copied = pickle.loads(pickle.dumps(self.module, pickle.HIGHEST_PROTOCOL))
+        copied_name = next(copied['Klass']['method'].body[0].nodes_of_class(nodes.Name))
+        self.assertIsNone(copied_name._cached_root)
+        self.assertIs(copied_name.root(), copied)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,127 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""tests for the positions of the nodes stored in arrays"""
+
+import pickle
+import textwrap
+import unittest
+
+from astroid import node_classes
+from astroid import nodes
+from astroid.tests import resources
+
+
+SOURCE = textwrap.dedent('''
+    import os
+
+    @decorator(
+        1)
+    def function(arg,
+                 other=2):
+        if arg:
+            return [elt for elt in other]
+        return {1: 2,
+                3: 4}
+
+    class Klass(object):
+        attr = function(
+            1)
+''')
+
+
+class PositionStoreTest(unittest.TestCase):
+
+    def _build(self, store_positions, defer_function_bodies=False):
+        astroid_builder = resources.isolated_builder(
+            store_positions=store_positions,
+            defer_function_bodies=defer_function_bodies)
+        return astroid_builder.string_build(SOURCE, 'positions')
+
+    def _lines(self, module):
+        return [(type(node).__name__, node.fromlineno, node.tolineno,
+                 node.col_offset) for node in module.nodes_of_class(object)]
+
+    def test_same_lines(self):
+        module = self._build(True)
+        self.assertIsNotNone(module._positions)
+        self.assertIsNone(self._build(False)._positions)
+        self.assertEqual(self._lines(module), self._lines(self._build(False)))
+        self.assertEqual(len(module._positions),
+                         len(list(module.nodes_of_class(object))))
+
+    def test_lines_not_cached_on_nodes(self):
+        module = self._build(True)
+        self.assertEqual(module.tolineno, 15)
+        for node in module.nodes_of_class(object):
+            node_dict = node_classes._instance_dict(node) or {}
+            self.assertNotIn('fromlineno', node_dict)
+            self.assertNotIn('tolineno', node_dict)
+
+    def test_block_range(self):
+        module = self._build(True)
+        function = module['function']
+        if_node = function.body[0]
+        self.assertEqual(function.fromlineno, 6)
+        self.assertEqual(function.block_range(6), (6, 11))
+        self.assertEqual(if_node.block_range(8), (8, 9))
+        self.assertEqual(module['Klass'].block_range(13), (13, 15))
+
+    def test_parent_of(self):
+        module = self._build(True)
+        function = module['function']
+        comprehension = next(function.nodes_of_class(nodes.ListComp))
+        self.assertTrue(function.parent_of(comprehension))
+        self.assertTrue(module.parent_of(comprehension))
+        self.assertFalse(comprehension.parent_of(function))
+        self.assertFalse(function.parent_of(function))
+        self.assertFalse(function.parent_of(module['Klass'].body[0]))
+        positions = module._positions
+        self.assertIs(positions.parent(comprehension), function.body[0].body[0])
+        self.assertIsNone(positions.parent(module))
+        self.assertEqual(positions.col_offset(comprehension),
+                         comprehension.col_offset)
+
+    def test_nodes_added_later(self):
+        module = self._build(True)
+        node = nodes.Name('added', lineno=20, parent=module)
+        self.assertIsNone(module._positions.index(node))
+        self.assertEqual(node.fromlineno, 20)
+        self.assertFalse(module['function'].parent_of(node))
+
+    def test_deferred_function_bodies(self):
+        module = self._build(True, defer_function_bodies=True)
+        function = module['function']
+        self.assertIsNotNone(function._deferred_body)
+        self.assertEqual(function.fromlineno, 6)
+        self.assertIsNotNone(function._deferred_body)
+        self.assertEqual(module.tolineno, 15)
+        self.assertEqual(function.tolineno, 11)
+        self.assertEqual(self._lines(module), self._lines(self._build(False)))
+
+    def test_shared_numbering(self):
+        astroid_builder = resources.isolated_builder(
+            store_positions=True, index_nodes=True, defer_function_bodies=True)
+        module = astroid_builder.string_build(SOURCE, 'positions')
+        numbering = module._positions.numbering
+        self.assertIs(module._node_index.numbering, numbering)
+        self.assertEqual(len(numbering.deferred), 1)
+        # Numbered again for the interval index, with the function body.
+        self.assertEqual(module.node_at(9, 20).name, 'elt')
+        self.assertIsNot(module._interval_index.numbering, numbering)
+        self.assertEqual(len(module._interval_index.numbering.deferred), 0)
+        self.assertIs(module._get_numbering(), module._interval_index.numbering)
+        module._drop_indexes()
+        self.assertIsNone(module._numbering)
+
+    def test_pickle(self):
+        module = self._build(True)
+        # The isolated manager can't be pickled.
+        module.manager = None
+        copied = pickle.loads(pickle.dumps(module, pickle.HIGHEST_PROTOCOL))
+        self.assertIsNotNone(copied._positions.index(copied['Klass']))
+        self.assertEqual(self._lines(copied), self._lines(module))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,12 +8,15 @@
 from __future__ import print_function
 
 import contextlib
+import textwrap
 import time
 import unittest
 
 from astroid import builder
+from astroid import manager
 from astroid import nodes
 from astroid import parse
+from astroid import test_utils
 from astroid import transforms
 
 
@@ -230,5 +233,80 @@ class TestTransforms(unittest.TestCase):
         ''')
 
 
+class FusedTransformsTest(unittest.TestCase):
+
+    CODE = '''
+    def test(): return 42
+    values = {'key': test(), test(): [test() for _ in range(2)]}
+    assert test() > other(test())
+    try:
+        test()
+    except Exception as exc:
+        pass
+    finally:
+        pass
+    '''
+
+    def setUp(self):
+        self.manager = manager.AstroidManager(isolated=True)
+        self.manager._transform.transforms.clear()
+
+    def _build(self, fused, code=None):
+        self.manager.fuse_transforms = fused
+        return builder.AstroidBuilder(self.manager).string_build(
+            textwrap.dedent(code or self.CODE))
+
+    def test_same_results_as_visiting(self):
+        visited = []
+        def transform_call(node):
+            visited.append(node.as_string())
+            if node.func.as_string() == 'test':
+                return nodes.const_factory(42)
+        self.manager.register_transform(nodes.Call, transform_call)
+
+        expected = self._build(False)
+        expected_visited, visited[:] = list(visited), []
+        module = self._build(True)
+        # Only the children are guaranteed to be transformed before their
+        # parent, the order of the other nodes may differ.
+        self.assertEqual(sorted(visited), sorted(expected_visited))
+        self.assertEqual(module.as_string(), expected.as_string())
+        self.assertEqual(module.as_string().count('test()'), 1)
+        self.assertIn('other(42)', module.as_string())
+
+    def test_replaced_nodes_are_in_the_tree(self):
+        def transform_name(node):
+            if node.name == 'exc':
+                return nodes.AssignName('renamed', node.lineno, node.col_offset,
+                                        node.parent)
+        self.manager.register_transform(nodes.AssignName, transform_name)
+        module = self._build(True)
+        self.assertEqual(module.body[3].body[0].handlers[0].name.name, 'renamed')
+        self.assertIsNone(module._transformed_nodes)
+
+    @test_utils.require_version(minver='3.0')
+    def test_metaclass_not_transformed(self):
+        visited = []
+        self.manager.register_transform(nodes.Name, lambda node: visited.append(node.name))
+        self._build(True, '''
+        class A(Base, metaclass=Meta):
+            pass
+        ''')
+        self.assertEqual(visited, ['Base'])
+
+    def test_deferred_bodies_transformed_once(self):
+        visited = []
+        self.manager.register_transform(nodes.Call, lambda node: visited.append(node))
+        self.manager.defer_function_bodies = True
+        module = self._build(True, '''
+        def func():
+            return test()
+        func()
+        ''')
+        self.assertEqual(len(visited), 1)
+        self.assertEqual(len(module['func'].body), 1)
+        self.assertEqual(len(visited), 2)
+
+
 if __name__ == '__main__':
     unittest.main()
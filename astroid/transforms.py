@@ -8,6 +8,44 @@ import collections
 import warnings
 
 
+def _replace_in_sequence(sequence, child, new):
+    """Get a copy of *sequence* where *child* is replaced by *new*, if found"""
+    for index, item in enumerate(sequence):
+        if item is child:
+            replaced = new
+        elif isinstance(item, (list, tuple)):
+            replaced = _replace_in_sequence(item, child, new)
+            if replaced is None:
+                continue
+        else:
+            continue
+        items = list(sequence)
+        items[index] = replaced
+        return tuple(items) if isinstance(sequence, tuple) else items
+    return None
+
+
+def _replace_child(parent, child, new):
+    """Replace *child* by *new* in the fields of *parent*"""
+    for field in parent._astroid_fields:
+        value = getattr(parent, field)
+        if value is child:
+            setattr(parent, field, new)
+            return
+        if isinstance(value, (list, tuple)):
+            replaced = _replace_in_sequence(value, child, new)
+            if replaced is not None:
+                setattr(parent, field, replaced)
+                return
+
+
+def _drop_indexes(module):
+    """Drop the indexes of the nodes of *module*, which may be changed"""
+    drop_indexes = getattr(module, '_drop_indexes', None)
+    if drop_indexes is not None:
+        drop_indexes()
+
+
 class TransformVisitor(object):
     """A visitor for handling transforms.
 
@@ -47,6 +85,10 @@ class TransformVisitor(object):
     def _visit(self, node):
         if hasattr(node, '_astroid_fields'):
             for field in node._astroid_fields:
+                if field == 'body' and getattr(node, '_deferred_body', None):
+                    # Visited once built, see FunctionDef.body.
+                    node._pending_transforms = self
+                    continue
                 value = getattr(node, field)
                 visited = self._visit_generic(value)
                 setattr(node, field, visited)
@@ -74,11 +116,38 @@ class TransformVisitor(object):
         """Unregister the given transform."""
         self.transforms[node_class].remove((transform, predicate))
 
-    def visit(self, module):
+    def visit_nodes(self, nodes):
+        """Walk the given list of nodes and return them transformed."""
+        return [self._visit(node) for node in nodes]
+
+    def transform_nodes(self, module, nodes):
+        """Transform the given *nodes* of *module*, and then the module,
+        without walking it
+
+        The nodes are expected children first, as recorded by the rebuilder
+        while building the module, and they are the nodes having transforms.
+        A node replaced by a transform is replaced in its parent.
+        """
+        for node in nodes:
+            transformed = self._transform(node)
+            if transformed is not node:
+                _replace_child(node.parent, node, transformed)
+        _drop_indexes(module)
+        return self._transform(module)
+
+    def visit(self, module, children=None):
         """Walk the given astroid *tree* and transform each encountered node
 
         Only the nodes which have transforms registered will actually
-        be replaced or changed.
+        be replaced or changed. If *children* is given, only these
+        statements of the module are walked, the other ones being
+        left as they are.
         """
-        module.body = [self._visit(child) for child in module.body]
+        if children is None:
+            module.body = [self._visit(child) for child in module.body]
+        else:
+            children = set(id(child) for child in children)
+            module.body = [self._visit(child) if id(child) in children else child
+                           for child in module.body]
+        _drop_indexes(module)
         return self._transform(module)
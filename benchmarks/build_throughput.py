@@ -0,0 +1,82 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""Measure how many modules of the standard library are built per second
+
+Each build mode builds the same files with its own isolated manager, so
+that no module is shared between the modes. The modules the files import
+while being built are built too, as they would be when analysing a
+project, and are part of the measure. The modes are run in turn and the
+garbage collector is paused while timing them, its pauses being the main
+source of noise; the best timing of each mode is kept.
+
+    python benchmarks/build_throughput.py [--repeat N] [directory]
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import glob
+import os
+import sysconfig
+import time
+
+from astroid import __pkginfo__
+from astroid import builder
+from astroid import exceptions
+from astroid import manager
+
+
+MODES = {
+    'default': {},
+    'fused transforms': {'fuse_transforms': True},
+}
+
+
+def build_files(files, **options):
+    """Build *files* with a new manager, return the number of built files"""
+    astroid_manager = manager.AstroidManager(isolated=True)
+    for name, value in options.items():
+        setattr(astroid_manager, name, value)
+    astroid_builder = builder.AstroidBuilder(astroid_manager)
+    built = 0
+    for path in files:
+        try:
+            astroid_builder.file_build(path)
+        except (exceptions.AstroidError, RuntimeError, AttributeError):
+            # Syntax this version of astroid doesn't support.
+            continue
+        built += 1
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', nargs='?',
+                        default=sysconfig.get_paths()['stdlib'])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.directory, '*.py')))
+    print('astroid %s, %d files of %s'
+          % (__pkginfo__.version, len(files), args.directory))
+    timings = dict((mode, []) for mode in MODES)
+    for _ in range(args.repeat):
+        for mode in sorted(MODES):
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.time()
+                built = build_files(files, **MODES[mode])
+                timings[mode].append(time.time() - start)
+            finally:
+                gc.enable()
+    for mode in sorted(MODES):
+        best = min(timings[mode])
+        print('%-18s %4d files in %6.2fs: %6.1f files/s'
+              % (mode, built, best, built / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""Measure how fast the modules of the standard library are found
+
+The dotted names of the modules and packages of the standard library are
+resolved with the finders based on imp, as before, and with the ones
+based on importlib, reusing the directory listings of its path entry
+finders, where available. The first pass is timed apart, the caches of
+the finders being filled by it, and the best of the next ones is kept.
+The garbage collector is paused while timing.
+
+    python benchmarks/module_finders.py [--repeat N] [directory]
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import os
+import sys
+import sysconfig
+import time
+import warnings
+
+from astroid import __pkginfo__
+from astroid import modutils
+
+
+MODES = {
+    'imp': [modutils.ImpFinder if finder is modutils.ImportlibFinder else finder
+            for finder in modutils._SPEC_FINDERS],
+}
+if modutils.ImportlibFinder in modutils._SPEC_FINDERS:
+    MODES['importlib'] = list(modutils._SPEC_FINDERS)
+
+
+def module_names(directory):
+    """Get the dotted names of the modules and packages in *directory*"""
+    names = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        relative = os.path.relpath(dirpath, directory)
+        package = [] if relative == os.curdir else relative.split(os.sep)
+        if package and '__init__.py' not in filenames:
+            # Not a package, its content can't be imported.
+            del dirnames[:]
+            continue
+        if not all(_is_identifier(part) for part in package):
+            del dirnames[:]
+            continue
+        for filename in filenames:
+            name, ext = os.path.splitext(filename)
+            if ext == '.py' and _is_identifier(name):
+                if name == '__init__':
+                    if package:
+                        names.append(package)
+                else:
+                    names.append(package + [name])
+    return sorted(names)
+
+
+def _is_identifier(name):
+    return bool(name) and not name[0].isdigit() and name.replace('_', 'a').isalnum()
+
+
+def find_modules(names):
+    """Resolve *names*, return the number of modules found"""
+    found = 0
+    for modpath in names:
+        try:
+            modutils.file_info_from_modpath(modpath)
+        except (ImportError, SyntaxError):
+            # Not found, or with a bad encoding cookie, which imp
+            # reads when opening the file.
+            continue
+        found += 1
+    return found
+
+
+def time_finders(finders, names, repeat):
+    """Get the number of modules found and the timings of the passes"""
+    saved = list(modutils._SPEC_FINDERS)
+    modutils._SPEC_FINDERS[:] = finders
+    timings = []
+    try:
+        for _ in range(repeat + 1):
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.time()
+                found = find_modules(names)
+                timings.append(time.time() - start)
+            finally:
+                gc.enable()
+    finally:
+        modutils._SPEC_FINDERS[:] = saved
+    return found, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', nargs='?',
+                        default=sysconfig.get_paths()['stdlib'])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    names = module_names(args.directory)
+    print('astroid %s, python %s, %d modules of %s'
+          % (__pkginfo__.version, sys.version.split()[0], len(names),
+             args.directory))
+    with warnings.catch_warnings():
+        # imp is deprecated on Python 3.
+        warnings.simplefilter('ignore')
+        for mode in sorted(MODES):
+            found, timings = time_finders(MODES[mode], names, args.repeat)
+            print('%-9s %5d found, first pass %6.3fs, next passes %6.3fs'
+                  % (mode, found, timings[0], min(timings[1:])))
+
+
+if __name__ == '__main__':
+    main()
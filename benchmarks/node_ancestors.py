@@ -0,0 +1,90 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""Measure how fast the frame, scope, root and statement of nodes are found
+
+The code built nests functions, classes and blocks DEPTH levels deep, so
+that finding the parents of its innermost nodes walks up long chains of
+parents. Each pass calls frame(), scope(), root() and statement() on every
+node of the module, and qname() on every function and class. The first pass
+is timed on a new tree, the next ones on the tree already used; the best
+timing of each is kept.
+
+    python benchmarks/node_ancestors.py [--depth N] [--repeat N]
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import time
+
+from astroid import __pkginfo__
+from astroid import builder
+from astroid import nodes
+
+
+def nested_source(depth):
+    """Get the source of *depth* levels of nested functions, classes and
+    blocks, each with a few statements
+    """
+    lines = []
+    for level in range(depth):
+        indent = '    ' * level
+        if level % 3 == 0:
+            lines.append('%sdef function%d(arg%d):' % (indent, level, level))
+        elif level % 3 == 1:
+            lines.append('%sclass Klass%d(object):' % (indent, level))
+        else:
+            lines.append('%sif arg%d:' % (indent, level - 2))
+        inner = indent + '    '
+        lines.append('%svalue%d = [elt + %d for elt in range(%d)]'
+                     % (inner, level, level, level))
+        lines.append('%sresult%d = {key: value%d for key in (1, 2)}'
+                     % (inner, level, level))
+    lines.append('%sprint(value0, arg0)' % ('    ' * depth))
+    return '\n'.join(lines) + '\n'
+
+
+def lookup_parents(all_nodes, scoped):
+    for node in all_nodes:
+        node.frame()
+        node.scope()
+        node.root()
+        node.statement()
+    for node in scoped:
+        node.qname()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    source = nested_source(args.depth)
+    first, later = [], []
+    for _ in range(args.repeat):
+        module = builder.AstroidBuilder().string_build(source, 'nested')
+        all_nodes = list(module.nodes_of_class(object))
+        scoped = [node for node in all_nodes
+                  if isinstance(node, (nodes.FunctionDef, nodes.ClassDef))]
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.time()
+            lookup_parents(all_nodes, scoped)
+            first.append(time.time() - start)
+            start = time.time()
+            lookup_parents(all_nodes, scoped)
+            later.append(time.time() - start)
+        finally:
+            gc.enable()
+    print('astroid %s, depth %d, %d nodes'
+          % (__pkginfo__.version, args.depth, len(all_nodes)))
+    print('first pass %8.2f ms' % (min(first) * 1000))
+    print('next pass  %8.2f ms' % (min(later) * 1000))
+
+
+if __name__ == '__main__':
+    main()
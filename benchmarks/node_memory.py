@@ -0,0 +1,92 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""Measure the memory held by the nodes built for the standard library
+
+The files are built with an isolated manager while tracemalloc traces the
+allocations, and the memory still allocated once they are built, divided
+by the number of nodes of the modules in the cache of the manager, gives
+the bytes per node. This includes everything the trees hold, such as the
+locals dictionaries, the lists of children and the names. The size of the
+node objects themselves and of their __dict__, if they have one, is given
+separately.
+
+    python benchmarks/node_memory.py [directory]
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import glob
+import os
+import sys
+import sysconfig
+import tracemalloc
+
+from astroid import __pkginfo__
+from astroid import builder
+from astroid import exceptions
+from astroid import manager
+
+
+def build_files(files):
+    """Build *files* with a new manager, return the manager"""
+    astroid_manager = manager.AstroidManager(isolated=True)
+    astroid_builder = builder.AstroidBuilder(astroid_manager)
+    for path in files:
+        try:
+            astroid_builder.file_build(path)
+        except (exceptions.AstroidError, RuntimeError, AttributeError):
+            # Syntax this version of astroid doesn't support.
+            continue
+    return astroid_manager
+
+
+def node_sizes(modules):
+    """Get the number of nodes of *modules*, the size of the node objects
+    and the size of their __dict__
+    """
+    count = objects = dicts = 0
+    for module in modules:
+        for node in module.nodes_of_class(object):
+            count += 1
+            objects += sys.getsizeof(node)
+            # Don't create the __dict__ of the nodes by reading it.
+            node_dict = [value for value in gc.get_referents(node)
+                         if type(value) is dict
+                         and value is not getattr(node, 'locals', None)
+                         and value is not getattr(node, 'instance_attrs', None)]
+            if node_dict:
+                dicts += sys.getsizeof(node_dict[0])
+    return count, objects, dicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', nargs='?',
+                        default=sysconfig.get_paths()['stdlib'])
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.directory, '*.py')))
+    print('astroid %s, %d files of %s'
+          % (__pkginfo__.version, len(files), args.directory))
+    gc.collect()
+    tracemalloc.start()
+    astroid_manager = build_files(files)
+    gc.collect()
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    modules = list(astroid_manager.astroid_cache.values())
+    count, objects, dicts = node_sizes(modules)
+    print('%d modules, %d nodes' % (len(modules), count))
+    print('traced     %8.1f MiB %6.1f bytes per node'
+          % (traced / 2.0 ** 20, traced / count))
+    print('nodes      %8.1f MiB %6.1f bytes per node'
+          % (objects / 2.0 ** 20, objects / count))
+    print('__dict__   %8.1f MiB %6.1f bytes per node'
+          % (dicts / 2.0 ** 20, dicts / count))
+
+
+if __name__ == '__main__':
+    main()
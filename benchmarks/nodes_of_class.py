@@ -0,0 +1,98 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""Measure how fast nodes_of_class finds nodes in the standard library
+
+The files are built once by a manager indexing their nodes and once by a
+manager which doesn't. The lookups usual in pylint are then timed on each
+set of modules: the classes and functions of each module, the names,
+calls and returns of each function, not looking in nested functions for
+the latter, and the assignments of each class. The best timing of each
+mode is kept.
+
+    python benchmarks/nodes_of_class.py [--repeat N] [directory]
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import glob
+import os
+import sysconfig
+import time
+
+from astroid import __pkginfo__
+from astroid import builder
+from astroid import exceptions
+from astroid import manager
+from astroid import nodes
+
+
+MODES = {
+    'walk': {},
+    'index': {'index_nodes': True},
+}
+
+
+def build_files(files, **options):
+    """Build *files* with a new manager, return the built modules"""
+    astroid_manager = manager.AstroidManager(isolated=True)
+    for name, value in options.items():
+        setattr(astroid_manager, name, value)
+    astroid_builder = builder.AstroidBuilder(astroid_manager)
+    modules = []
+    for path in files:
+        try:
+            modules.append(astroid_builder.file_build(path))
+        except (exceptions.AstroidError, RuntimeError, AttributeError):
+            # Syntax this version of astroid doesn't support.
+            continue
+    return modules
+
+
+def lookup_nodes(modules):
+    """Run the lookups on *modules*, return the number of nodes found"""
+    found = 0
+    for module in modules:
+        scopes = list(module.nodes_of_class((nodes.ClassDef, nodes.FunctionDef)))
+        found += len(scopes)
+        for scope in scopes:
+            if isinstance(scope, nodes.FunctionDef):
+                found += sum(1 for _ in scope.nodes_of_class(nodes.Name))
+                found += sum(1 for _ in scope.nodes_of_class(nodes.Call))
+                found += sum(1 for _ in scope.nodes_of_class(
+                    nodes.Return, skip_klass=nodes.FunctionDef))
+            else:
+                found += sum(1 for _ in scope.nodes_of_class(nodes.Assign))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', nargs='?',
+                        default=sysconfig.get_paths()['stdlib'])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.directory, '*.py')))
+    print('astroid %s, %d files of %s'
+          % (__pkginfo__.version, len(files), args.directory))
+    for mode in sorted(MODES):
+        modules = build_files(files, **MODES[mode])
+        timings = []
+        for _ in range(args.repeat):
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.time()
+                found = lookup_nodes(modules)
+                timings.append(time.time() - start)
+            finally:
+                gc.enable()
+        print('%-6s %4d modules, %7d nodes found in %6.2fs'
+              % (mode, len(modules), found, min(timings)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# Licensed under the LGPL: https://www.gnu.org/licenses/old-licenses/lgpl-2.1.en.html
+# For details: https://github.com/PyCQA/astroid/blob/master/COPYING.LESSER
+
+"""Measure the memory and the first inference of forked workers
+
+For each mode, a process forked from this one, which has built nothing
+yet, forks the workers, after pre-building the modules with
+AstroidManager.prewarm unless the mode is 'cold'. Each worker infers the
+calls of a snippet using these modules, building them if needed, runs
+the garbage collector as it eventually would, and reports how long the
+inference took and how much of its memory is not shared with its parent
+anymore, the private dirty pages of /proc/self/smaps. The objects are
+only frozen in the 'prewarm+freeze' mode on Python 3.7 and later, which
+have gc.freeze.
+
+    python benchmarks/prefork.py [--workers N] [module ...]
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import traceback
+
+from astroid import __pkginfo__
+from astroid import builder
+from astroid import exceptions
+from astroid import manager
+from astroid import nodes
+
+
+MODES = {
+    'cold': None,
+    'prewarm': {'freeze': False},
+    'prewarm+freeze': {'freeze': True},
+}
+
+MODULES = ['argparse', 'collections', 'csv', 'decimal', 'json', 'logging',
+           'os', 'shutil', 'socket', 'subprocess', 'threading', 'unittest']
+
+
+def private_memory():
+    """Get the private dirty memory of this process in kB, or None"""
+    for name in ('/proc/self/smaps_rollup', '/proc/self/smaps'):
+        try:
+            with open(name) as stream:
+                return sum(int(line.split()[1]) for line in stream
+                           if line.startswith('Private_Dirty:'))
+        except (IOError, OSError):
+            continue
+    return None
+
+
+def infer_snippet(modnames):
+    """Infer a call to the first function or class of each module"""
+    source = ['import %s' % modname for modname in modnames]
+    astroid_manager = manager.AstroidManager()
+    for modname in modnames:
+        try:
+            module = astroid_manager.ast_from_module_name(modname)
+        except (exceptions.AstroidError, RuntimeError, AttributeError):
+            continue
+        for name in sorted(module.public_names()):
+            if isinstance(module.locals[name][0],
+                          (nodes.FunctionDef, nodes.ClassDef)):
+                source.append('%s.%s()' % (modname, name))
+                break
+    module = builder.parse('\n'.join(source))
+    for call in module.nodes_of_class(nodes.Call):
+        try:
+            list(call.infer())
+        except (exceptions.AstroidError, RuntimeError, AttributeError):
+            # Syntax this version of astroid doesn't support.
+            continue
+
+
+def worker(modnames, output):
+    start = time.time()
+    infer_snippet(modnames)
+    elapsed = time.time() - start
+    gc.collect()
+    os.write(output, (json.dumps([elapsed, private_memory()]) + '\n').encode())
+
+
+def fork_workers(modnames, workers, prewarm):
+    """Fork *workers* processes, return their timings and memory"""
+    if prewarm is not None:
+        failed = manager.AstroidManager().prewarm(modnames, **prewarm)
+        modnames = [modname for modname in modnames if modname not in failed]
+    read, write = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            try:
+                worker(modnames, write)
+            except Exception: # pylint: disable=broad-except
+                traceback.print_exc()
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    os.close(write)
+    with os.fdopen(read) as stream:
+        results = [json.loads(line) for line in stream]
+    for pid in pids:
+        os.waitpid(pid, 0)
+    return results
+
+
+def run_mode(modnames, workers, prewarm):
+    """Run a mode in a forked process, not to share what it builds"""
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read)
+        try:
+            results = fork_workers(modnames, workers, prewarm)
+            os.write(write, json.dumps(results).encode())
+        except Exception: # pylint: disable=broad-except
+            traceback.print_exc()
+        finally:
+            os._exit(0)
+    os.close(write)
+    with os.fdopen(read) as stream:
+        data = stream.read()
+    os.waitpid(pid, 0)
+    return json.loads(data) if data else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    if not hasattr(os, 'fork'):
+        sys.exit('os.fork is required')
+
+    print('astroid %s, python %s, %d workers, modules %s'
+          % (__pkginfo__.version, sys.version.split()[0], args.workers,
+             ' '.join(args.modules)))
+    for mode in sorted(MODES):
+        results = run_mode(args.modules, args.workers, MODES[mode])
+        if not results:
+            print('%-15s failed' % mode)
+            continue
+        timings = [elapsed for elapsed, _ in results]
+        memory = [private for _, private in results if private is not None]
+        print('%-15s first inference %6.3fs, private memory %s per worker'
+              % (mode, sum(timings) / len(timings),
+                 '%6.1f MB' % (sum(memory) / len(memory) / 1024.)
+                 if memory else 'unknown'))
+
+
+if __name__ == '__main__':
+    main()